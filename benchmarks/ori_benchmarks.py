@@ -0,0 +1,190 @@
+import argparse
+import json
+import os
+import platform
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+from functions.gc_skew import calculate_gc_skew, min_max_skew
+from functions.generate_k_mers import generate_k_mers
+from functions.neighbourhood import neighbourhood_dictionary
+from functions.pattern_frequency import pattern_frequency
+from functions.sequence import read_sequence
+
+# Synthetic genome sizes of the benchmark matrix
+GENOME_SIZES = {"100kb": 10**5, "1Mb": 10**6, "5Mb": 5 * 10**6, "20Mb": 2 * 10**7}
+K_MER_LENGTHS = (9, 12)
+DISTANCES = (0, 1, 2)
+# Base pairs downstream of the skew minimum analyzed by the neighbourhood and frequency stages
+REGION_LENGTH = 1000
+# Default location of the stored baselines
+BASELINE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "baselines.json")
+# Slowdown relative to the baseline that counts as regression
+REGRESSION_THRESHOLD = 1.25
+
+def synthetic_genome(length: int, seed: int = 0) -> str:
+    """
+    Generates a reproducible random genome with a GC skew turning point in the middle.
+
+    Parameters:
+    - length (int): Number of bases.
+    - seed (int, optional): Seed of the random generator. Defaults to 0.
+
+    Returns:
+    - str: The genome, G-rich in the first and C-rich in the second half.
+    """
+    generator = np.random.default_rng(seed)
+    half = length // 2
+    parts = [generator.choice(np.frombuffer(b"ACGT", dtype=np.uint8), size=size, p=probabilities)
+             for size, probabilities in ((half, (0.25, 0.24, 0.26, 0.25)), (length - half, (0.25, 0.26, 0.24, 0.25)))]
+    return np.concatenate(parts).tobytes().decode("ascii")
+
+def measure(function, repeat: int) -> float:
+    """
+    Best wall time of several calls of a function, in seconds.
+    """
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        function()
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+def run_benchmarks(sizes: list, k_mer_lengths: list = K_MER_LENGTHS, distances: list = DISTANCES, repeat: int = 3,
+                   region_length: int = REGION_LENGTH) -> dict:
+    """
+    Times every stage of the pipeline on synthetic genomes.
+
+    Parameters:
+    - sizes (list): Names of GENOME_SIZES or numbers of bases.
+    - k_mer_lengths (list, optional): k-mer lengths of the k-mer stages. Defaults to 9 and 12.
+    - distances (list, optional): Hamming distances of the neighbourhood and frequency stages. Defaults to 0, 1 and 2.
+    - repeat (int, optional): Calls per stage, the best is reported. Defaults to 3.
+    - region_length (int, optional): Length of the analyzed region. Defaults to 1000.
+
+    Returns:
+    - dict: Best time in seconds per benchmark, e.g. "gc_skew[1Mb]" or "frequency[1Mb,k=9,d=1]".
+    """
+    results = {}
+    for size in sizes:
+        length = GENOME_SIZES[size] if size in GENOME_SIZES else int(size)
+        genome = synthetic_genome(length)
+
+        with tempfile.TemporaryDirectory() as directory:
+            genome_path = os.path.join(directory, "genome.fasta")
+            with open(genome_path, "w") as file:
+                file.write(">synthetic\n")
+                file.writelines(genome[pos:pos + 80] + "\n" for pos in range(0, length, 80))
+            results[f"read_sequence[{size}]"] = measure(lambda: read_sequence(genome_path), repeat)
+
+        results[f"gc_skew[{size}]"] = measure(lambda: calculate_gc_skew(genome), repeat)
+        skew_array = calculate_gc_skew(genome)
+        results[f"min_max_skew[{size}]"] = measure(lambda: min_max_skew(skew_array), repeat)
+
+        start = min_max_skew(skew_array)[0][0]
+        region = (min(start, length - region_length), min(start, length - region_length) + region_length - 1)
+        for k_mer_length in k_mer_lengths:
+            results[f"generate_k_mers[{size},k={k_mer_length}]"] = measure(
+                lambda: generate_k_mers(genome, k_mer_length, (0, length - 1)), repeat)
+            k_mers = generate_k_mers(genome, k_mer_length, region)
+            for distance in distances:
+                name = f"{size},k={k_mer_length},d={distance}"
+                results[f"neighbourhood[{name}]"] = measure(
+                    lambda: neighbourhood_dictionary(k_mers, distance, reverse_complement=True), repeat)
+                neighbourhood = neighbourhood_dictionary(k_mers, distance, reverse_complement=True)
+                results[f"frequency[{name}]"] = measure(lambda: pattern_frequency(genome, region, neighbourhood), repeat)
+
+    return results
+
+def compare(results: dict, baseline: dict, threshold: float = REGRESSION_THRESHOLD) -> list:
+    """
+    Finds benchmarks that are slower than their baseline by more than the threshold.
+
+    Parameters:
+    - results (dict): Current times per benchmark.
+    - baseline (dict): Baseline times per benchmark; benchmarks without baseline are skipped.
+    - threshold (float, optional): Allowed ratio of current to baseline time. Defaults to 1.25.
+
+    Returns:
+    - list: (name, baseline seconds, current seconds, ratio) of every regression.
+    """
+    regressions = []
+    for name, seconds in results.items():
+        if name in baseline and seconds > threshold * baseline[name]:
+            regressions.append((name, baseline[name], seconds, seconds / baseline[name]))
+    return regressions
+
+def parse_arguments(argv: list = None) -> argparse.Namespace:
+    """
+    Parses the command line arguments of the benchmark harness.
+
+    Parameters:
+    - argv (list, optional): Command line arguments. Defaults to None, which uses sys.argv.
+
+    Returns:
+    - argparse.Namespace: Parsed arguments.
+    """
+    parser = argparse.ArgumentParser(description="Benchmark the stages of the ori pipeline on synthetic genomes.")
+    parser.add_argument("--sizes", nargs="+", default=list(GENOME_SIZES),
+                        help="Genome sizes, names like 1Mb or numbers of bases. Defaults to 100kb 1Mb 5Mb 20Mb.")
+    parser.add_argument("-k", "--k-mer-lengths", nargs="+", type=int, default=list(K_MER_LENGTHS),
+                        help="k-mer lengths. Defaults to 9 12.")
+    parser.add_argument("-d", "--distances", nargs="+", type=int, default=list(DISTANCES),
+                        help="Hamming distances. Defaults to 0 1 2.")
+    parser.add_argument("-r", "--repeat", type=int, default=3, help="Calls per benchmark. Defaults to 3.")
+    parser.add_argument("--baseline", default=BASELINE_PATH, help="Baseline file. Defaults to benchmarks/baselines.json.")
+    parser.add_argument("--save-baseline", action="store_true",
+                        help="Store the results as new baseline instead of comparing against it.")
+    parser.add_argument("--threshold", type=float, default=REGRESSION_THRESHOLD,
+                        help="Allowed slowdown relative to the baseline. Defaults to 1.25.")
+    parser.add_argument("-o", "--output", default=None, help="Write the results as JSON to this file.")
+    return parser.parse_args(argv)
+
+def main(argv: list = None) -> int:
+    """
+    Runs the benchmarks and compares them against the stored baselines.
+
+    Parameters:
+    - argv (list, optional): Command line arguments. Defaults to None, which uses sys.argv.
+
+    Returns:
+    - int: Exit code, 1 if any benchmark regressed.
+    """
+    arguments = parse_arguments(argv)
+    results = run_benchmarks(arguments.sizes, arguments.k_mer_lengths, arguments.distances, arguments.repeat)
+    report = {"machine": {"python": platform.python_version(), "numpy": np.__version__,
+                          "processor": platform.processor() or platform.machine()},
+              "results": results}
+
+    for name, seconds in results.items():
+        print(f"{name:<40} {seconds * 1000:10.2f} ms")
+    if arguments.output:
+        with open(arguments.output, "w") as file:
+            json.dump(report, file, indent=2)
+
+    if arguments.save_baseline:
+        # Merge into existing baselines, so that sizes can be recorded separately
+        baseline = {}
+        if os.path.exists(arguments.baseline):
+            with open(arguments.baseline) as file:
+                baseline = json.load(file)["results"]
+        report["results"] = {**baseline, **results}
+        with open(arguments.baseline, "w") as file:
+            json.dump(report, file, indent=2, sort_keys=True)
+        return 0
+
+    if not os.path.exists(arguments.baseline):
+        print(f"No baseline at {arguments.baseline}, run with --save-baseline first.")
+        return 0
+    with open(arguments.baseline) as file:
+        baseline = json.load(file)["results"]
+    regressions = compare(results, baseline, arguments.threshold)
+    for name, baseline_seconds, seconds, ratio in regressions:
+        print(f"Regression in {name}: {baseline_seconds * 1000:.2f} ms -> {seconds * 1000:.2f} ms ({ratio:.2f}x)")
+    return 1 if regressions else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
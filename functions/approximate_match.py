@@ -0,0 +1,91 @@
+import numpy as np
+
+from functions.encoding import MAX_K_MER_LENGTH, encode_k_mers, reverse_complement_codes
+from functions.k_mer_index import KMerIndex
+from functions.neighbourhood import hamming_masks
+from functions.packed_sequence import PackedSequence
+
+# Strands accepted by approximate_match
+STRANDS = ("forward", "reverse", "both")
+
+def approximate_match(sequence, patterns: list, distance: int, strand: str = "forward", k_mer_index=None) -> dict:
+    """
+    Finds all positions where a pattern occurs with at most 'distance' mismatches.
+
+    The positions of all k-mers of the sequence are indexed by code once per pattern length. The
+    d-neighbourhood of every pattern, given by the XOR masks of hamming_masks, is then looked up with a
+    binary search, so the cost depends on the number of hits instead of genome length times patterns.
+
+    Parameters:
+    - sequence (str | PackedSequence): The input DNA sequence.
+    - patterns (list): Patterns consisting of A, C, G and T.
+    - distance (int): The maximum hamming distance.
+    - strand (str, optional): "forward" matches the patterns, "reverse" their reverse complements, "both"
+    either of them. Defaults to "forward".
+    - k_mer_index (KMerIndex, optional): Saved index of the sequence, used for patterns of its k-mer length.
+    Defaults to None.
+
+    Returns:
+    - dict: Sorted int64 NumPy array of the start positions of matches for every pattern.
+
+    Example:
+    >>> approximate_match("CGCCCGAATCCAGAACGCATTCCCATATTTCGGGACCACTGGCCTCCACGGTACGGACGTCAATCAAAT", ["ATTCTGGA"], 3)
+    {'ATTCTGGA': array([ 6,  7, 26, 27])}
+    """
+    # Check for correct data types
+    if not isinstance(sequence, (str, PackedSequence)) or not isinstance(patterns, list) or not isinstance(distance, int):
+        raise ValueError("Input sequence as string, patterns as list and distance as integer.")
+    # Check parameter values
+    if len(sequence) == 0:
+        raise ValueError("Empty sequence.")
+    if distance < 0:
+        raise ValueError("Invalid distance. Please provide a non-negative integer.")
+    if strand not in STRANDS:
+        raise ValueError(f"Invalid strand. Please provide one of {', '.join(STRANDS)}.")
+
+    matches = {}
+    indices = {}
+    for k_mer_length in sorted({len(pattern) for pattern in patterns}):
+        # Patterns of equal length share one index and are looked up together
+        group = list(dict.fromkeys(pattern for pattern in patterns if len(pattern) == k_mer_length))
+        if not 0 < k_mer_length <= MAX_K_MER_LENGTH:
+            raise ValueError(f"Invalid pattern length. Please provide patterns of length 1 to {MAX_K_MER_LENGTH}.")
+        codes, valid = encode_k_mers(group, k_mer_length)
+        if not valid.all():
+            raise ValueError("Invalid pattern. Patterns must consist of A, C, G and T.")
+
+        # Patterns longer than the sequence cannot match
+        if k_mer_length > len(sequence):
+            matches.update({pattern: np.zeros(0, dtype=np.int64) for pattern in group})
+            continue
+        if k_mer_length not in indices:
+            if k_mer_index is not None and k_mer_index.k_mer_length == k_mer_length:
+                indices[k_mer_length] = k_mer_index
+            else:
+                indices[k_mer_length] = KMerIndex.build(sequence, k_mer_length)
+
+        strand_codes = []
+        if strand in ("forward", "both"):
+            strand_codes.append(codes)
+        if strand in ("reverse", "both"):
+            strand_codes.append(reverse_complement_codes(codes, k_mer_length))
+
+        # Every pattern and strand contributes its whole d-neighbourhood as queries
+        masks = hamming_masks(k_mer_length, distance)
+        query_codes = np.concatenate([(values[:, None] ^ masks[None, :]).ravel() for values in strand_codes])
+        query_ids, positions = indices[k_mer_length].lookup(query_codes)
+        pattern_ids = query_ids // len(masks) % len(group)
+
+        # Sort the hits by pattern and position and drop windows matching both strands twice
+        order = np.lexsort((positions, pattern_ids))
+        pattern_ids, positions = pattern_ids[order], positions[order]
+        unique = np.ones(len(positions), dtype=bool)
+        unique[1:] = (pattern_ids[1:] != pattern_ids[:-1]) | (positions[1:] != positions[:-1])
+        pattern_ids, positions = pattern_ids[unique], positions[unique]
+
+        bounds = np.searchsorted(pattern_ids, np.arange(len(group) + 1))
+        for pattern_id, pattern in enumerate(group):
+            matches[pattern] = positions[bounds[pattern_id]:bounds[pattern_id + 1]]
+
+    # Keep the order of the given patterns
+    return {pattern: matches[pattern] for pattern in patterns}
@@ -0,0 +1,97 @@
+import numpy as np
+
+from functions.encoding import MAX_K_MER_LENGTH, decode_k_mers, reverse_complement_codes, rolling_k_mer_codes, sequence_codes
+from functions.neighbourhood import hamming_masks
+from functions.packed_sequence import PackedSequence
+
+# Number of (pattern, position) pairs expanded at once
+CLUMP_BLOCK_ENTRIES = 2**18
+
+def _clump_codes(window_codes: np.ndarray, positions: np.ndarray, masks: np.ndarray, k_mer_length: int,
+                 span: int, threshold: int, reverse_complement: bool) -> np.ndarray:
+    """
+    Codes of the patterns forming a clump among the given windows.
+
+    Every window is expanded into the patterns within the Hamming distance, given by the XOR masks. After
+    sorting the (pattern, position) pairs, a pattern forms a clump if its occurrence threshold - 1 places
+    further lies at most 'span' positions downstream.
+    """
+    codes = [window_codes]
+    if reverse_complement:
+        # Hamming(rc(pattern), window) equals Hamming(pattern, rc(window))
+        codes.append(reverse_complement_codes(window_codes, k_mer_length))
+
+    position_bits = max(int(positions[-1] - positions[0]).bit_length(), 1)
+    if 2 * k_mer_length + position_bits <= 63:
+        # Pack pattern and position into one key, so that a single sort orders the pairs
+        local_positions = positions - positions[0]
+        keys = np.concatenate([(((strand_codes << position_bits) | local_positions)[:, None]
+                                ^ (masks << position_bits)[None, :]).ravel() for strand_codes in codes])
+        keys.sort()
+        patterns, hit_positions = keys >> position_bits, keys & ((1 << position_bits) - 1)
+    else:
+        patterns = np.concatenate([(strand_codes[:, None] ^ masks[None, :]).ravel() for strand_codes in codes])
+        hit_positions = np.tile(np.repeat(positions, len(masks)), len(codes))
+        order = np.lexsort((hit_positions, patterns))
+        patterns, hit_positions = patterns[order], hit_positions[order]
+
+    if reverse_complement:
+        # A window matching both strands counts once
+        unique = np.concatenate(([True], (patterns[1:] != patterns[:-1]) | (hit_positions[1:] != hit_positions[:-1])))
+        patterns, hit_positions = patterns[unique], hit_positions[unique]
+
+    if threshold == 1:
+        return np.unique(patterns)
+    last = threshold - 1
+    clumps = (patterns[last:] == patterns[:-last]) & (hit_positions[last:] - hit_positions[:-last] <= span)
+    return np.unique(patterns[last:][clumps])
+
+def find_clumps(sequence: str, k_mer_length: int, window: int, threshold: int, distance: int = 0,
+                reverse_complement: bool = False) -> list:
+    """
+    Finds all k-mers forming (L, t)-clumps, i.e. occurring at least t times within some window of length L.
+
+    Occurrences are windows within a Hamming distance of the k-mer, or of its reverse complement if
+    reverse_complement is set; a position counts once even if it matches both strands. The genome is
+    processed in blocks of windows that overlap by L - k positions, so every clump lies within one block.
+
+    Parameters:
+    - sequence (str | PackedSequence): The input DNA sequence.
+    - k_mer_length (int): Length of the k-mers.
+    - window (int): Length L of the window.
+    - threshold (int): Minimum number t of occurrences within a window.
+    - distance (int, optional): The maximum hamming distance of occurrences. Defaults to 0.
+    - reverse_complement (bool, optional): Count occurrences of the reverse complement. Defaults to False.
+
+    Returns:
+    - list: Sorted list of the k-mers forming clumps.
+    """
+    # Check for correct data types
+    if not isinstance(sequence, (str, PackedSequence)) or not all(isinstance(value, int) for value in (k_mer_length, window, threshold, distance)):
+        raise ValueError("Input sequence as string and k_mer_length, window, threshold and distance as integers.")
+    # Check parameter values
+    if not 0 < k_mer_length <= MAX_K_MER_LENGTH:
+        raise ValueError(f"Invalid k-mer length. Please provide k-mers of length 1 to {MAX_K_MER_LENGTH}.")
+    if not k_mer_length <= window <= len(sequence):
+        raise ValueError("Invalid window. Please provide a window between the k-mer length and the sequence length.")
+    if threshold <= 0 or distance < 0:
+        raise ValueError("Invalid threshold or distance. Please provide a positive threshold and non-negative distance.")
+
+    if isinstance(sequence, PackedSequence):
+        window_codes, valid = sequence.k_mer_codes(k_mer_length)
+    else:
+        window_codes, valid = rolling_k_mer_codes(sequence_codes(sequence), k_mer_length)
+
+    masks = hamming_masks(k_mer_length, distance)
+    span = window - k_mer_length
+    # Blocks hold at least one full window of positions
+    block_size = max(CLUMP_BLOCK_ENTRIES // (len(masks) * (2 if reverse_complement else 1)), span + 1)
+
+    clumps = [np.zeros(0, dtype=np.int64)]
+    for start in range(0, max(len(window_codes) - span, 1), block_size):
+        positions = start + np.flatnonzero(valid[start:start + block_size + span])
+        if len(positions) >= threshold:
+            clumps.append(_clump_codes(window_codes[positions], positions, masks, k_mer_length, span, threshold,
+                                       reverse_complement))
+
+    return decode_k_mers(np.unique(np.concatenate(clumps)), k_mer_length)
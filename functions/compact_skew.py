@@ -0,0 +1,297 @@
+import numpy as np
+
+from functions.gc_skew import SKEW_CODE_LOOKUP, SKEW_LOOKUP
+from functions.packed_sequence import PackedSequence
+
+# Skew scores per block, a multiple of 4 so that every block starts at a byte of the packed steps
+BLOCK_SIZE = 2**12
+# Blocks encoded or decoded at once when streaming over the whole skew
+CHUNK_BLOCKS = 2**8
+
+def _pack_steps(steps: np.ndarray) -> np.ndarray:
+    """
+    Pack skew steps (-1, 0, +1) as 2-bit codes (0, 1, 2), four per byte; padding steps are 0.
+    """
+    codes = np.ones(-(-len(steps) // 4) * 4, dtype=np.uint8)
+    codes[:len(steps)] = steps + 1
+    codes = codes.reshape(-1, 4)
+    return (codes[:, 0] << 6) | (codes[:, 1] << 4) | (codes[:, 2] << 2) | codes[:, 3]
+
+class CompactSkew():
+    """
+    GC skew array stored as 2-bit steps with periodic checkpoints, about 16 times smaller than int32.
+
+    Consecutive skew scores differ by -1, 0 or +1, so every step fits into 2 bits. For each block of
+    block_size scores the first score (checkpoint) and the block minimum and maximum are kept. A score is
+    the checkpoint of its block plus the sum of the preceding steps of the block, so random access and
+    slices decode at most one block more than requested. Extrema are found from the block extrema and
+    only blocks reaching them are decoded.
+    """
+
+    def __init__(self, packed_steps: np.ndarray, length: int, checkpoints: np.ndarray, minima: np.ndarray,
+                 maxima: np.ndarray, block_size: int = BLOCK_SIZE):
+        """
+        Parameters:
+        - packed_steps (np.ndarray): uint8 array with four 2-bit steps per byte.
+        - length (int): Number of skew scores, one more than the number of steps.
+        - checkpoints (np.ndarray): int32 first score of every block.
+        - minima (np.ndarray): int32 minimum score of every block.
+        - maxima (np.ndarray): int32 maximum score of every block.
+        - block_size (int, optional): Number of scores per block. Defaults to 4096.
+        """
+        self._packed = packed_steps
+        self._length = length
+        self.checkpoints = checkpoints
+        self.minima = minima
+        self.maxima = maxima
+        self.block_size = block_size
+
+    @classmethod
+    def _build(cls, step_chunks, step_count: int, start: int, block_size: int) -> "CompactSkew":
+        """
+        Encode a skew given as chunks of steps, each a multiple of the block size except the last one.
+        """
+        # Check block size
+        if not isinstance(block_size, int) or block_size <= 0 or block_size % 4 != 0:
+            raise ValueError("Invalid block size. Please provide a positive multiple of 4.")
+
+        packed_parts, checkpoints, minima, maxima = [], [], [], []
+        current = start
+        processed = 0
+        for steps in step_chunks:
+            processed += len(steps)
+            prefix = np.cumsum(steps, dtype=np.int32) + np.int32(current)
+            # Scores of the chunk; the score after the last step starts the next chunk
+            scores = np.concatenate((np.array([current], dtype=np.int32), prefix if processed == step_count else prefix[:-1]))
+            if len(prefix) > 0:
+                current = int(prefix[-1])
+
+            # Pad the last block with its last score, which changes neither minimum nor maximum
+            rows = -(-len(scores) // block_size)
+            blocks = np.full(rows * block_size, scores[-1], dtype=np.int32)
+            blocks[:len(scores)] = scores
+            blocks = blocks.reshape(rows, block_size)
+            checkpoints.append(blocks[:, 0])
+            minima.append(blocks.min(axis=1))
+            maxima.append(blocks.max(axis=1))
+            packed_parts.append(_pack_steps(steps))
+
+        return cls(np.concatenate(packed_parts), step_count + 1, np.concatenate(checkpoints), np.concatenate(minima),
+                   np.concatenate(maxima), block_size)
+
+    @classmethod
+    def from_sequence(cls, sequence, block_size: int = BLOCK_SIZE) -> "CompactSkew":
+        """
+        Calculate the compact GC skew of a sequence without building the int32 skew array.
+
+        Parameters:
+        - sequence (str | bytes | PackedSequence): DNA sequence.
+        - block_size (int, optional): Number of scores per block, a multiple of 4. Defaults to 4096.
+
+        Returns:
+        - CompactSkew: The skew, equal to calculate_gc_skew of the sequence.
+        """
+        # Check for correct data type and value
+        if not isinstance(sequence, (str, bytes, PackedSequence)):
+            raise ValueError("Input sequence as string, bytes or PackedSequence.")
+        if len(sequence) == 0:
+            raise ValueError("Empty sequence")
+
+        def step_chunks():
+            chunk_size = block_size * CHUNK_BLOCKS
+            for start in range(0, len(sequence), chunk_size):
+                if isinstance(sequence, PackedSequence):
+                    yield SKEW_CODE_LOOKUP[sequence.codes(start, min(start + chunk_size, len(sequence)))]
+                    continue
+                part = sequence[start:start + chunk_size]
+                if isinstance(part, str):
+                    part = part.encode("ascii", errors="replace")
+                yield SKEW_LOOKUP[np.frombuffer(part, dtype=np.uint8)]
+
+        return cls._build(step_chunks(), len(sequence), 0, block_size)
+
+    @classmethod
+    def from_array(cls, skew_array, block_size: int = BLOCK_SIZE) -> "CompactSkew":
+        """
+        Compress an existing skew array.
+
+        Parameters:
+        - skew_array (np.ndarray | list): GC skew scores whose consecutive values differ by at most 1.
+        - block_size (int, optional): Number of scores per block, a multiple of 4. Defaults to 4096.
+
+        Returns:
+        - CompactSkew: The compressed skew.
+        """
+        skew_array = np.asarray(skew_array)
+        # Check that skew array is not empty and consists of unit steps
+        if len(skew_array) == 0:
+            raise ValueError("Empty skew_array")
+        steps = np.diff(skew_array)
+        if len(steps) > 0 and np.abs(steps).max() > 1:
+            raise ValueError("Invalid skew_array. Consecutive scores must differ by at most 1.")
+
+        chunk_size = block_size * CHUNK_BLOCKS
+        step_chunks = (steps[start:start + chunk_size].astype(np.int8) for start in range(0, max(len(steps), 1), chunk_size))
+        return cls._build(step_chunks, len(steps), int(skew_array[0]), block_size)
+
+    def __len__(self) -> int:
+        """
+        Number of skew scores.
+        """
+        return self._length
+
+    def __repr__(self) -> str:
+        return f"CompactSkew(length={self._length}, block_size={self.block_size})"
+
+    @property
+    def nbytes(self) -> int:
+        """
+        Number of bytes used by the packed steps, checkpoints and block extrema.
+        """
+        return self._packed.nbytes + self.checkpoints.nbytes + self.minima.nbytes + self.maxima.nbytes
+
+    def _steps(self, first: int, last: int) -> np.ndarray:
+        """
+        Unpack the steps first to last - 1, the step i leading from score i to score i + 1.
+        """
+        packed = self._packed[first // 4:-(-last // 4)]
+        codes = np.empty((len(packed), 4), dtype=np.int8)
+        for column, shift in enumerate((6, 4, 2, 0)):
+            codes[:, column] = (packed >> shift) & 3
+        return codes.ravel()[first % 4:first % 4 + last - first] - 1
+
+    def decode(self, start: int = 0, stop: int = None) -> np.ndarray:
+        """
+        Decompress the scores start to stop - 1.
+
+        Parameters:
+        - start (int, optional): First position. Defaults to 0.
+        - stop (int, optional): Position after the last score. Defaults to the length of the skew.
+
+        Returns:
+        - np.ndarray: int32 scores.
+        """
+        stop = self._length if stop is None else stop
+        # Check range
+        if not 0 <= start <= stop <= self._length:
+            raise ValueError("Invalid range. Please provide a range within the length of the skew.")
+        if start == stop:
+            return np.zeros(0, dtype=np.int32)
+
+        # Continue from the checkpoint of the block containing the start
+        block = start // self.block_size
+        first = block * self.block_size
+        scores = np.empty(stop - first, dtype=np.int32)
+        scores[0] = self.checkpoints[block]
+        np.cumsum(self._steps(first, stop - 1), dtype=np.int32, out=scores[1:])
+        scores[1:] += scores[0]
+        return scores[start - first:]
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            start, stop, step = index.indices(self._length)
+            if step < 0:
+                return self.decode(stop + 1, start + 1)[::step] if start > stop else np.zeros(0, dtype=np.int32)
+            return self.decode(start, max(start, stop))[::step]
+
+        # Check index
+        if index < 0:
+            index += self._length
+        if not 0 <= index < self._length:
+            raise IndexError("Skew index out of range.")
+        block, offset = divmod(index, self.block_size)
+        first = block * self.block_size
+        return int(self.checkpoints[block]) + int(self._steps(first, first + offset).sum())
+
+    def iter_blocks(self, block_count: int = CHUNK_BLOCKS):
+        """
+        Decompress the skew block-wise.
+
+        Parameters:
+        - block_count (int, optional): Number of blocks decoded at once. Defaults to 256.
+
+        Yields:
+        - int: Position of the first score.
+        - np.ndarray: int32 scores of the blocks.
+        """
+        chunk_size = self.block_size * block_count
+        for start in range(0, self._length, chunk_size):
+            yield start, self.decode(start, min(start + chunk_size, self._length))
+
+    def to_array(self) -> np.ndarray:
+        """
+        Materialize the skew array.
+
+        Returns:
+        - np.ndarray: int32 array of GC skew scores.
+        """
+        return self.decode(0, self._length)
+
+    def min_max(self, tolerance: float = 0) -> tuple:
+        """
+        Positions of the minimum and maximum skew, decoding only blocks that reach the tolerance band.
+
+        Parameters:
+        - tolerance (float, optional): Also report positions within this distance of the extremum. Defaults to 0.
+
+        Returns:
+        - list: Positions where the skew is minimum, as returned by min_max_skew.
+        - list: Positions where the skew is maximum.
+        """
+        # Check for non-negative tolerance
+        if tolerance < 0:
+            raise ValueError("Negative tolerance.")
+
+        lower = self.minima.min() + tolerance
+        upper = self.maxima.max() - tolerance
+        minimum_positions, maximum_positions = [], []
+        for block in np.flatnonzero((self.minima <= lower) | (self.maxima >= upper)).tolist():
+            start = block * self.block_size
+            scores = self.decode(start, min(start + self.block_size, self._length))
+            if self.minima[block] <= lower:
+                minimum_positions += (start + np.flatnonzero(scores <= lower)).tolist()
+            if self.maxima[block] >= upper:
+                maximum_positions += (start + np.flatnonzero(scores >= upper)).tolist()
+        return minimum_positions, maximum_positions
+
+    def decimate(self, bins: int) -> tuple:
+        """
+        Reduce the skew to the minimum and maximum of each of 'bins' equally sized bins, like decimate_skew.
+
+        Bins are decoded in chunks, so the full skew array is never materialized.
+
+        Parameters:
+        - bins (int): Number of bins.
+
+        Returns:
+        - np.ndarray: Positions of the retained scores.
+        - np.ndarray: Retained GC skew scores.
+        """
+        # Check number of bins
+        if not isinstance(bins, int) or bins <= 0:
+            raise ValueError("Invalid number of bins. Please provide a positive integer.")
+        # Skews with at most two scores per bin are returned unchanged
+        if self._length <= 2 * bins:
+            return np.arange(self._length), self.to_array()
+
+        bin_size = -(-self._length // bins)
+        rows = -(-self._length // bin_size)
+        rows_per_chunk = max(1, self.block_size * CHUNK_BLOCKS // bin_size)
+        position_parts, score_parts = [], []
+        for first_row in range(0, rows, rows_per_chunk):
+            chunk_rows = min(rows_per_chunk, rows - first_row)
+            start = first_row * bin_size
+            scores = self.decode(start, min(start + chunk_rows * bin_size, self._length))
+            # Pad the last bin with the last score
+            padded = np.full(chunk_rows * bin_size, scores[-1], dtype=np.int32)
+            padded[:len(scores)] = scores
+            padded = padded.reshape(chunk_rows, bin_size)
+
+            offsets = np.arange(chunk_rows) * bin_size
+            # Keep both extrema of each bin in positional order
+            positions = np.sort(np.stack((offsets + padded.argmin(axis=1), offsets + padded.argmax(axis=1)), axis=1),
+                                axis=1).ravel()
+            positions = np.minimum(positions, self._length - 1 - start)
+            position_parts.append(start + positions)
+            score_parts.append(padded.ravel()[positions])
+        return np.concatenate(position_parts), np.concatenate(score_parts)
@@ -0,0 +1,208 @@
+import numpy as np
+
+# Nucleotides in the order of their 2-bit codes (A=0, C=1, G=2, T=3), so that sorting codes sorts k-mers
+NUCLEOTIDES = "ACGT"
+# Code assigned to every symbol that is not one of A, C, G or T
+INVALID_CODE = 4
+# Longest k-mer whose code fits into a signed 64-bit integer
+MAX_K_MER_LENGTH = 31
+
+def _code_lookup_table() -> np.ndarray:
+    """
+    Build a 256-entry lookup table mapping ASCII codes to 2-bit nucleotide codes.
+    """
+    table = np.full(256, INVALID_CODE, dtype=np.uint8)
+    for code, nucleotide in enumerate(NUCLEOTIDES):
+        table[ord(nucleotide)] = code
+    return table
+
+CODE_LOOKUP = _code_lookup_table()
+# ASCII values of the nucleotides, indexed by code
+NUCLEOTIDE_BYTES = np.frombuffer(NUCLEOTIDES.encode("ascii"), dtype=np.uint8)
+
+def sequence_codes(sequence) -> np.ndarray:
+    """
+    Translate a DNA sequence into an array of 2-bit nucleotide codes.
+
+    Parameters:
+    - sequence (str | bytes): The input DNA sequence.
+
+    Returns:
+    - np.ndarray: uint8 array with one code per base; symbols other than A, C, G, T are set to INVALID_CODE.
+    """
+    if isinstance(sequence, str):
+        sequence = sequence.encode("ascii", errors="replace")
+    return CODE_LOOKUP[np.frombuffer(sequence, dtype=np.uint8)]
+
+def encode_k_mer(k_mer: str) -> int:
+    """
+    Encode a k-mer as integer with 2 bits per base, the first base in the most significant bits.
+
+    Parameters:
+    - k_mer (str): k-mer consisting of A, C, G and T.
+
+    Returns:
+    - int: Integer code of the k-mer.
+
+    Example:
+    >>> encode_k_mer("ACT")
+    7
+    """
+    # Check k-mer length and alphabet
+    if not 0 < len(k_mer) <= MAX_K_MER_LENGTH:
+        raise ValueError(f"Invalid k-mer length. Please provide k-mers of length 1 to {MAX_K_MER_LENGTH}.")
+
+    code = 0
+    for nucleotide in k_mer:
+        index = NUCLEOTIDES.find(nucleotide)
+        if index < 0:
+            raise ValueError(f"Invalid nucleotide {nucleotide!r}. Only A, C, G and T can be encoded.")
+        code = (code << 2) | index
+
+    return code
+
+def encode_k_mers(k_mers: list, k_mer_length: int) -> tuple:
+    """
+    Encode a list of k-mers of equal length as integer codes.
+
+    Parameters:
+    - k_mers (list): k-mers, all of length k_mer_length.
+    - k_mer_length (int): Length of the k-mers.
+
+    Returns:
+    - np.ndarray: int64 codes of the k-mers.
+    - np.ndarray: Boolean array, False for k-mers containing other symbols than A, C, G and T.
+    """
+    # Check k-mer length
+    if not 0 < k_mer_length <= MAX_K_MER_LENGTH:
+        raise ValueError(f"Invalid k-mer length. Please provide k-mers of length 1 to {MAX_K_MER_LENGTH}.")
+
+    # Translate all k-mers at once into a (number of k-mers x k) code matrix
+    codes = sequence_codes("".join(k_mers)).reshape(-1, k_mer_length)
+    valid = (codes != INVALID_CODE).all(axis=1)
+    weights = 1 << np.arange(2 * (k_mer_length - 1), -1, -2, dtype=np.int64)
+
+    return (codes.astype(np.int64) * weights).sum(axis=1), valid
+
+def decode_k_mer(code: int, k_mer_length: int) -> str:
+    """
+    Decode an integer k-mer code back into its string.
+
+    Parameters:
+    - code (int): Integer code of the k-mer.
+    - k_mer_length (int): Length of the k-mer.
+
+    Returns:
+    - str: The decoded k-mer.
+    """
+    code = int(code)
+    nucleotides = []
+    for shift in range(2 * (k_mer_length - 1), -1, -2):
+        nucleotides.append(NUCLEOTIDES[(code >> shift) & 3])
+
+    return "".join(nucleotides)
+
+def decode_k_mers(codes: np.ndarray, k_mer_length: int) -> list:
+    """
+    Decode an array of k-mer codes into a list of strings.
+
+    Parameters:
+    - codes (np.ndarray): Integer codes of the k-mers.
+    - k_mer_length (int): Length of the k-mers.
+
+    Returns:
+    - list: List of decoded k-mers in the order of the codes.
+    """
+    codes = np.asarray(codes, dtype=np.int64)
+    if len(codes) == 0:
+        return []
+
+    # Build a (number of codes x k) matrix of ASCII characters and cut its text into rows
+    shifts = np.arange(2 * (k_mer_length - 1), -1, -2, dtype=np.int64)
+    text = NUCLEOTIDE_BYTES[(codes[:, None] >> shifts) & 3].tobytes().decode("ascii")
+
+    return [text[pos:pos + k_mer_length] for pos in range(0, len(text), k_mer_length)]
+
+# Masks and shifts swapping ever larger groups of bits, which reverses the order of the 2-bit digits of a 64-bit word
+_DIGIT_SWAPS = ((0x3333333333333333, 2), (0x0F0F0F0F0F0F0F0F, 4), (0x00FF00FF00FF00FF, 8),
+                (0x0000FFFF0000FFFF, 16), (0x00000000FFFFFFFF, 32))
+_WORD_MASK = (1 << 64) - 1
+
+def reverse_complement_code(code: int, k_mer_length: int) -> int:
+    """
+    Reverse complement of a single k-mer code.
+
+    Complementing a base flips both bits of its code (A=0 <-> T=3, C=1 <-> G=2), so the complement of a
+    code is its bitwise NOT. The digits are then reversed within a 64-bit word by swapping neighbouring
+    bit groups of doubling size, and the k-mer is shifted back down.
+
+    Parameters:
+    - code (int): Integer code of the k-mer.
+    - k_mer_length (int): Length of the k-mer.
+
+    Returns:
+    - int: Integer code of the reverse complement.
+    """
+    reverse = ~int(code) & _WORD_MASK
+    for mask, shift in _DIGIT_SWAPS:
+        reverse = ((reverse >> shift) & mask) | ((reverse & mask) << shift)
+
+    return reverse >> (64 - 2 * k_mer_length)
+
+def reverse_complement_codes(codes: np.ndarray, k_mer_length: int) -> np.ndarray:
+    """
+    Reverse complements of an array of k-mer codes.
+
+    Uses the same bit operations as reverse_complement_code on unsigned 64-bit words, for all codes at once.
+
+    Parameters:
+    - codes (np.ndarray): Integer codes of the k-mers.
+    - k_mer_length (int): Length of the k-mers.
+
+    Returns:
+    - np.ndarray: int64 codes of the reverse complements.
+    """
+    reverse = ~np.asarray(codes, dtype=np.int64).astype(np.uint64)
+    for mask, shift in _DIGIT_SWAPS:
+        mask, shift = np.uint64(mask), np.uint64(shift)
+        reverse = ((reverse >> shift) & mask) | ((reverse & mask) << shift)
+
+    return (reverse >> np.uint64(64 - 2 * k_mer_length)).astype(np.int64)
+
+def rolling_k_mer_codes(codes: np.ndarray, k_mer_length: int) -> tuple:
+    """
+    Compute the integer codes of all windows of length k in an array of nucleotide codes.
+
+    Every window code equals the previous one shifted by one base, ((code << 2) | next) & mask;
+    this update is evaluated for all windows at once.
+
+    Parameters:
+    - codes (np.ndarray): uint8 nucleotide codes as returned by sequence_codes.
+    - k_mer_length (int): Length of the windows.
+
+    Returns:
+    - np.ndarray: int64 codes of the len(codes) - k + 1 windows.
+    - np.ndarray: Boolean array, False for windows that contain a symbol other than A, C, G or T.
+    """
+    # Check k-mer length
+    if not 0 < k_mer_length <= MAX_K_MER_LENGTH:
+        raise ValueError(f"Invalid k-mer length. Please provide k-mers of length 1 to {MAX_K_MER_LENGTH}.")
+
+    window_count = len(codes) - k_mer_length + 1
+    if window_count <= 0:
+        return np.zeros(0, dtype=np.int64), np.zeros(0, dtype=bool)
+
+    invalid = codes == INVALID_CODE
+    bases = np.where(invalid, 0, codes).astype(np.int64)
+
+    # Shift in one base per iteration for all windows simultaneously
+    window_codes = np.zeros(window_count, dtype=np.int64)
+    for offset in range(k_mer_length):
+        window_codes <<= 2
+        window_codes |= bases[offset:offset + window_count]
+
+    # Windows are valid if they do not contain any invalid symbol
+    invalid_sum = np.concatenate(([0], np.cumsum(invalid, dtype=np.int64)))
+    valid = (invalid_sum[k_mer_length:] - invalid_sum[:window_count]) == 0
+
+    return window_codes, valid
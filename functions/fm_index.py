@@ -0,0 +1,210 @@
+import numpy as np
+
+from functions.encoding import CODE_LOOKUP
+from functions.packed_sequence import PackedSequence
+
+# Symbol codes of the index text: the sentinel sorts before A, C, G and T, other symbols after them
+SENTINEL = 0
+OTHER_SYMBOL = 5
+# Translation of ASCII to index symbols (A=1, C=2, G=3, T=4)
+SYMBOL_LOOKUP = np.where(CODE_LOOKUP < 4, CODE_LOOKUP + 1, OTHER_SYMBOL).astype(np.uint8)
+# Index symbols of the complementary bases
+COMPLEMENT_SYMBOLS = np.array([SENTINEL, 4, 3, 2, 1, OTHER_SYMBOL], dtype=np.uint8)
+
+def _symbols(sequence) -> np.ndarray:
+    """
+    Translate a sequence into index symbols.
+    """
+    if isinstance(sequence, PackedSequence):
+        sequence = sequence.to_bytes()
+    if isinstance(sequence, str):
+        sequence = sequence.encode("ascii", errors="replace")
+    return SYMBOL_LOOKUP[np.frombuffer(sequence, dtype=np.uint8)]
+
+def suffix_array(symbols: np.ndarray) -> np.ndarray:
+    """
+    Build the suffix array of a text by prefix doubling.
+
+    Every round sorts the suffixes by the ranks of their first h symbols and of the h symbols that
+    follow, doubling h until all ranks are distinct. Each round is one vectorized sort.
+
+    Parameters:
+    - symbols (np.ndarray): Text as small integers, ending with a unique smallest sentinel.
+
+    Returns:
+    - np.ndarray: int64 start positions of the suffixes in lexicographic order.
+    """
+    length = len(symbols)
+    rank = symbols.astype(np.int64)
+    order = np.argsort(rank, kind="stable")
+    offset = 1
+    while True:
+        # Rank of the suffix 'offset' positions further, -1 beyond the end of the text
+        following = np.full(length, -1, dtype=np.int64)
+        following[:length - offset] = rank[offset:]
+        order = np.lexsort((following, rank))
+
+        # Suffixes keep equal ranks as long as both halves are equal
+        first, second = rank[order], following[order]
+        changed = np.concatenate(([0], (first[1:] != first[:-1]) | (second[1:] != second[:-1])))
+        rank = np.empty(length, dtype=np.int64)
+        rank[order] = np.cumsum(changed)
+        if changed.sum() == length - 1 or offset >= length:
+            return order
+        offset *= 2
+
+class FMIndex():
+    """
+    FM-index of a DNA sequence for exact and mismatch-tolerant search.
+
+    The index keeps the suffix array, the counts of smaller symbols and the occurrence table of the
+    Burrows-Wheeler transform. Patterns are searched backwards with backtracking over the substituted
+    bases, so the work depends on the distinct substrings within the distance instead of the size of the
+    d-neighbourhood. All partial matches of all patterns are extended together, one pattern position
+    per step.
+    """
+
+    def __init__(self, sequence):
+        """
+        Build the index.
+
+        Parameters:
+        - sequence (str | PackedSequence): The input DNA sequence.
+        """
+        # Check for correct data type and value
+        if not isinstance(sequence, (str, PackedSequence)):
+            raise ValueError("Input sequence as string.")
+        if len(sequence) == 0:
+            raise ValueError("Empty sequence.")
+
+        text = np.append(_symbols(sequence), np.uint8(SENTINEL))
+        self.suffix_array = suffix_array(text)
+        bwt = text[self.suffix_array - 1]
+
+        # Occurrences of A, C, G and T in the first i symbols of the transform
+        self.occurrences = np.zeros((len(text) + 1, 4), dtype=np.uint32)
+        for column, symbol in enumerate(range(1, 5)):
+            np.cumsum(bwt == symbol, out=self.occurrences[1:, column])
+        symbol_counts = np.bincount(text, minlength=OTHER_SYMBOL + 1)
+        self.smaller = np.cumsum(symbol_counts) - symbol_counts
+
+    def __len__(self) -> int:
+        """
+        Length of the indexed sequence.
+        """
+        return len(self.suffix_array) - 1
+
+    def search(self, patterns: list, distance: int = 0) -> tuple:
+        """
+        Suffix array intervals of all substrings within a Hamming distance of the patterns.
+
+        Parameters:
+        - patterns (list): Patterns of equal length.
+        - distance (int, optional): The maximum hamming distance. Defaults to 0.
+
+        Returns:
+        - np.ndarray: Pattern number of every interval.
+        - np.ndarray: Start of every interval in the suffix array.
+        - np.ndarray: Stop of every interval in the suffix array.
+        """
+        # Check pattern lengths and distance
+        if len({len(pattern) for pattern in patterns}) > 1:
+            raise ValueError("Invalid patterns. Please provide patterns of equal length.")
+        if distance < 0:
+            raise ValueError("Invalid distance. Please provide a non-negative integer.")
+
+        if len(patterns) == 0 or len(patterns[0]) == 0:
+            return np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.int64)
+        return self._search(_symbols("".join(patterns)).reshape(len(patterns), -1), distance)
+
+    def _search(self, pattern_symbols: np.ndarray, distance: int) -> tuple:
+        """
+        Backward search with backtracking for a matrix of pattern symbols, one pattern per row.
+        """
+        # Frontier of partial matches, starting with the whole suffix array for every pattern
+        pattern_ids = np.arange(len(pattern_symbols))
+        lower = np.zeros(len(pattern_symbols), dtype=np.int64)
+        upper = np.full(len(pattern_symbols), len(self.suffix_array), dtype=np.int64)
+        mismatches = np.zeros(len(pattern_symbols), dtype=np.int64)
+        for column in range(pattern_symbols.shape[1] - 1, -1, -1):
+            expected = pattern_symbols[pattern_ids, column]
+            candidates = []
+            for symbol in range(1, 5):
+                # Prepend the symbol to every partial match
+                symbol_lower = self.smaller[symbol] + self.occurrences[lower, symbol - 1].astype(np.int64)
+                symbol_upper = self.smaller[symbol] + self.occurrences[upper, symbol - 1].astype(np.int64)
+                symbol_mismatches = mismatches + (expected != symbol)
+                keep = (symbol_lower < symbol_upper) & (symbol_mismatches <= distance)
+                candidates.append((pattern_ids[keep], symbol_lower[keep], symbol_upper[keep], symbol_mismatches[keep]))
+            pattern_ids, lower, upper, mismatches = (np.concatenate(values) for values in zip(*candidates))
+
+        return pattern_ids, lower, upper
+
+    def positions(self, patterns: list, distance: int = 0, reverse_complement: bool = False) -> list:
+        """
+        Start positions of all substrings within a Hamming distance of each pattern.
+
+        Parameters:
+        - patterns (list): Patterns of equal length.
+        - distance (int, optional): The maximum hamming distance. Defaults to 0.
+        - reverse_complement (bool, optional): Also match the reverse complements of the patterns. Defaults to False.
+
+        Returns:
+        - list: Sorted int64 NumPy array of positions for every pattern.
+        """
+        # Check pattern lengths and distance
+        if len({len(pattern) for pattern in patterns}) > 1:
+            raise ValueError("Invalid patterns. Please provide patterns of equal length.")
+        if distance < 0:
+            raise ValueError("Invalid distance. Please provide a non-negative integer.")
+        if len(patterns) == 0:
+            return []
+
+        pattern_symbols = _symbols("".join(patterns)).reshape(len(patterns), -1)
+        if reverse_complement:
+            pattern_symbols = np.concatenate((pattern_symbols, COMPLEMENT_SYMBOLS[pattern_symbols][:, ::-1]))
+        pattern_ids, lower, upper = self._search(pattern_symbols, distance)
+        pattern_ids %= len(patterns)
+
+        # Expand the intervals into positions and drop positions matching both strands twice
+        lengths = upper - lower
+        hit_ids = np.repeat(pattern_ids, lengths)
+        entry_ids = np.arange(lengths.sum()) - np.repeat(np.cumsum(lengths) - lengths, lengths) + np.repeat(lower, lengths)
+        hits = np.unique(hit_ids * (len(self) + 1) + self.suffix_array[entry_ids])
+        hit_ids, hit_positions = hits // (len(self) + 1), hits % (len(self) + 1)
+
+        bounds = np.searchsorted(hit_ids, np.arange(len(patterns) + 1))
+        return [hit_positions[bounds[pattern_id]:bounds[pattern_id + 1]] for pattern_id in range(len(patterns))]
+
+def fm_pattern_frequency(sequence, seq_range: tuple, k_mers: list, distance: int, reverse_complement: bool = False) -> dict:
+    """
+    Determines the frequency of k-mers with mismatches in a range of a DNA sequence using an FM-index.
+
+    Equivalent to pattern_frequency with the neighbourhood dictionary of the k-mers, but no neighbourhood
+    is enumerated. Suited for long k-mers and large distances, where the neighbourhoods explode.
+
+    Parameters:
+    - sequence (str | PackedSequence): The input DNA sequence.
+    - seq_range (tuple): First and last position of the range.
+    - k_mers (list): k-mers of equal length consisting of A, C, G and T.
+    - distance (int): The maximum hamming distance.
+    - reverse_complement (bool, optional): Also count the reverse complements. Defaults to False.
+
+    Returns:
+    - dict: A dictionary where keys are k-mers and values are their frequencies, ordered like pattern_frequency.
+    """
+    # Check for correct data types
+    if not isinstance(sequence, (str, PackedSequence)) or not isinstance(seq_range, tuple) or not isinstance(k_mers, list):
+        raise ValueError("Input sequence as string, seq_range as tuple and k_mers as list.")
+    start, stop = seq_range
+    # Check sequence range values
+    if not 0 <= start < len(sequence) or not 0 <= stop < len(sequence) or not start < stop:
+        raise ValueError("Invalid sequence range. Please provide a valid range within the length of the sequence.")
+
+    fm_index = FMIndex(sequence[start:stop + 1])
+    k_mers = list(dict.fromkeys(k_mers))
+    matches = fm_index.positions(k_mers, distance, reverse_complement)
+
+    # Order by first match, then by the order of the k-mers
+    found = [(int(positions[0]), order) for order, positions in enumerate(matches) if len(positions) > 0]
+    return {k_mers[order]: len(matches[order]) for _, order in sorted(found)}
@@ -0,0 +1,213 @@
+import numpy as np
+
+from functions.encoding import decode_k_mers, encode_k_mers, reverse_complement_codes, rolling_k_mer_codes, sequence_codes
+from functions.neighbourhood import hamming_masks
+from functions.packed_sequence import PackedSequence
+
+# Longest k-mer with a dense frequency array, 4^12 entries of 8 bytes
+FREQUENCY_ARRAY_MAX_K_MER_LENGTH = 12
+# Codes or (code, neighbour) pairs processed at once, bounding the temporary arrays of the neighbourhood counts
+NEIGHBOUR_CHUNK_SIZE = 2**20
+
+def _check_k_mer_length(k_mer_length: int) -> None:
+    """
+    Validate the k-mer length of a frequency array.
+    """
+    if not isinstance(k_mer_length, int) or not 0 < k_mer_length <= FREQUENCY_ARRAY_MAX_K_MER_LENGTH:
+        raise ValueError(f"Invalid k-mer length. Frequency arrays support k-mers of length 1 to {FREQUENCY_ARRAY_MAX_K_MER_LENGTH}.")
+
+def _digit_mismatches(codes: np.ndarray, other_codes: np.ndarray, k_mer_length: int) -> np.ndarray:
+    """
+    Hamming distance between pairs of k-mer codes, the number of differing 2-bit digits.
+    """
+    difference = codes ^ other_codes
+    mismatches = np.zeros(difference.shape, dtype=np.int64)
+    for shift in range(0, 2 * k_mer_length, 2):
+        mismatches += ((difference >> shift) & 3) != 0
+    return mismatches
+
+def _neighbourhood_sums(counts: np.ndarray, codes: np.ndarray, masks: np.ndarray) -> np.ndarray:
+    """
+    Sum of the counts in the d-neighbourhood of every code, gathered NEIGHBOUR_CHUNK_SIZE neighbours at a time.
+    """
+    sums = np.empty(len(codes), dtype=np.int64)
+    rows = max(1, NEIGHBOUR_CHUNK_SIZE // len(masks))
+    for start in range(0, len(codes), rows):
+        block = codes[start:start + rows]
+        sums[start:start + len(block)] = counts[block[:, None] ^ masks[None, :]].sum(axis=1)
+    return sums
+
+def _shared_counts(counts: np.ndarray, codes: np.ndarray, reverse_codes: np.ndarray, masks: np.ndarray,
+                   k_mer_length: int, distance: int) -> np.ndarray:
+    """
+    Sum of the counts within the distance of both a code and its reverse complement, for every code.
+    """
+    shared = np.zeros(len(codes), dtype=np.int64)
+    # Neighbourhoods of a k-mer and its reverse complement only overlap if they are at most 2d apart
+    overlapping = np.flatnonzero(_digit_mismatches(codes, reverse_codes, k_mer_length) <= 2 * distance)
+    rows = max(1, NEIGHBOUR_CHUNK_SIZE // len(masks))
+    for start in range(0, len(overlapping), rows):
+        block = overlapping[start:start + rows]
+        neighbours = codes[block][:, None] ^ masks[None, :]
+        within = _digit_mismatches(neighbours, reverse_codes[block][:, None], k_mer_length) <= distance
+        shared[block] = (counts[neighbours] * within).sum(axis=1)
+    return shared
+
+def frequency_array(sequence, k_mer_length: int, seq_range: tuple = None) -> np.ndarray:
+    """
+    Counts the k-mers of a range of a DNA sequence in a dense array indexed by k-mer code.
+
+    The k-mers of the range are the codes with a non-zero count.
+
+    Parameters:
+    - sequence (str | PackedSequence): The input DNA sequence.
+    - k_mer_length (int): Length of the k-mers.
+    - seq_range (tuple, optional): First and last position of the range. Defaults to None, the whole sequence.
+
+    Returns:
+    - np.ndarray: int64 array of 4^k counts; windows with other symbols than A, C, G and T are not counted.
+    """
+    # Check for correct data types
+    if not isinstance(sequence, (str, PackedSequence)):
+        raise ValueError("Input sequence as string.")
+    _check_k_mer_length(k_mer_length)
+
+    start, stop = seq_range if seq_range is not None else (0, len(sequence) - 1)
+    # Check sequence range values
+    if not 0 <= start < len(sequence) or not 0 <= stop < len(sequence) or not start < stop:
+        raise ValueError("Invalid sequence range. Please provide a valid range within the length of the sequence.")
+
+    sequence_part = sequence[start:stop + 1]
+    if isinstance(sequence_part, PackedSequence):
+        window_codes, valid = sequence_part.k_mer_codes(k_mer_length)
+    else:
+        window_codes, valid = rolling_k_mer_codes(sequence_codes(sequence_part), k_mer_length)
+
+    return np.bincount(window_codes[valid], minlength=4**k_mer_length).astype(np.int64)
+
+def neighbourhood_frequency_array(counts: np.ndarray, k_mer_length: int, distance: int,
+                                  reverse_complement: bool = False, candidates: np.ndarray = None) -> np.ndarray:
+    """
+    Counts for every k-mer the windows within a Hamming distance of it, the array form of pattern_frequency.
+
+    The count of every occurring k-mer is scatter-added to its d-neighbourhood, given by the XOR masks
+    of hamming_masks. With reverse complements, the array is folded with its reverse complement
+    permutation; windows close to both strands of a k-mer are subtracted once, so every window counts
+    at most once per k-mer like in pattern_frequency. Neighbours are processed in chunks of
+    NEIGHBOUR_CHUNK_SIZE, so the temporary memory does not grow with the Hamming ball size. With
+    candidates, only their neighbourhoods are gathered, which costs O(candidates * ball size) instead of
+    O(4^k * ball size).
+
+    Parameters:
+    - counts (np.ndarray): k-mer counts as returned by frequency_array.
+    - k_mer_length (int): Length of the k-mers.
+    - distance (int): The maximum hamming distance.
+    - reverse_complement (bool, optional): Also count windows close to the reverse complement. Defaults to False.
+    - candidates (np.ndarray, optional): Boolean array of the k-mers to count, e.g. the k-mers of the range
+    (counts > 0). Defaults to None, all k-mers.
+
+    Returns:
+    - np.ndarray: int64 array of 4^k neighbourhood counts, 0 for k-mers that are not candidates.
+    """
+    _check_k_mer_length(k_mer_length)
+    # Check array sizes and distance
+    if len(counts) != 4**k_mer_length:
+        raise ValueError("Invalid counts. Please provide an array of 4^k counts.")
+    if candidates is not None and len(candidates) != len(counts):
+        raise ValueError("Invalid candidates. Please provide a boolean array of 4^k entries.")
+    if not isinstance(distance, int) or distance < 0:
+        raise ValueError("Invalid distance. Please provide a non-negative integer.")
+
+    masks = hamming_masks(k_mer_length, distance)
+    if candidates is not None:
+        # Only the neighbourhoods of the candidates and their reverse complements are gathered
+        codes = np.flatnonzero(candidates)
+        frequencies = np.zeros(len(counts), dtype=np.int64)
+        frequencies[codes] = _neighbourhood_sums(counts, codes, masks)
+        if reverse_complement:
+            reverse_codes = reverse_complement_codes(codes, k_mer_length)
+            frequencies[codes] += _neighbourhood_sums(counts, reverse_codes, masks) - \
+                _shared_counts(counts, codes, reverse_codes, masks, k_mer_length, distance)
+        return frequencies
+
+    frequencies = np.zeros(len(counts), dtype=np.int64)
+    present = np.flatnonzero(counts)
+    if len(present) * len(masks) <= 4 * len(counts):
+        # Few occurring k-mers are scattered into their neighbourhoods
+        rows = max(1, NEIGHBOUR_CHUNK_SIZE // len(masks))
+        for start in range(0, len(present), rows):
+            block = present[start:start + rows]
+            np.add.at(frequencies, (block[:, None] ^ masks[None, :]).ravel(), np.repeat(counts[block], len(masks)))
+    else:
+        # Dense counts are gathered once per mask, XOR with a mask permutes the codes
+        for start in range(0, len(counts), NEIGHBOUR_CHUNK_SIZE):
+            codes = np.arange(start, min(start + NEIGHBOUR_CHUNK_SIZE, len(counts)), dtype=np.int64)
+            for mask in masks.tolist():
+                frequencies[start:start + len(codes)] += counts[codes ^ mask]
+
+    if not reverse_complement:
+        return frequencies
+
+    folded = np.empty(len(counts), dtype=np.int64)
+    for start in range(0, len(counts), NEIGHBOUR_CHUNK_SIZE):
+        codes = np.arange(start, min(start + NEIGHBOUR_CHUNK_SIZE, len(counts)), dtype=np.int64)
+        reverse_codes = reverse_complement_codes(codes, k_mer_length)
+        folded[start:start + len(codes)] = frequencies[start:start + len(codes)] + frequencies[reverse_codes] - \
+            _shared_counts(counts, codes, reverse_codes, masks, k_mer_length, distance)
+    return folded
+
+def most_frequent_array(frequencies: np.ndarray, k_mer_length: int, candidates: np.ndarray = None) -> tuple:
+    """
+    Finds the most frequent patterns in a frequency array, the array form of most_frequent_patterns.
+
+    Parameters:
+    - frequencies (np.ndarray): Frequency array indexed by k-mer code.
+    - k_mer_length (int): Length of the k-mers.
+    - candidates (np.ndarray, optional): Boolean array of the patterns to consider, e.g. the k-mers of the
+    analyzed range (counts > 0). Defaults to None, all patterns.
+
+    Returns:
+    - tuple: Number of occurences, a list containing the most frequent patterns in lexicographic order.
+    """
+    if candidates is not None:
+        frequencies = np.where(candidates, frequencies, -1)
+    max_value = int(frequencies[np.argmax(frequencies)])
+    return max_value, decode_k_mers(np.flatnonzero(frequencies == max_value), k_mer_length)
+
+def frequency_array_to_dict(frequencies: np.ndarray, k_mer_length: int, candidates: np.ndarray = None) -> dict:
+    """
+    Converts a frequency array into the dictionary returned by pattern_frequency.
+
+    Parameters:
+    - frequencies (np.ndarray): Frequency array indexed by k-mer code.
+    - k_mer_length (int): Length of the k-mers.
+    - candidates (np.ndarray, optional): Boolean array of the patterns to include. Defaults to None, all
+    patterns with a non-zero frequency.
+
+    Returns:
+    - dict: A dictionary where keys are patterns in lexicographic order and values are their frequencies.
+    """
+    selected = candidates & (frequencies > 0) if candidates is not None else frequencies > 0
+    codes = np.flatnonzero(selected)
+    return dict(zip(decode_k_mers(codes, k_mer_length), frequencies[codes].tolist()))
+
+def dict_to_frequency_array(frequency_dict: dict, k_mer_length: int) -> np.ndarray:
+    """
+    Converts a dictionary of pattern frequencies into a frequency array.
+
+    Parameters:
+    - frequency_dict (dict): A dictionary where keys are patterns of A, C, G and T and values are their frequencies.
+    - k_mer_length (int): Length of the patterns.
+
+    Returns:
+    - np.ndarray: int64 array of 4^k frequencies, 0 for patterns not in the dictionary.
+    """
+    _check_k_mer_length(k_mer_length)
+    frequencies = np.zeros(4**k_mer_length, dtype=np.int64)
+    if len(frequency_dict) > 0:
+        codes, valid = encode_k_mers(list(frequency_dict), k_mer_length)
+        # Check patterns
+        if not valid.all():
+            raise ValueError("Invalid pattern. Patterns must consist of A, C, G and T.")
+        frequencies[codes] = list(frequency_dict.values())
+    return frequencies
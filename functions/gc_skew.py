@@ -1,88 +1,344 @@
-import matplotlib.pyplot as plt
-import seaborn as sns 
+from array import array
 
-def calculate_gc_skew(sequence: str) -> list:
+import numpy as np
+
+from functions.packed_sequence import PackedSequence
+
+# Types accepted wherever a sequence or a skew array is expected
+SEQUENCE_TYPES = (str, PackedSequence)
+SKEW_ARRAY_TYPES = (list, array, np.ndarray)
+
+def _skew_lookup_table():
+    """
+    Build a 256-entry lookup table mapping ASCII codes to skew steps (+1 for G, -1 for C, 0 otherwise).
+    """
+    table = np.zeros(256, dtype=np.int8)
+    table[ord("G")] = 1
+    table[ord("C")] = -1
+    return table
+
+SKEW_LOOKUP = _skew_lookup_table()
+# Number of scores processed per block when searching extrema, small enough to stay in the CPU cache
+EXTREMA_BLOCK_SIZE = 2**16
+# Skew steps indexed by 2-bit nucleotide code (A, C, G, T, masked symbol)
+SKEW_CODE_LOOKUP = np.array([0, -1, 1, 0, 0], dtype=np.int8)
+# Bins of plots of a CompactSkew without explicit bins, which is never plotted in full
+COMPACT_PLOT_BINS = 2**12
+
+def calculate_gc_skew(sequence: str) -> "np.ndarray":
     """
     Calculate GC skew scores for each position in the sequence.
 
+    The sequence is mapped byte-wise to +1 (G), -1 (C) and 0 (anything else) and accumulated
+    with a cumulative sum.
+
     Parameters:
-    - sequence (str): DNA sequence.
+    - sequence (str | PackedSequence): DNA sequence.
 
     Returns:
-    - list: List of GC skew scores.
+    - np.ndarray: int32 array of GC skew scores with len(sequence) + 1 entries.
     """
     
     # Check that sequence is not empty or none
     if sequence is None or len(sequence) == 0:
         raise ValueError("Empty sequence")
     # Check for correct data type
-    if not isinstance(sequence, str):
+    if not isinstance(sequence, SEQUENCE_TYPES):
         raise ValueError("Invalid input type. Please provide a valid sequence.")
     
-    # Initialize skew skew_array with 0
-    skew_array = [0]
+    if isinstance(sequence, PackedSequence):
+        # Map the 2-bit codes to their skew steps
+        steps = SKEW_CODE_LOOKUP[sequence.codes()]
+    else:
+        # Map every byte to its skew step; non-ASCII characters can never be G or C
+        raw = np.frombuffer(sequence.encode("ascii", errors="replace"), dtype=np.uint8)
+        steps = SKEW_LOOKUP[raw]
     
-    # Iterate over sequence and add scores if Cytosine or Guanine appear
-    for pos, nucleotide in enumerate(sequence):
-        if nucleotide == "C":
-            current_sum = skew_array[pos] - 1
-        elif nucleotide == "G":
-            current_sum = skew_array[pos] + 1
-        else:
-            current_sum = skew_array[pos] + 0
-
-        # Append current valute to array
-        skew_array.append(current_sum)
+    # Cumulative sum into a preallocated array that starts with 0
+    skew_array = np.empty(len(steps) + 1, dtype=np.int32)
+    skew_array[0] = 0
+    np.cumsum(steps, dtype=np.int32, out=skew_array[1:])
         
     return skew_array
 
-def plot_skew(skew_array: list) -> None:
+def calculate_gc_skew_chunks(chunks) -> "np.ndarray":
     """
-    Plot GC skew scores as a function of positions in the genome.
+    Calculate GC skew scores for a sequence given as iterable of chunks, e.g. from iter_sequence_chunks.
+
+    The chunks must not overlap. Only the skew array is built, the sequence itself is never joined.
+
+    Parameters:
+    - chunks (iterable): Consecutive parts of the DNA sequence as bytes or str.
+
+    Returns:
+    - np.ndarray: int32 array of GC skew scores with one entry more than the total sequence length.
+    """
+    skew_parts = [np.zeros(1, dtype=np.int32)]
+    current_sum = 0
+    for chunk in chunks:
+        if isinstance(chunk, str):
+            chunk = chunk.encode("ascii", errors="replace")
+        # Continue the cumulative sum from the last score of the previous chunk
+        part = np.cumsum(SKEW_LOOKUP[np.frombuffer(chunk, dtype=np.uint8)], dtype=np.int32)
+        if len(part) > 0:
+            part += current_sum
+            current_sum = int(part[-1])
+            skew_parts.append(part)
+    
+    # Check that sequence is not empty
+    if len(skew_parts) == 1:
+        raise ValueError("Empty sequence")
+    
+    return np.concatenate(skew_parts)
+
+def gc_counts(sequence: str) -> tuple:
+    """
+    Cumulative G and C counts of a sequence, the precomputation of windowed_gc_skew.
+
+    Parameters:
+    - sequence (str | PackedSequence): DNA sequence.
+
+    Returns:
+    - np.ndarray: int32 array with the number of G before each position, len(sequence) + 1 entries.
+    - np.ndarray: int32 array with the number of C before each position, len(sequence) + 1 entries.
+    """
+    
+    # Check that sequence is not empty or none
+    if sequence is None or len(sequence) == 0:
+        raise ValueError("Empty sequence")
+    # Check for correct data type
+    if not isinstance(sequence, SEQUENCE_TYPES):
+        raise ValueError("Invalid input type. Please provide a valid sequence.")
+    
+    if isinstance(sequence, PackedSequence):
+        steps = SKEW_CODE_LOOKUP[sequence.codes()]
+    else:
+        steps = SKEW_LOOKUP[np.frombuffer(sequence.encode("ascii", errors="replace"), dtype=np.uint8)]
+    
+    counts = []
+    for step in (1, -1):
+        cumulative = np.empty(len(steps) + 1, dtype=np.int32)
+        cumulative[0] = 0
+        np.cumsum(steps == step, dtype=np.int32, out=cumulative[1:])
+        counts.append(cumulative)
+    
+    return counts[0], counts[1]
+
+def windowed_gc_skew(sequence, window: int, step: int = None) -> tuple:
+    """
+    Calculate the GC skew (G - C) / (G + C) and the GC content of sliding windows.
+
+    Window counts are differences of the cumulative counts from gc_counts, so every window costs O(1).
+    Pass the counts instead of the sequence to evaluate several window settings after one precomputation.
 
     Parameters:
-    - skew_array (list): List of GC skew scores.
+    - sequence (str | PackedSequence | tuple): DNA sequence, or the (G counts, C counts) returned by gc_counts.
+    - window (int): Length of the windows.
+    - step (int, optional): Distance between the starts of consecutive windows. Defaults to the window length.
+
+    Returns:
+    - np.ndarray: Start positions of the windows.
+    - np.ndarray: float64 GC skew of each window, 0 for windows without G and C.
+    - np.ndarray: float64 GC content of each window as fraction of the window length.
     """
+    g_counts, c_counts = sequence if isinstance(sequence, tuple) else gc_counts(sequence)
+    step = window if step is None else step
+    length = len(g_counts) - 1
     
+    # Check window and step
+    if not isinstance(window, int) or not 0 < window <= length:
+        raise ValueError("Invalid window. Please provide a positive integer up to the sequence length.")
+    if not isinstance(step, int) or step <= 0:
+        raise ValueError("Invalid step. Please provide a positive integer.")
+    
+    starts = np.arange(0, length - window + 1, step)
+    g = (g_counts[starts + window] - g_counts[starts]).astype(np.float64)
+    c = (c_counts[starts + window] - c_counts[starts]).astype(np.float64)
+    gc = g + c
+    
+    skew = np.divide(g - c, gc, out=np.zeros_like(gc), where=gc > 0)
+    return starts, skew, gc / window
+
+def _is_compact_skew(skew_array) -> bool:
+    """
+    Whether a skew array is a CompactSkew, whose module builds on this one and is imported on demand.
+    """
+    from functions.compact_skew import CompactSkew
+    return isinstance(skew_array, CompactSkew)
+
+def _check_skew_array(skew_array) -> None:
+    """
+    Validate a skew array passed to plot_skew or min_max_skew.
+    """
     # Check that skew array is not empty or none
     if skew_array is None or len(skew_array) == 0:
         raise ValueError("Empty skew_array")
     # Check for data type
-    if not isinstance(skew_array, list):
+    if not isinstance(skew_array, SKEW_ARRAY_TYPES) and not _is_compact_skew(skew_array):
         raise ValueError("Invalid input type. Please provide a valid skew_array.")
+
+def decimate_skew(skew_array: "np.ndarray", bins: int) -> tuple:
+    """
+    Reduce a skew array to the minimum and maximum of each of 'bins' equally sized bins.
+
+    Both extrema of every bin are kept in their original order, so turning points survive the reduction.
+
+    Parameters:
+    - skew_array (np.ndarray | list | CompactSkew): Array of GC skew scores.
+    - bins (int): Number of bins, e.g. the horizontal resolution of the plot in pixels.
+
+    Returns:
+    - np.ndarray: Positions of the retained scores.
+    - np.ndarray: Retained GC skew scores.
+    """
+    _check_skew_array(skew_array)
+    # Check number of bins
+    if not isinstance(bins, int) or bins <= 0:
+        raise ValueError("Invalid number of bins. Please provide a positive integer.")
+    # Compact skews are decoded bin by bin
+    if _is_compact_skew(skew_array):
+        return skew_array.decimate(bins)
+    
+    skew_array = np.asarray(skew_array)
+    # Arrays with at most two scores per bin are returned unchanged
+    if len(skew_array) <= 2 * bins:
+        return np.arange(len(skew_array)), skew_array
+    
+    # Pad the array with its last score to a multiple of the bin size and fold it into rows
+    bin_size = -(-len(skew_array) // bins)
+    rows = -(-len(skew_array) // bin_size)
+    padded = np.empty(rows * bin_size, dtype=skew_array.dtype)
+    padded[:len(skew_array)] = skew_array
+    padded[len(skew_array):] = skew_array[-1]
+    padded = padded.reshape(rows, bin_size)
+    
+    offsets = np.arange(rows) * bin_size
+    minimum_positions = offsets + padded.argmin(axis=1)
+    maximum_positions = offsets + padded.argmax(axis=1)
+    # Keep both extrema of each bin in positional order
+    positions = np.sort(np.stack((minimum_positions, maximum_positions), axis=1), axis=1).ravel()
+    positions = np.minimum(positions, len(skew_array) - 1)
+    return positions, skew_array[positions]
+
+def plot_skew(skew_array: "np.ndarray", bins: int = None, show_extrema: bool = False, output_path: str = None) -> None:
+    """
+    Plot GC skew scores as a function of positions in the genome.
+
+    matplotlib and seaborn are only imported on the first call, through the functions.plotting module.
+
+    Parameters:
+    - skew_array (np.ndarray | list | CompactSkew): Array of GC skew scores.
+    - bins (int, optional): Reduce the array with decimate_skew to this many bins before plotting. Defaults to None,
+    which plots all scores of arrays and COMPACT_PLOT_BINS bins of a CompactSkew.
+    - show_extrema (bool, optional): Mark the positions found by min_max_skew. Defaults to False.
+    - output_path (str, optional): Save the plot to this file (format from the extension, e.g. PNG or SVG)
+    without an interactive backend instead of showing it. Defaults to None.
+    """
+    
+    _check_skew_array(skew_array)
+    
+    if bins is None and _is_compact_skew(skew_array):
+        bins = COMPACT_PLOT_BINS
+    if bins is not None:
+        positions, scores = decimate_skew(skew_array, bins)
+    else:
+        positions, scores = range(len(skew_array)), skew_array
+    extrema = min_max_skew(skew_array) if show_extrema else None
     
-    # Plot GC skew as function of positions in genome
-    sns.set_style("ticks")
-    plt.xlabel("Position")
-    plt.ylabel("GC Skew Score")
-    plt.title("GC Skew Analysis")
-    plt.plot(skew_array)
-    plt.show()
+    # Import the plotting stack lazily
+    from functions.plotting import plot_skew as plot_skew_impl
+    plot_skew_impl(positions, scores, extrema=extrema, skew_array=skew_array, output_path=output_path)
 
-def min_max_skew(skew_array: list) -> list:
+def _min_max_skew_numpy(skew_array, tolerance) -> tuple:
+    """
+    Single pass over a NumPy skew array in cache-sized blocks, collecting positions within tolerance of both extrema.
+    """
+    minimum_skew = maximum_skew = skew_array[0]
+    minimum_candidates = []
+    maximum_candidates = []
+    for start in range(0, len(skew_array), EXTREMA_BLOCK_SIZE):
+        block = skew_array[start:start + EXTREMA_BLOCK_SIZE]
+        block_minimum, block_maximum = block.min(), block.max()
+        if block_minimum < minimum_skew:
+            minimum_skew = block_minimum
+            # Drop candidates of earlier blocks that left the tolerance band
+            minimum_candidates = [positions[skew_array[positions] <= minimum_skew + tolerance]
+                                  for positions in minimum_candidates]
+        if block_maximum > maximum_skew:
+            maximum_skew = block_maximum
+            maximum_candidates = [positions[skew_array[positions] >= maximum_skew - tolerance]
+                                  for positions in maximum_candidates]
+        if block_minimum <= minimum_skew + tolerance:
+            minimum_candidates.append(start + np.flatnonzero(block <= minimum_skew + tolerance))
+        if block_maximum >= maximum_skew - tolerance:
+            maximum_candidates.append(start + np.flatnonzero(block >= maximum_skew - tolerance))
+    
+    return np.concatenate(minimum_candidates).tolist(), np.concatenate(maximum_candidates).tolist()
+
+def min_max_skew(skew_array: "np.ndarray", tolerance: float = 0) -> tuple:
     """
     Calculate minimum and maximum values of GC skew.
 
+    Both extrema are found in a single pass over the skew array; NumPy arrays are processed in cache-sized blocks.
+
     Parameters:
-    - skew_array (list): List of GC skew scores.
+    - skew_array (np.ndarray | list | CompactSkew): Array of GC skew scores.
+    - tolerance (float, optional): Also report positions whose skew lies within this distance of the extremum.
+    Defaults to 0.
 
     Returns:
     - list: Positions where the skew is minimum.
     - list: Positions where the skew is maximum.
     """
-    # Check that skew array is not empty or none
-    if skew_array is None or len(skew_array) == 0:
-        raise ValueError("Empty skew_array")
-    # Check for data type
-    if not isinstance(skew_array, list):
-        raise ValueError("Invalid input type. Please provide a valid skew_array.")
+    _check_skew_array(skew_array)
+    # Check for non-negative tolerance
+    if tolerance < 0:
+        raise ValueError("Negative tolerance.")
+    # Compact skews only decode the blocks reaching an extremum
+    if _is_compact_skew(skew_array):
+        return skew_array.min_max(tolerance)
     
-    # Calculate minimum and maximum values of GC skew
-    minimum_skew = min(skew_array)
-    maximum_skew = max(skew_array)
+    return _min_max_skew_numpy(np.asarray(skew_array), tolerance)
+
+def _cluster_positions(positions: list, length: int, circular: bool) -> list:
+    """
+    Cluster sorted positions of a skew array with 'length' scores into intervals of consecutive positions.
+    """
+    # On a circular genome the last score belongs to the origin, position 0, like the first one
+    if circular and length > 1:
+        length -= 1
+        if positions and positions[-1] == length:
+            positions = positions[:-1] if positions[0] == 0 else [0] + positions[:-1]
+    
+    intervals = []
+    for position in positions:
+        if intervals and position == intervals[-1][1] + 1:
+            intervals[-1][1] = position
+        else:
+            intervals.append([position, position])
     
-    # Determines all positions where the skew is minimum and maximum
-    minimum_positions = [index for index, skew in enumerate(skew_array) if skew == minimum_skew]
-    maximum_positions = [index for index, skew in enumerate(skew_array) if skew == maximum_skew]
+    # On a circular genome the last position is followed by the first one
+    if circular and len(intervals) > 1 and intervals[0][0] == 0 and intervals[-1][1] == length - 1:
+        intervals[0][0] = intervals.pop()[0]
+    
+    return [tuple(interval) for interval in intervals]
+
+def skew_extrema(skew_array: "np.ndarray", tolerance: float = 0, circular: bool = False) -> tuple:
+    """
+    Find the intervals in which the GC skew lies within a tolerance band around its minimum and maximum.
+
+    Parameters:
+    - skew_array (np.ndarray | list | CompactSkew): Array of GC skew scores.
+    - tolerance (float, optional): Width of the band around each extremum. Defaults to 0.
+    - circular (bool, optional): Treat the skew as that of a circular chromosome. The last score, after the full
+    sequence, is reported as the origin 0, and position len(sequence) - 1 is adjacent to it. Intervals wrapping
+    around the origin are reported with start > stop. Defaults to False.
+
+    Returns:
+    - list: (start, stop) intervals of positions around the minimum skew, both inclusive.
+    - list: (start, stop) intervals of positions around the maximum skew, both inclusive.
+    """
+    minimum_positions, maximum_positions = min_max_skew(skew_array, tolerance=tolerance)
     
-    return minimum_positions, maximum_positions
\ No newline at end of file
+    return (_cluster_positions(minimum_positions, len(skew_array), circular),
+            _cluster_positions(maximum_positions, len(skew_array), circular))
@@ -1,9 +1,14 @@
+import numpy as np
+
+from functions.encoding import MAX_K_MER_LENGTH, decode_k_mers, rolling_k_mer_codes, sequence_codes
+from functions.packed_sequence import PackedSequence
+
 def generate_k_mers(sequence: str, k_mer_length: int, seq_range: tuple = (0, 10)) -> list:
     """
     Generate unique k-mers from a specified range of a DNA sequence.
 
     Parameters:
-    - sequence (str): The input DNA sequence.
+    - sequence (str | PackedSequence): The input DNA sequence.
     - k_mer_length (int): Length of k-mers to generate.
     - seq_range (tuple, optional): A tuple representing the range of the sequence to consider.
                                     Default is (0, 10).
@@ -12,33 +17,40 @@ def generate_k_mers(sequence: str, k_mer_length: int, seq_range: tuple = (0, 10)
     - list: List of unique k-mers.
     """
     # Validate input parameters
-    if not isinstance(sequence, str) or not isinstance(k_mer_length, int) or not isinstance(seq_range, tuple):
+    if not isinstance(sequence, (str, PackedSequence)) or not isinstance(k_mer_length, int) or not isinstance(seq_range, tuple):
         raise ValueError("Invalid input types. Please provide a valid DNA sequence, integer k-mer length, and a tuple for seq_range.")
-    
+
     # Define part of sequence to generate k-mers from
     start, stop = seq_range
-    
+
     # Check sequence range values
     if not 0 <= start < len(sequence) or not 0 <= stop < len(sequence) or not start < stop:
         raise ValueError("Invalid sequence range. Please provide a valid range within the length of the sequence.")
-    
+
     # Define slice of sequence from which k-mers will be generated
     sequence_part = sequence[start:stop + 1]
-    
+
     # Check k_mer_length value
     if not 0 < k_mer_length <= len(sequence_part):
         raise ValueError("Invalid k-mer length. Please provide a positive integer less than or equal to the length of the sequence part.")
-    
-    # Define scanning range
-    scanning_range = len(sequence_part) - k_mer_length + 1
-    
-    k_mer_set = set()
-    # Slide a window over the sequence part
-    for pos in range(scanning_range):
-        # Add current k-mer to set
-        k_mer_set.add(sequence_part[pos:pos + k_mer_length])
-    
-    # Convert set to list
-    k_mer_list = list(k_mer_set)
-    
-    return sorted(k_mer_list)
\ No newline at end of file
+
+    # k-mers too long for integer codes are collected as strings
+    if k_mer_length > MAX_K_MER_LENGTH:
+        sequence_part = str(sequence_part)
+        return sorted({sequence_part[pos:pos + k_mer_length] for pos in range(len(sequence_part) - k_mer_length + 1)})
+
+    # Encode every window as integer and keep the unique codes
+    if isinstance(sequence_part, PackedSequence):
+        window_codes, valid = sequence_part.k_mer_codes(k_mer_length)
+    else:
+        window_codes, valid = rolling_k_mer_codes(sequence_codes(sequence_part), k_mer_length)
+    k_mer_list = decode_k_mers(np.unique(window_codes[valid]), k_mer_length)
+
+    # Windows containing other symbols than A, C, G and T cannot be encoded
+    if not valid.all():
+        sequence_part = str(sequence_part)
+        k_mer_set = {sequence_part[pos:pos + k_mer_length] for pos in np.flatnonzero(~valid).tolist()}
+        # Codes are unique and sorted like their strings, so only mixed lists have to be sorted again
+        return sorted(k_mer_set.union(k_mer_list))
+
+    return k_mer_list
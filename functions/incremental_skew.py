@@ -0,0 +1,226 @@
+from bisect import bisect_right
+
+import numpy as np
+
+from functions.gc_skew import SKEW_LOOKUP
+from functions.packed_sequence import PackedSequence
+
+# Default number of bases per block
+BLOCK_SIZE = 2**16
+
+class _SkewBlock():
+    """
+    Skew steps of one block of the sequence together with their local prefix sums and extrema.
+    """
+
+    __slots__ = ("steps", "prefix", "total", "minimum", "maximum")
+
+    def __init__(self, steps: np.ndarray):
+        self.steps = steps
+        self.update()
+
+    def update(self) -> None:
+        """
+        Recompute the local prefix sums and extrema after the steps changed.
+        """
+        self.prefix = np.cumsum(self.steps, dtype=np.int32)
+        self.total = int(self.prefix[-1]) if len(self.prefix) > 0 else 0
+        self.minimum = int(self.prefix.min()) if len(self.prefix) > 0 else None
+        self.maximum = int(self.prefix.max()) if len(self.prefix) > 0 else None
+
+class IncrementalSkew():
+    """
+    GC skew of a sequence that can be edited without recomputing the whole skew array.
+
+    The skew steps are split into blocks that store local prefix sums and extrema; the skew at a position
+    is the offset of its block plus the local prefix sum. Blocks are located by bisecting their start
+    positions. A substitution or insertion recomputes only the affected block and the block offsets and
+    starts, appending adds new blocks. Extrema are combined from the
+    block extrema, so only blocks reaching the global extremum are scanned for positions.
+    """
+
+    def __init__(self, sequence, block_size: int = BLOCK_SIZE):
+        """
+        Build the block structure of a sequence.
+
+        Parameters:
+        - sequence (str | bytes | PackedSequence): DNA sequence.
+        - block_size (int, optional): Number of bases per block. Defaults to 65536.
+        """
+        # Check block size
+        if not isinstance(block_size, int) or block_size <= 0:
+            raise ValueError("Invalid block size. Please provide a positive integer.")
+
+        steps = self._steps(sequence)
+        # Check that sequence is not empty
+        if len(steps) == 0:
+            raise ValueError("Empty sequence")
+
+        self.block_size = block_size
+        self._blocks = []
+        self._offsets = [0]
+        # Sequence position of the first base of every block, followed by the sequence length
+        self._starts = [0]
+        self._append_steps(steps)
+
+    @staticmethod
+    def _steps(sequence) -> np.ndarray:
+        """
+        Map a sequence to its skew steps (+1 for G, -1 for C, 0 otherwise).
+        """
+        if isinstance(sequence, PackedSequence):
+            sequence = sequence.to_bytes()
+        if isinstance(sequence, str):
+            sequence = sequence.encode("ascii", errors="replace")
+        # Check for correct data type
+        if not isinstance(sequence, bytes):
+            raise ValueError("Input sequence as string, bytes or PackedSequence.")
+        return SKEW_LOOKUP[np.frombuffer(sequence, dtype=np.uint8)]
+
+    def __len__(self) -> int:
+        """
+        Number of skew scores, one more than the sequence length.
+        """
+        return self._starts[-1] + 1
+
+    def _append_steps(self, steps: np.ndarray) -> None:
+        """
+        Fill up the last block and add new blocks for the remaining steps.
+        """
+        first_block = max(len(self._blocks) - 1, 0)
+        if len(self._blocks) > 0 and len(self._blocks[-1].steps) < self.block_size:
+            last = self._blocks[-1]
+            free = self.block_size - len(last.steps)
+            last.steps = np.concatenate((last.steps, steps[:free]))
+            last.update()
+            steps = steps[free:]
+
+        for start in range(0, len(steps), self.block_size):
+            self._blocks.append(_SkewBlock(steps[start:start + self.block_size].copy()))
+        self._update_offsets(first_block)
+
+    def _update_offsets(self, first_block: int = 0) -> None:
+        """
+        Recompute the skew before and the start position of every block, starting at first_block.
+        """
+        del self._offsets[first_block + 1:]
+        del self._starts[first_block + 1:]
+        for block in self._blocks[first_block:]:
+            self._offsets.append(self._offsets[-1] + block.total)
+            self._starts.append(self._starts[-1] + len(block.steps))
+
+    def _locate(self, position: int) -> tuple:
+        """
+        Find the block containing a sequence position and the position within the block.
+        """
+        # The sequence length lies in the last block, after its last base
+        block_index = bisect_right(self._starts, position, 0, len(self._blocks)) - 1
+        return block_index, position - self._starts[block_index]
+
+    def substitute(self, position: int, sequence) -> None:
+        """
+        Replace the bases starting at a position.
+
+        Parameters:
+        - position (int): Position of the first replaced base.
+        - sequence (str | bytes): The new bases.
+        """
+        steps = self._steps(sequence)
+        # Check position
+        if not 0 <= position <= len(self) - 1 - len(steps):
+            raise ValueError("Invalid position. The substituted bases must lie within the sequence.")
+
+        block_index, local = self._locate(position)
+        first_block = block_index
+        while len(steps) > 0:
+            block = self._blocks[block_index]
+            count = min(len(steps), len(block.steps) - local)
+            block.steps[local:local + count] = steps[:count]
+            block.update()
+            steps = steps[count:]
+            block_index += 1
+            local = 0
+        self._update_offsets(first_block)
+
+    def insert(self, position: int, sequence) -> None:
+        """
+        Insert bases before a position; the position equal to the sequence length appends.
+
+        Parameters:
+        - position (int): Position before which the bases are inserted.
+        - sequence (str | bytes): The inserted bases.
+        """
+        steps = self._steps(sequence)
+        # Check position
+        if not 0 <= position <= len(self) - 1:
+            raise ValueError("Invalid position. Please provide a position within the sequence.")
+
+        block_index, local = self._locate(position)
+        block = self._blocks[block_index]
+        block.steps = np.concatenate((block.steps[:local], steps, block.steps[local:]))
+        # Split blocks that grew beyond twice the block size
+        if len(block.steps) > 2 * self.block_size:
+            parts = [block.steps[start:start + self.block_size] for start in range(0, len(block.steps), self.block_size)]
+            self._blocks[block_index:block_index + 1] = [_SkewBlock(part.copy()) for part in parts]
+        else:
+            block.update()
+        self._update_offsets(block_index)
+
+    def append(self, sequence) -> None:
+        """
+        Append bases, e.g. a further contig, to the end of the sequence.
+
+        Parameters:
+        - sequence (str | bytes): The appended bases.
+        """
+        self._append_steps(self._steps(sequence))
+
+    def __getitem__(self, index: int) -> int:
+        """
+        Skew score at an index of the skew array.
+        """
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("Skew index out of range.")
+        if index == 0:
+            return 0
+        block_index, local = self._locate(index - 1)
+        return self._offsets[block_index] + int(self._blocks[block_index].prefix[local])
+
+    def to_array(self) -> np.ndarray:
+        """
+        Materialize the skew array.
+
+        Returns:
+        - np.ndarray: int32 array of GC skew scores, identical to calculate_gc_skew of the edited sequence.
+        """
+        parts = [np.zeros(1, dtype=np.int32)]
+        parts += [block.prefix + np.int32(offset) for block, offset in zip(self._blocks, self._offsets)]
+        return np.concatenate(parts)
+
+    def min_max(self) -> tuple:
+        """
+        Positions of the minimum and maximum skew, combined from the block extrema.
+
+        Returns:
+        - list: Positions where the skew is minimum.
+        - list: Positions where the skew is maximum.
+        """
+        minimum_skew = min([0] + [offset + block.minimum for block, offset in zip(self._blocks, self._offsets)
+                                  if block.minimum is not None])
+        maximum_skew = max([0] + [offset + block.maximum for block, offset in zip(self._blocks, self._offsets)
+                                  if block.maximum is not None])
+
+        minimum_positions = [0] if minimum_skew == 0 else []
+        maximum_positions = [0] if maximum_skew == 0 else []
+        start = 1
+        # Only blocks that reach an extremum are scanned for its positions
+        for block, offset in zip(self._blocks, self._offsets):
+            if block.minimum is not None and offset + block.minimum == minimum_skew:
+                minimum_positions += (start + np.flatnonzero(block.prefix == minimum_skew - offset)).tolist()
+            if block.maximum is not None and offset + block.maximum == maximum_skew:
+                maximum_positions += (start + np.flatnonzero(block.prefix == maximum_skew - offset)).tolist()
+            start += len(block.steps)
+
+        return minimum_positions, maximum_positions
@@ -0,0 +1,242 @@
+import functools
+import json
+import os
+import time
+import tracemalloc
+from typing import NamedTuple
+
+class StageMetrics(NamedTuple):
+    """
+    Measurements of one call of an analyzer method.
+
+    Attributes:
+        name (str): Name of the method.
+        wall_seconds (float): Elapsed wall time.
+        cpu_seconds (float): CPU time of the process.
+        peak_memory_bytes (int): Peak of memory allocated during the call, 0 without memory tracing.
+        counts (dict): Processed items, e.g. windows scanned, neighbours generated or cache hits.
+    """
+    name: str
+    wall_seconds: float
+    cpu_seconds: float
+    peak_memory_bytes: int
+    counts: dict
+
+class _Frame():
+    """
+    Bookkeeping of a running stage.
+    """
+
+    __slots__ = ("name", "wall_start", "cpu_start", "memory_start", "child_peak", "counts")
+
+    def __init__(self, name: str, memory_start: int):
+        self.name = name
+        self.memory_start = memory_start
+        self.child_peak = 0
+        self.counts = {}
+        self.wall_start = time.perf_counter()
+        self.cpu_start = time.process_time()
+
+class InstrumentationReport():
+    """
+    Structured report of all recorded stages with JSON and Prometheus text exporters.
+    """
+
+    def __init__(self, stages: list):
+        """
+        Parameters:
+        - stages (list): StageMetrics in the order in which the stages finished.
+        """
+        self.stages = stages
+
+    def summary(self) -> dict:
+        """
+        Aggregate the stages by name.
+
+        Returns:
+        - dict: Per stage name the number of calls, total wall and CPU seconds, maximum peak memory and
+        summed counts.
+        """
+        summary = {}
+        for stage in self.stages:
+            entry = summary.setdefault(stage.name, {"calls": 0, "wall_seconds": 0.0, "cpu_seconds": 0.0,
+                                                    "peak_memory_bytes": 0, "counts": {}})
+            entry["calls"] += 1
+            entry["wall_seconds"] += stage.wall_seconds
+            entry["cpu_seconds"] += stage.cpu_seconds
+            entry["peak_memory_bytes"] = max(entry["peak_memory_bytes"], stage.peak_memory_bytes)
+            for item, value in stage.counts.items():
+                entry["counts"][item] = entry["counts"].get(item, 0) + value
+        return summary
+
+    def to_dict(self) -> dict:
+        """
+        Report as dictionary of the individual stages and their summary.
+        """
+        return {"stages": [stage._asdict() for stage in self.stages], "summary": self.summary()}
+
+    def to_json(self) -> str:
+        """
+        Report as JSON document.
+        """
+        return json.dumps(self.to_dict(), indent=2)
+
+    def to_prometheus(self, prefix: str = "ori") -> str:
+        """
+        Summary in the Prometheus text exposition format.
+
+        Parameters:
+        - prefix (str, optional): Prefix of the metric names. Defaults to "ori".
+
+        Returns:
+        - str: Metrics labelled by stage (and item for counts).
+        """
+        summary = self.summary()
+        metrics = [("stage_calls_total", "counter", "Calls of analyzer stages.", "calls"),
+                   ("stage_wall_seconds_total", "counter", "Wall time spent in analyzer stages.", "wall_seconds"),
+                   ("stage_cpu_seconds_total", "counter", "CPU time spent in analyzer stages.", "cpu_seconds"),
+                   ("stage_peak_memory_bytes", "gauge", "Peak memory allocated by analyzer stages.", "peak_memory_bytes")]
+        lines = []
+        for name, metric_type, description, key in metrics:
+            lines += [f"# HELP {prefix}_{name} {description}", f"# TYPE {prefix}_{name} {metric_type}"]
+            lines += [f'{prefix}_{name}{{stage="{stage}"}} {entry[key]}' for stage, entry in summary.items()]
+
+        lines += [f"# HELP {prefix}_stage_items_total Items processed by analyzer stages.",
+                  f"# TYPE {prefix}_stage_items_total counter"]
+        for stage, entry in summary.items():
+            lines += [f'{prefix}_stage_items_total{{stage="{stage}",item="{item}"}} {value}'
+                      for item, value in entry["counts"].items()]
+        return "\n".join(lines) + "\n"
+
+    @staticmethod
+    def _write(output_path: str, text: str) -> None:
+        """
+        Replace a file atomically, so that scrapers never read a partial report.
+        """
+        temporary_path = f"{output_path}.tmp{os.getpid()}"
+        with open(temporary_path, "w") as file:
+            file.write(text)
+        os.replace(temporary_path, output_path)
+
+    def write_json(self, output_path: str) -> None:
+        """
+        Write the report as JSON file.
+        """
+        self._write(output_path, self.to_json())
+
+    def write_prometheus(self, output_path: str, prefix: str = "ori") -> None:
+        """
+        Write the summary as Prometheus text file, e.g. for the node exporter textfile collector.
+        """
+        self._write(output_path, self.to_prometheus(prefix))
+
+class Instrumentation():
+    """
+    Opt-in recorder of wall time, CPU time, peak memory and item counts per analyzer method.
+
+    Stages may be nested (e.g. analyze calls pattern_frequency); every stage reports its own
+    measurements including its nested stages. Peak memory is measured with tracemalloc, which slows
+    down allocations and can be disabled with trace_memory=False.
+    """
+
+    def __init__(self, callback=None, trace_memory: bool = True):
+        """
+        Parameters:
+        - callback (callable, optional): Called with the StageMetrics of every finished stage. Defaults to None.
+        - trace_memory (bool, optional): Measure peak memory with tracemalloc. Defaults to True.
+        """
+        self.callback = callback
+        self.trace_memory = trace_memory
+        self.stages = []
+        self._frames = []
+        self._started_tracing = False
+
+    def start_stage(self, name: str) -> None:
+        """
+        Start measuring a stage.
+
+        Parameters:
+        - name (str): Name of the stage.
+        """
+        memory_start = 0
+        if self.trace_memory:
+            if not tracemalloc.is_tracing():
+                tracemalloc.start()
+                self._started_tracing = True
+            memory_start, peak = tracemalloc.get_traced_memory()
+            # Keep the peak reached so far by the enclosing stage before resetting it
+            if self._frames:
+                self._frames[-1].child_peak = max(self._frames[-1].child_peak, peak)
+            tracemalloc.reset_peak()
+        self._frames.append(_Frame(name, memory_start))
+
+    def finish_stage(self) -> StageMetrics:
+        """
+        Finish the innermost stage and record its measurements.
+
+        Returns:
+        - StageMetrics: Measurements of the stage.
+        """
+        frame = self._frames.pop()
+        wall_seconds = time.perf_counter() - frame.wall_start
+        cpu_seconds = time.process_time() - frame.cpu_start
+
+        peak_memory = 0
+        if self.trace_memory and tracemalloc.is_tracing():
+            peak = max(tracemalloc.get_traced_memory()[1], frame.child_peak)
+            peak_memory = max(peak - frame.memory_start, 0)
+            # The enclosing stage continues with the peak of this stage
+            if self._frames:
+                self._frames[-1].child_peak = max(self._frames[-1].child_peak, peak)
+            # Tracing slows down all allocations, so it only runs while stages are measured
+            elif self._started_tracing:
+                tracemalloc.stop()
+                self._started_tracing = False
+
+        metrics = StageMetrics(frame.name, wall_seconds, cpu_seconds, peak_memory, frame.counts)
+        self.stages.append(metrics)
+        if self.callback is not None:
+            self.callback(metrics)
+        return metrics
+
+    def count(self, **items) -> None:
+        """
+        Add item counts to the innermost running stage.
+
+        Parameters:
+        - **items (int): Counts by item name, e.g. windows=1000.
+        """
+        if self._frames:
+            counts = self._frames[-1].counts
+            for item, value in items.items():
+                counts[item] = counts.get(item, 0) + int(value)
+
+    def report(self) -> InstrumentationReport:
+        """
+        Report of all stages recorded so far.
+        """
+        return InstrumentationReport(list(self.stages))
+
+    def reset(self) -> None:
+        """
+        Discard all recorded stages.
+        """
+        self.stages = []
+
+def instrumented(method):
+    """
+    Decorator measuring an analyzer method as stage of the analyzer's 'instrumentation' attribute.
+
+    Without instrumentation the method is called directly, at the cost of one attribute lookup.
+    """
+    @functools.wraps(method)
+    def wrapper(self, *args, **kwargs):
+        instrumentation = self.instrumentation
+        if instrumentation is None:
+            return method(self, *args, **kwargs)
+        instrumentation.start_stage(method.__name__)
+        try:
+            return method(self, *args, **kwargs)
+        finally:
+            instrumentation.finish_stage()
+    return wrapper
@@ -0,0 +1,267 @@
+import os
+import struct
+
+import numpy as np
+
+from functions.encoding import MAX_K_MER_LENGTH, encode_k_mer, rolling_k_mer_codes, sequence_codes
+from functions.packed_sequence import PackedSequence
+from functions.sequence import sequence_digest
+
+# Identification and version of the index file format
+FILE_MAGIC = b"ORIKMIDX"
+FILE_VERSION = 1
+# Magic, version, k-mer length, sequence length, number of codes, positions and masked symbols,
+# bytes per position and the raw sequence digest
+HEADER = struct.Struct("<8sIIqqqqI32s")
+# Sections of the file start at multiples of this alignment
+ALIGNMENT = 8
+
+def k_mer_position_index(sequence, k_mer_length: int) -> tuple:
+    """
+    Sorts the positions of all k-mers of a sequence by their codes.
+
+    The positions of any k-mer code are then a contiguous range, found with a binary search.
+
+    Parameters:
+    - sequence (str | PackedSequence): The input DNA sequence.
+    - k_mer_length (int): Length of the k-mers.
+
+    Returns:
+    - np.ndarray: Sorted int64 codes of the k-mers consisting of A, C, G and T.
+    - np.ndarray: Positions of these k-mers, ascending for equal codes.
+    """
+    if isinstance(sequence, PackedSequence):
+        window_codes, valid = sequence.k_mer_codes(k_mer_length)
+    else:
+        window_codes, valid = rolling_k_mer_codes(sequence_codes(sequence), k_mer_length)
+
+    positions = np.flatnonzero(valid)
+    order = np.argsort(window_codes[positions], kind="stable")
+    return window_codes[positions][order], positions[order]
+
+def _segment_search(values: np.ndarray, lower: np.ndarray, upper: np.ndarray, targets) -> np.ndarray:
+    """
+    Binary search for the first entry >= target within every sorted segment values[lower:upper].
+    """
+    lower, upper = lower.copy(), upper.copy()
+    active = lower < upper
+    # All segments are bisected simultaneously
+    while active.any():
+        middle = (lower + upper) // 2
+        right = active & (values[np.minimum(middle, len(values) - 1)] < targets)
+        lower = np.where(right, middle + 1, lower)
+        upper = np.where(active & ~right, middle, upper)
+        active = lower < upper
+    return lower
+
+def _aligned(offset: int) -> int:
+    return -(-offset // ALIGNMENT) * ALIGNMENT
+
+class KMerIndex():
+    """
+    Positions of all k-mers of a genome, grouped by k-mer code.
+
+    The index consists of the sorted unique codes, an offsets array with the start of every code in the
+    positions array, and the positions sorted by code and position. It also keeps the 2-bit packed genome,
+    so range queries need no other input. Saved indices are memory-mapped on load, so reopening an index
+    of a reference genome costs only a few page faults.
+    """
+
+    def __init__(self, sequence: PackedSequence, k_mer_length: int, codes: np.ndarray, offsets: np.ndarray,
+                 positions: np.ndarray, digest: str):
+        """
+        Parameters:
+        - sequence (PackedSequence): The indexed genome.
+        - k_mer_length (int): Length of the indexed k-mers.
+        - codes (np.ndarray): Sorted unique int64 k-mer codes.
+        - offsets (np.ndarray): int64 start of every code in positions, with the number of positions appended.
+        - positions (np.ndarray): Positions of the k-mers, sorted by code and position.
+        - digest (str): sequence_digest of the genome.
+        """
+        self.sequence = sequence
+        self.k_mer_length = k_mer_length
+        self.codes = codes
+        self.offsets = offsets
+        self.positions = positions
+        self.digest = digest
+
+    @classmethod
+    def build(cls, sequence, k_mer_length: int) -> "KMerIndex":
+        """
+        Index all k-mers of a genome.
+
+        Parameters:
+        - sequence (str | PackedSequence): The input DNA sequence.
+        - k_mer_length (int): Length of the k-mers.
+
+        Returns:
+        - KMerIndex: The index.
+        """
+        # Check for correct data types and values
+        if not isinstance(sequence, (str, PackedSequence)) or not isinstance(k_mer_length, int):
+            raise ValueError("Input sequence as string and k_mer_length as integer.")
+        if len(sequence) == 0:
+            raise ValueError("Empty sequence.")
+        if not 0 < k_mer_length <= min(MAX_K_MER_LENGTH, len(sequence)):
+            raise ValueError(f"Invalid k-mer length. Please provide k-mers of length 1 to {MAX_K_MER_LENGTH} within the sequence.")
+
+        if isinstance(sequence, str):
+            sequence = PackedSequence.from_string(sequence)
+        sorted_codes, positions = k_mer_position_index(sequence, k_mer_length)
+
+        # Start of every run of equal codes
+        starts = np.flatnonzero(np.concatenate(([True], sorted_codes[1:] != sorted_codes[:-1]))) if len(sorted_codes) > 0 \
+            else np.zeros(0, dtype=np.int64)
+        offsets = np.append(starts, len(sorted_codes)).astype(np.int64)
+        # Positions of genomes below 4 Gb fit into 32 bits
+        position_type = np.uint32 if len(sequence) < 2**32 else np.int64
+
+        return cls(sequence, k_mer_length, sorted_codes[starts], offsets, positions.astype(position_type),
+                   sequence_digest(sequence))
+
+    def save(self, output_path: str) -> None:
+        """
+        Write the index to a versioned binary file.
+
+        The file is written next to the target and renamed, so readers never see a partial index.
+
+        Parameters:
+        - output_path (str): Path of the index file.
+        """
+        mask_positions, mask_symbols = self.sequence.mask()
+        sections = [self.sequence.packed_data, mask_positions.astype(np.int64), mask_symbols,
+                    self.codes.astype(np.int64), self.offsets.astype(np.int64), np.asarray(self.positions)]
+        header = HEADER.pack(FILE_MAGIC, FILE_VERSION, self.k_mer_length, len(self.sequence), len(self.codes),
+                             len(self.positions), len(mask_positions), self.positions.dtype.itemsize,
+                             bytes.fromhex(self.digest))
+
+        temporary_path = f"{output_path}.tmp{os.getpid()}"
+        with open(temporary_path, "wb") as file:
+            file.write(header)
+            for section in sections:
+                file.write(b"\0" * (_aligned(file.tell()) - file.tell()))
+                file.write(section.tobytes())
+        os.replace(temporary_path, output_path)
+
+    @classmethod
+    def load(cls, input_path: str) -> "KMerIndex":
+        """
+        Memory-map an index file written by save.
+
+        Parameters:
+        - input_path (str): Path of the index file.
+
+        Returns:
+        - KMerIndex: Read-only index backed by the file.
+        """
+        # Check for existence of input file
+        if not os.path.exists(input_path):
+            raise FileNotFoundError(f"Index file '{input_path}' not found.")
+
+        mapped = np.memmap(input_path, dtype=np.uint8, mode="r")
+        if len(mapped) < HEADER.size:
+            raise ValueError(f"'{input_path}' is not a k-mer index file.")
+        (magic, version, k_mer_length, sequence_length, code_count, position_count, mask_count, position_size,
+         digest) = HEADER.unpack(mapped[:HEADER.size].tobytes())
+        # Check file type and version
+        if magic != FILE_MAGIC:
+            raise ValueError(f"'{input_path}' is not a k-mer index file.")
+        if version != FILE_VERSION:
+            raise ValueError(f"Unsupported k-mer index version {version}. Please rebuild the index.")
+
+        position_type = np.uint32 if position_size == 4 else np.int64
+        layout = [(np.uint8, -(-sequence_length // 4)), (np.int64, mask_count), (np.uint8, mask_count),
+                  (np.int64, code_count), (np.int64, code_count + 1), (position_type, position_count)]
+        sections = []
+        offset = HEADER.size
+        for dtype, count in layout:
+            offset = _aligned(offset)
+            size = count * np.dtype(dtype).itemsize
+            if offset + size > len(mapped):
+                raise ValueError(f"Truncated k-mer index file '{input_path}'.")
+            sections.append(mapped[offset:offset + size].view(dtype))
+            offset += size
+
+        data, mask_positions, mask_symbols, codes, offsets, positions = sections
+        sequence = PackedSequence(data, sequence_length, 0, mask_positions, mask_symbols)
+        return cls(sequence, k_mer_length, codes, offsets, positions, digest.hex())
+
+    def __len__(self) -> int:
+        """
+        Number of distinct k-mers in the index.
+        """
+        return len(self.codes)
+
+    def _code_ranges(self, query_codes: np.ndarray) -> tuple:
+        """
+        Range of the positions array belonging to every query code, empty for codes not in the genome.
+        """
+        query_codes = np.asarray(query_codes, dtype=np.int64)
+        ids = np.searchsorted(self.codes, query_codes)
+        found = ids < len(self.codes)
+        found[found] = self.codes[ids[found]] == query_codes[found]
+        ids = np.where(found, ids, 0)
+        lower = np.where(found, self.offsets[ids], 0)
+        upper = np.where(found, self.offsets[np.minimum(ids + 1, len(self.offsets) - 1)], 0)
+        return lower, upper
+
+    def k_mer_positions(self, k_mer: str) -> np.ndarray:
+        """
+        Positions of one k-mer in the genome.
+
+        Parameters:
+        - k_mer (str): k-mer of the indexed length.
+
+        Returns:
+        - np.ndarray: Sorted positions, a view of the index.
+        """
+        # Check k-mer length
+        if len(k_mer) != self.k_mer_length:
+            raise ValueError(f"Invalid k-mer length. The index contains k-mers of length {self.k_mer_length}.")
+        lower, upper = self._code_ranges([encode_k_mer(k_mer)])
+        return self.positions[lower[0]:upper[0]]
+
+    def lookup(self, query_codes: np.ndarray) -> tuple:
+        """
+        Positions of every query code.
+
+        Parameters:
+        - query_codes (np.ndarray): k-mer codes to look up.
+
+        Returns:
+        - np.ndarray: Query number of every hit.
+        - np.ndarray: int64 position of every hit, ascending for each query.
+        """
+        lower, upper = self._code_ranges(query_codes)
+        lengths = upper - lower
+
+        # Expand the ranges into one entry per hit
+        query_ids = np.repeat(np.arange(len(lengths)), lengths)
+        entry_ids = np.arange(lengths.sum()) - np.repeat(np.cumsum(lengths) - lengths, lengths) + lower[query_ids]
+        return query_ids, self.positions[entry_ids].astype(np.int64)
+
+    def count(self, query_codes: np.ndarray, start: int = 0, stop: int = None) -> tuple:
+        """
+        Count the occurrences of every query code starting between start and stop.
+
+        Only the bounds of each code's positions are searched, so the cost does not depend on the
+        number of occurrences.
+
+        Parameters:
+        - query_codes (np.ndarray): k-mer codes to count.
+        - start (int, optional): First start position. Defaults to 0.
+        - stop (int, optional): Last start position. Defaults to the last k-mer of the genome.
+
+        Returns:
+        - np.ndarray: int64 number of occurrences per query.
+        - np.ndarray: First position per query, -1 if there is none.
+        """
+        stop = len(self.sequence) - self.k_mer_length if stop is None else stop
+        lower, upper = self._code_ranges(query_codes)
+        first_entry = _segment_search(self.positions, lower, upper, start)
+        last_entry = _segment_search(self.positions, first_entry, upper, stop + 1)
+
+        counts = (last_entry - first_entry).astype(np.int64)
+        first = np.full(len(counts), -1, dtype=np.int64)
+        first[counts > 0] = self.positions[first_entry[counts > 0]]
+        return counts, first
@@ -1,3 +1,12 @@
+from functools import lru_cache
+from itertools import combinations, product
+from math import comb
+
+import numpy as np
+
+from functions.encoding import MAX_K_MER_LENGTH, NUCLEOTIDES, decode_k_mers, encode_k_mer, encode_k_mers, reverse_complement_code, reverse_complement_codes
+from functions.sequence import reverse_complement as rev_comp_func
+
 def generate_direct_neighbours(sequence: str) -> list:
     """
     Generates direct neighbors of a given DNA sequence.
@@ -38,6 +47,140 @@ def generate_direct_neighbours(sequence: str) -> list:
     
     return sorted(direct_neighbours)
 
+@lru_cache(maxsize=64)
+def hamming_masks(k_mer_length: int, distance: int) -> np.ndarray:
+    """
+    Generates the XOR masks that turn a k-mer code into all codes within a Hamming distance.
+
+    Substituting a base changes its 2-bit code by XOR with 1, 2 or 3, independently of the base. The
+    d-neighbourhood of any k-mer code is therefore the code XOR every mask with at most 'distance'
+    non-zero 2-bit digits.
+
+    Parameters:
+    - k_mer_length (int): Length of the k-mers.
+    - distance (int): The maximum hamming distance.
+
+    Returns:
+    - np.ndarray: Read-only int64 array of masks, starting with 0 for the k-mer itself.
+    """
+    masks = [np.zeros(1, dtype=np.int64)]
+    for mismatches in range(1, min(distance, k_mer_length) + 1):
+        # Bit shifts of every combination of mismatch positions
+        shifts = 2 * (k_mer_length - 1 - np.array(list(combinations(range(k_mer_length), mismatches)), dtype=np.int64))
+        # Every combination of substitutions at these positions
+        digits = np.array(list(product((1, 2, 3), repeat=mismatches)), dtype=np.int64)
+        masks.append((digits[None, :, :] << shifts[:, None, :]).sum(axis=2).ravel())
+
+    masks = np.concatenate(masks)
+    masks.setflags(write=False)
+    return masks
+
+def hamming_ball_size(k_mer_length: int, distance: int) -> int:
+    """
+    Number of k-mers within a Hamming distance of a k-mer, i.e. the size of its d-neighbourhood.
+
+    Parameters:
+    - k_mer_length (int): Length of the k-mers.
+    - distance (int): The maximum hamming distance.
+
+    Returns:
+    - int: Sum of C(k, i) * 3^i for i up to the distance.
+    """
+    return sum(comb(k_mer_length, mismatches) * 3**mismatches for mismatches in range(min(distance, k_mer_length) + 1))
+
+def iter_d_neighbourhood_codes(code: int, k_mer_length: int, distance: int):
+    """
+    Streams the codes of a d-neighbourhood without building it in memory.
+
+    Enumerates the Hamming ball directly: every combination of positions, then every combination of
+    substitutions at these positions. Each neighbour is generated exactly once.
+
+    Parameters:
+    - code (int): Integer code of the k-mer.
+    - k_mer_length (int): Length of the k-mer.
+    - distance (int): The maximum hamming distance.
+
+    Yields:
+    - int: Codes of the k-mer and its neighbours.
+    """
+    yield code
+    for mismatches in range(1, min(distance, k_mer_length) + 1):
+        for positions in combinations(range(k_mer_length), mismatches):
+            shifts = [2 * (k_mer_length - 1 - position) for position in positions]
+            for digits in product((1, 2, 3), repeat=mismatches):
+                mask = 0
+                for digit, shift in zip(digits, shifts):
+                    mask |= digit << shift
+                yield code ^ mask
+
+def d_neighbourhood_codes(code: int, k_mer_length: int, distance: int) -> np.ndarray:
+    """
+    Generates the codes of a d-neighbourhood as NumPy array.
+
+    Parameters:
+    - code (int): Integer code of the k-mer.
+    - k_mer_length (int): Length of the k-mer.
+    - distance (int): The maximum hamming distance.
+
+    Returns:
+    - np.ndarray: Sorted int64 codes of the k-mer and its neighbours.
+    """
+    return np.sort(np.int64(code) ^ hamming_masks(k_mer_length, distance))
+
+def cached_d_neighbourhood_codes(code: int, k_mer_length: int, distance: int, reverse_complement: bool = False,
+                                 cache=None) -> np.ndarray:
+    """
+    Generates the codes of a d-neighbourhood, looking it up in a NeighbourhoodCache first.
+
+    Parameters:
+    - code (int): Integer code of the k-mer.
+    - k_mer_length (int): Length of the k-mer.
+    - distance (int): The maximum hamming distance.
+    - reverse_complement (bool, optional): Add the d-neighbourhood of the reverse complement. Defaults to False.
+    - cache (NeighbourhoodCache, optional): Cache to look up and store the neighbourhood. Defaults to None.
+
+    Returns:
+    - np.ndarray: Sorted, unique int64 codes of the neighbourhood.
+    """
+    key = (code, k_mer_length, distance, reverse_complement)
+    codes = cache.get(key) if cache is not None else None
+    if codes is None:
+        codes = d_neighbourhood_codes(code, k_mer_length, distance)
+        if reverse_complement:
+            reverse_code = reverse_complement_code(code, k_mer_length)
+            codes = np.union1d(codes, np.int64(reverse_code) ^ hamming_masks(k_mer_length, distance))
+        if cache is not None:
+            cache.put(key, codes)
+
+    return codes
+
+def _iter_d_neighbourhood_strings(sequence: str, distance: int):
+    """
+    Streams a d-neighbourhood of a sequence that cannot be encoded as integer.
+
+    Every position is substituted by all nucleotides different from the current symbol, so the
+    neighbourhood matches the repeated expansion with generate_direct_neighbours.
+    """
+    yield sequence
+    for mismatches in range(1, min(distance, len(sequence)) + 1):
+        for positions in combinations(range(len(sequence)), mismatches):
+            candidates = [[nucleotide for nucleotide in NUCLEOTIDES if nucleotide != sequence[position]]
+                          for position in positions]
+            for substitutions in product(*candidates):
+                split_sequence = list(sequence)
+                for position, nucleotide in zip(positions, substitutions):
+                    split_sequence[position] = nucleotide
+                yield "".join(split_sequence)
+
+# Translation table deleting all nucleotides, used to detect other symbols
+_DELETE_NUCLEOTIDES = str.maketrans("", "", NUCLEOTIDES)
+
+def _is_encodable(sequence: str) -> bool:
+    """
+    Check whether a sequence can be represented as integer k-mer code.
+    """
+    return len(sequence) <= MAX_K_MER_LENGTH and sequence.translate(_DELETE_NUCLEOTIDES) == ""
+
 def generate_d_neighbourhood(sequence: str, distance: int) -> list:
     """
     Generates a d-neighborhood of a given DNA sequence.
@@ -50,8 +193,8 @@ def generate_d_neighbourhood(sequence: str, distance: int) -> list:
     - list: A list containing the input sequence and its d-neighbors within the specified distance.
     
     Example:
-    >> generate_d_neighbourhood(sequence="AT")
-    ['AG', 'CG', 'GA', 'TC', 'GG', 'AA', 'AT', 'GT', 'CT', 'CC', 'AC', 'GC', 'TG', 'CA', 'TA', 'TT']
+    >> generate_d_neighbourhood(sequence="AT", distance=1)
+    ['AA', 'AC', 'AG', 'AT', 'CT', 'GT', 'TT']
     """
     
     # Check that sequence is not empty or none
@@ -64,27 +207,17 @@ def generate_d_neighbourhood(sequence: str, distance: int) -> list:
     if distance < 0:
         raise ValueError("Negative distance.")
     
-    # Initialize neighbourhood
-    neighbourhood = [sequence]
     if distance == 0:
-        return neighbourhood
-    
-    for _ in range(distance):
-        # Initialize temporary storage
-        current_neighbours = []
-        # Iterrate over sequences in neighbourhood
-        for seq in neighbourhood:
-            direct_neighbours = generate_direct_neighbours(sequence=seq)
-            current_neighbours += direct_neighbours
-        
-        # Add current neighbours to neighbourhood
-        neighbourhood += current_neighbours
-        # Remove duplicates
-        neighbourhood = list(set(neighbourhood))
+        return [sequence]
     
-    return sorted(neighbourhood)
+    # Enumerate the Hamming ball on integer codes, sorted codes decode to sorted k-mers
+    if _is_encodable(sequence):
+        codes = d_neighbourhood_codes(encode_k_mer(sequence), len(sequence), distance)
+        return decode_k_mers(codes, len(sequence))
+    
+    return sorted(_iter_d_neighbourhood_strings(sequence, distance))
 
-def neighbourhood_dictionary(k_mers: list, distance: int) -> dict:
+def neighbourhood_dictionary(k_mers: list, distance: int, reverse_complement: bool = False, cache=None) -> dict:
     """
     Generates a dictionary of k-mers and their corresponding d-neighbourhoods.
     
@@ -92,10 +225,13 @@ def neighbourhood_dictionary(k_mers: list, distance: int) -> dict:
     
     - k_mers (list): A list of k-mers.
     - distance (int): The maximum Hamming distance for generating d-neighbourhoods.
+    - reverse_complement (bool, optional): Add the d-neighbourhood of the reverse complement of each k-mer.
+    Defaults to False.
+    - cache (NeighbourhoodCache, optional): Cache of neighbourhood codes shared across calls. Defaults to None.
 
     Returns:
     
-    - dict: A dictionary where keys are k-mers and values are their d-neighbourhoods.
+    - dict: A dictionary where keys are k-mers and values are their sorted d-neighbourhoods.
     """
     # Check that k_mers is not empty or none
     if k_mers is None or len(k_mers) == 0:
@@ -109,8 +245,45 @@ def neighbourhood_dictionary(k_mers: list, distance: int) -> dict:
     
     # Initialize empty neighbourhood dictionary
     neighbourhood_dict = {}
-    # Iterate over all k-mers, use them as keys and generate the corresponding d-neighbourhood
+    # Group k-mers of equal length that can be expanded on integer codes in bulk
+    groups = {}
     for k_mer in k_mers:
-        neighbourhood_dict[k_mer] = generate_d_neighbourhood(sequence=k_mer, distance=distance)
+        # Check every k-mer like generate_d_neighbourhood does
+        if not isinstance(k_mer, str) or len(k_mer) == 0:
+            raise ValueError("Invalid k-mer. Please provide k-mers as non-empty strings.")
+        if _is_encodable(k_mer):
+            groups.setdefault(len(k_mer), []).append(k_mer)
+        else:
+            neighbourhood = set(_iter_d_neighbourhood_strings(k_mer, distance))
+            if reverse_complement:
+                neighbourhood.update(_iter_d_neighbourhood_strings(rev_comp_func(k_mer), distance))
+            neighbourhood_dict[k_mer] = sorted(neighbourhood)
+    
+    for k_mer_length, group in groups.items():
+        codes, _ = encode_k_mers(group, k_mer_length)
+        if cache is not None:
+            # Look up every neighbourhood in the cache
+            balls = [cached_d_neighbourhood_codes(code, k_mer_length, distance, reverse_complement, cache)
+                     for code in codes.tolist()]
+            sizes = [len(ball) for ball in balls]
+            neighbours = decode_k_mers(np.concatenate(balls), k_mer_length)
+        else:
+            masks = hamming_masks(k_mer_length, distance)
+            # Each row holds the Hamming ball of one k-mer
+            balls = codes[:, None] ^ masks[None, :]
+            if reverse_complement:
+                reverse_codes = reverse_complement_codes(codes, k_mer_length)
+                balls = np.concatenate((balls, reverse_codes[:, None] ^ masks[None, :]), axis=1)
+            balls.sort(axis=1)
+            # Drop neighbours shared by the ball of a k-mer and of its reverse complement
+            keep = np.ones(balls.shape, dtype=bool)
+            keep[:, 1:] = balls[:, 1:] != balls[:, :-1]
+            sizes = keep.sum(axis=1)
+            neighbours = decode_k_mers(balls[keep], k_mer_length)
         
-    return neighbourhood_dict
\ No newline at end of file
+        bounds = np.concatenate(([0], np.cumsum(sizes))).tolist()
+        for k_mer, lower, upper in zip(group, bounds[:-1], bounds[1:]):
+            neighbourhood_dict[k_mer] = neighbours[lower:upper]
+    
+    # Restore the order of the input k-mers
+    return {k_mer: neighbourhood_dict[k_mer] for k_mer in k_mers}
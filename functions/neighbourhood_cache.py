@@ -0,0 +1,164 @@
+from collections import OrderedDict
+from threading import Lock
+
+import numpy as np
+
+# Approximate memory used by one cache entry in addition to its code array
+ENTRY_OVERHEAD_BYTES = 200
+# Default memory limit of the process-wide cache
+DEFAULT_MAX_BYTES = 128 * 2**20
+
+class NeighbourhoodCache():
+    """
+    Memory-bounded LRU cache of d-neighbourhoods stored as arrays of k-mer codes.
+
+    Entries are keyed by (k-mer code, k-mer length, distance, reverse_complement). When the stored
+    arrays exceed max_bytes, the least recently used entries are evicted.
+    """
+
+    def __init__(self, max_bytes: int = DEFAULT_MAX_BYTES):
+        """
+        Create an empty cache.
+
+        Parameters:
+        - max_bytes (int, optional): Memory limit of the cached neighbourhoods. Defaults to 128 MiB.
+        """
+        # Check for non-negative memory limit
+        if not isinstance(max_bytes, int) or max_bytes < 0:
+            raise ValueError("Invalid memory limit. Please provide a non-negative integer max_bytes.")
+
+        self.max_bytes = max_bytes
+        self._entries = OrderedDict()
+        self._bytes = 0
+        self._lock = Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    @property
+    def nbytes(self) -> int:
+        """
+        Approximate memory used by the cached neighbourhoods.
+        """
+        return self._bytes
+
+    def get(self, key: tuple) -> np.ndarray:
+        """
+        Look up a neighbourhood and mark it as recently used.
+
+        Parameters:
+        - key (tuple): (k-mer code, k-mer length, distance, reverse_complement).
+
+        Returns:
+        - np.ndarray: Sorted neighbourhood codes, or None if the key is not cached.
+        """
+        with self._lock:
+            codes = self._entries.get(key)
+            if codes is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return codes
+
+    def put(self, key: tuple, codes: np.ndarray) -> None:
+        """
+        Store a neighbourhood and evict least recently used entries beyond the memory limit.
+
+        Parameters:
+        - key (tuple): (k-mer code, k-mer length, distance, reverse_complement).
+        - codes (np.ndarray): Sorted neighbourhood codes.
+        """
+        size = codes.nbytes + ENTRY_OVERHEAD_BYTES
+        # Entries larger than the whole cache are not stored
+        if size > self.max_bytes:
+            return
+
+        codes.setflags(write=False)
+        with self._lock:
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self._bytes -= previous.nbytes + ENTRY_OVERHEAD_BYTES
+            self._entries[key] = codes
+            self._bytes += size
+            self._evict()
+
+    def _evict(self) -> None:
+        """
+        Remove least recently used entries until the cache fits into max_bytes. Requires the lock.
+        """
+        while self._bytes > self.max_bytes and len(self._entries) > 0:
+            _, codes = self._entries.popitem(last=False)
+            self._bytes -= codes.nbytes + ENTRY_OVERHEAD_BYTES
+            self.evictions += 1
+
+    def resize(self, max_bytes: int) -> None:
+        """
+        Change the memory limit and evict entries that no longer fit.
+
+        Parameters:
+        - max_bytes (int): New memory limit.
+        """
+        # Check for non-negative memory limit
+        if not isinstance(max_bytes, int) or max_bytes < 0:
+            raise ValueError("Invalid memory limit. Please provide a non-negative integer max_bytes.")
+
+        with self._lock:
+            self.max_bytes = max_bytes
+            self._evict()
+
+    def clear(self) -> None:
+        """
+        Remove all entries and reset the statistics.
+        """
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+            self.hits = 0
+            self.misses = 0
+            self.evictions = 0
+
+    def stats(self) -> dict:
+        """
+        Hit/miss statistics of the cache.
+
+        Returns:
+        - dict: Hits, misses, hit rate, evictions, number of entries, used and maximum bytes.
+        """
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {"hits": self.hits,
+                    "misses": self.misses,
+                    "hit_rate": self.hits / lookups if lookups > 0 else 0.0,
+                    "evictions": self.evictions,
+                    "entries": len(self._entries),
+                    "bytes": self._bytes,
+                    "max_bytes": self.max_bytes}
+
+# Cache shared by all analyses of the process
+_default_cache = NeighbourhoodCache()
+
+def get_default_cache() -> NeighbourhoodCache:
+    """
+    Return the process-wide neighbourhood cache.
+
+    Returns:
+    - NeighbourhoodCache: The cache used by OriAnalyzer instances without an own cache.
+    """
+    return _default_cache
+
+def set_default_cache(cache: NeighbourhoodCache) -> None:
+    """
+    Replace the process-wide neighbourhood cache.
+
+    Parameters:
+    - cache (NeighbourhoodCache): The new process-wide cache.
+    """
+    global _default_cache
+    # Check for correct data type
+    if not isinstance(cache, NeighbourhoodCache):
+        raise ValueError("Invalid input type. Please provide a NeighbourhoodCache.")
+    _default_cache = cache
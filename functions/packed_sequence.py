@@ -0,0 +1,390 @@
+import numpy as np
+
+from functions.encoding import CODE_LOOKUP, INVALID_CODE, MAX_K_MER_LENGTH, NUCLEOTIDE_BYTES, rolling_k_mer_codes
+
+# Complement of IUPAC symbols that are stored in the sparse mask
+IUPAC_COMPLEMENT = bytes.maketrans(b"ACGTRYSWKMBDHVN", b"TGCAYRSWMKVHDBN")
+# Bases moved at once by insertions, a multiple of 4
+EDIT_CHUNK_SIZE = 2**16
+
+class PackedSequence():
+    """
+    DNA sequence stored with 2 bits per base.
+
+    Bases are packed four per byte, the first base in the most significant bits. Symbols other than
+    A, C, G and T (e.g. N or other IUPAC codes) are stored as code 0 in the packed buffer and recorded
+    in a sparse mask of positions and symbols. Slicing returns views that share the packed buffer.
+    substitute, insert and append edit the sequence in place and only touch the edited bases, or the
+    bases after an insertion. Views sharing the buffer are invalid after an edit, so only edit copies
+    that are not handed out.
+    """
+
+    __slots__ = ("_data", "_start", "_length", "_mask_positions", "_mask_symbols")
+
+    def __init__(self, data: np.ndarray, length: int, start: int = 0, mask_positions: np.ndarray = None,
+                 mask_symbols: np.ndarray = None):
+        """
+        Create a packed sequence from an existing packed buffer.
+
+        Parameters:
+        - data (np.ndarray): uint8 array with four 2-bit codes per byte.
+        - length (int): Number of bases of the sequence.
+        - start (int, optional): Offset of the first base in the packed buffer. Defaults to 0.
+        - mask_positions (np.ndarray, optional): Sorted buffer positions of symbols other than A, C, G and T.
+        - mask_symbols (np.ndarray, optional): ASCII values of the masked symbols.
+        """
+        self._data = data
+        self._start = start
+        self._length = length
+        self._mask_positions = mask_positions if mask_positions is not None else np.zeros(0, dtype=np.int64)
+        self._mask_symbols = mask_symbols if mask_symbols is not None else np.zeros(0, dtype=np.uint8)
+
+    @classmethod
+    def from_string(cls, sequence) -> "PackedSequence":
+        """
+        Pack a DNA sequence. Lowercase bases are converted to uppercase.
+
+        Parameters:
+        - sequence (str | bytes): The input DNA sequence.
+
+        Returns:
+        - PackedSequence: The packed sequence.
+        """
+        codes, mask_positions, mask_symbols = cls._encode(sequence)
+        return cls(cls._pack(codes), len(codes), 0, mask_positions, mask_symbols)
+
+    @classmethod
+    def from_chunks(cls, chunks) -> "PackedSequence":
+        """
+        Pack a DNA sequence given as iterable of chunks without joining the chunks first.
+
+        Parameters:
+        - chunks (iterable): Consecutive parts of the sequence as str or bytes.
+
+        Returns:
+        - PackedSequence: The packed sequence.
+        """
+        packed_parts = []
+        mask_positions = []
+        mask_symbols = []
+        length = 0
+        remainder = b""
+        for chunk in chunks:
+            if isinstance(chunk, str):
+                chunk = chunk.encode("ascii", errors="replace")
+            chunk = remainder + chunk
+            # Pack whole bytes only and carry the remaining bases into the next chunk
+            cut = len(chunk) - len(chunk) % 4
+            part = cls.from_string(chunk[:cut])
+            remainder = chunk[cut:]
+            packed_parts.append(part._data)
+            mask_positions.append(part._mask_positions + length)
+            mask_symbols.append(part._mask_symbols)
+            length += cut
+
+        part = cls.from_string(remainder)
+        packed_parts.append(part._data)
+        mask_positions.append(part._mask_positions + length)
+        mask_symbols.append(part._mask_symbols)
+        length += len(remainder)
+
+        return cls(np.concatenate(packed_parts), length, 0, np.concatenate(mask_positions),
+                   np.concatenate(mask_symbols))
+
+    @staticmethod
+    def _encode(sequence) -> tuple:
+        """
+        2-bit codes of a sequence, 0 for masked symbols, with the positions and ASCII values of the masked symbols.
+        """
+        if isinstance(sequence, str):
+            sequence = sequence.encode("ascii", errors="replace")
+        raw = np.frombuffer(sequence.upper(), dtype=np.uint8)
+        codes = CODE_LOOKUP[raw]
+
+        # Record symbols that cannot be represented with 2 bits
+        mask_positions = np.flatnonzero(codes == INVALID_CODE)
+        mask_symbols = raw[mask_positions].copy()
+        codes[mask_positions] = 0
+        return codes, mask_positions.astype(np.int64), mask_symbols
+
+    @staticmethod
+    def _pack(codes: np.ndarray) -> np.ndarray:
+        """
+        Pack an array of 2-bit codes four per byte.
+        """
+        padded = np.zeros(-(-len(codes) // 4) * 4, dtype=np.uint8)
+        padded[:len(codes)] = codes
+        quads = padded.reshape(-1, 4)
+        return (quads[:, 0] << 6) | (quads[:, 1] << 4) | (quads[:, 2] << 2) | quads[:, 3]
+
+    def __len__(self) -> int:
+        return self._length
+
+    def __repr__(self) -> str:
+        return f"PackedSequence(length={self._length})"
+
+    def __str__(self) -> str:
+        return self.to_bytes().decode("ascii")
+
+    def __eq__(self, other) -> bool:
+        if isinstance(other, PackedSequence):
+            return len(self) == len(other) and self.to_bytes() == other.to_bytes()
+        if isinstance(other, str):
+            return len(self) == len(other) and str(self) == other
+        return NotImplemented
+
+    __hash__ = None
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            start, stop, step = index.indices(self._length)
+            if step != 1:
+                raise ValueError("Packed sequences only support contiguous slices.")
+            stop = max(start, stop)
+            # Views share the packed buffer and the mask
+            return PackedSequence(self._data, stop - start, self._start + start, self._mask_positions,
+                                  self._mask_symbols)
+
+        # Check index
+        if index < 0:
+            index += self._length
+        if not 0 <= index < self._length:
+            raise IndexError("Sequence index out of range.")
+        return chr(self.to_bytes(index, index + 1)[0])
+
+    @property
+    def nbytes(self) -> int:
+        """
+        Number of bytes used by the packed buffer and the mask.
+        """
+        return self._data.nbytes + self._mask_positions.nbytes + self._mask_symbols.nbytes
+
+    @property
+    def packed_data(self) -> np.ndarray:
+        """
+        Packed buffer holding exactly this sequence, repacked if the view does not start at a byte boundary.
+        """
+        if self._start % 4 == 0:
+            return self._data[self._start // 4:self._start // 4 + -(-self._length // 4)]
+        return self._pack(np.minimum(self.codes(), 3))
+
+    def _mask_range(self, start: int, stop: int) -> tuple:
+        """
+        Return the masked positions (relative to the view) and symbols between start and stop.
+        """
+        lower, upper = np.searchsorted(self._mask_positions, (self._start + start, self._start + stop))
+        return self._mask_positions[lower:upper] - self._start, self._mask_symbols[lower:upper]
+
+    def mask(self) -> tuple:
+        """
+        Positions and symbols of all bases other than A, C, G and T.
+
+        Returns:
+        - np.ndarray: Positions relative to the start of the sequence.
+        - np.ndarray: ASCII values of the masked symbols.
+        """
+        return self._mask_range(0, self._length)
+
+    def _unpack(self, first: int, last: int) -> np.ndarray:
+        """
+        Unpack the 2-bit codes of the buffer positions first to last - 1, without applying the mask.
+        """
+        # Unpack only the bytes covering the requested range
+        packed = self._data[first // 4:-(-last // 4)]
+        unpacked = np.empty((len(packed), 4), dtype=np.uint8)
+        for column, shift in enumerate((6, 4, 2, 0)):
+            unpacked[:, column] = (packed >> shift) & 3
+        return unpacked.ravel()[first % 4:first % 4 + last - first]
+
+    def _write(self, first: int, codes: np.ndarray) -> None:
+        """
+        Overwrite the 2-bit codes from buffer position first, repacking only the bytes covering them.
+        """
+        lower = first // 4
+        upper = -(-(first + len(codes)) // 4)
+        current = self._unpack(4 * lower, 4 * upper)
+        current[first - 4 * lower:first - 4 * lower + len(codes)] = codes
+        self._data[lower:upper] = self._pack(current)
+
+    def codes(self, start: int = 0, stop: int = None) -> np.ndarray:
+        """
+        Unpack the 2-bit codes of a part of the sequence.
+
+        Parameters:
+        - start (int, optional): First position. Defaults to 0.
+        - stop (int, optional): Position after the last base. Defaults to the sequence length.
+
+        Returns:
+        - np.ndarray: uint8 codes, with INVALID_CODE at masked positions.
+        """
+        stop = self._length if stop is None else stop
+        codes = self._unpack(self._start + start, self._start + stop)
+
+        mask_positions, _ = self._mask_range(start, stop)
+        codes[mask_positions - start] = INVALID_CODE
+        return codes
+
+    def to_bytes(self, start: int = 0, stop: int = None) -> bytes:
+        """
+        Decode a part of the sequence into ASCII bytes.
+
+        Parameters:
+        - start (int, optional): First position. Defaults to 0.
+        - stop (int, optional): Position after the last base. Defaults to the sequence length.
+
+        Returns:
+        - bytes: The decoded sequence.
+        """
+        stop = self._length if stop is None else stop
+        codes = self.codes(start, stop)
+        characters = NUCLEOTIDE_BYTES[np.minimum(codes, 3)]
+        mask_positions, mask_symbols = self._mask_range(start, stop)
+        characters[mask_positions - start] = mask_symbols
+        return characters.tobytes()
+
+    def k_mer_code(self, position: int, k_mer_length: int) -> int:
+        """
+        Extract the integer code of a single k-mer directly from the packed buffer.
+
+        Parameters:
+        - position (int): Start position of the k-mer.
+        - k_mer_length (int): Length of the k-mer.
+
+        Returns:
+        - int: Integer code of the k-mer.
+        """
+        # Check k-mer position and length
+        if not 0 < k_mer_length <= MAX_K_MER_LENGTH:
+            raise ValueError(f"Invalid k-mer length. Please provide k-mers of length 1 to {MAX_K_MER_LENGTH}.")
+        if not 0 <= position <= self._length - k_mer_length:
+            raise ValueError("Invalid k-mer position. The k-mer must lie within the sequence.")
+
+        first = self._start + position
+        last = first + k_mer_length - 1
+        # Read the few bytes covering the k-mer and cut out its bits
+        value = int.from_bytes(self._data[first // 4:last // 4 + 1].tobytes(), "big")
+        value >>= 2 * (3 - last % 4)
+        return value & ((1 << (2 * k_mer_length)) - 1)
+
+    def k_mer_codes(self, k_mer_length: int, start: int = 0, stop: int = None) -> tuple:
+        """
+        Integer codes of all k-mers starting between start and stop - k.
+
+        Parameters:
+        - k_mer_length (int): Length of the k-mers.
+        - start (int, optional): First position. Defaults to 0.
+        - stop (int, optional): Position after the last base. Defaults to the sequence length.
+
+        Returns:
+        - np.ndarray: int64 codes of the k-mers.
+        - np.ndarray: Boolean array, False for k-mers overlapping a masked symbol.
+        """
+        return rolling_k_mer_codes(self.codes(start, stop), k_mer_length)
+
+    def reverse_complement(self) -> "PackedSequence":
+        """
+        Generate the reverse complement of the sequence.
+
+        Returns:
+        - PackedSequence: The reverse complement as new packed sequence.
+        """
+        codes = self.codes()
+        reverse = 3 - np.minimum(codes, 3)[::-1]
+        mask_positions, mask_symbols = self.mask()
+        reverse_positions = (self._length - 1 - mask_positions)[::-1]
+        reverse_symbols = np.frombuffer(mask_symbols.tobytes().translate(IUPAC_COMPLEMENT), dtype=np.uint8)[::-1]
+        reverse[reverse_positions] = 0
+
+        return PackedSequence(self._pack(reverse), self._length, 0, reverse_positions.astype(np.int64),
+                              reverse_symbols.copy())
+
+    def copy(self) -> "PackedSequence":
+        """
+        Copy the sequence into its own packed buffer and mask.
+
+        Returns:
+        - PackedSequence: The copy, not sharing any data with this sequence.
+        """
+        mask_positions, mask_symbols = self.mask()
+        return PackedSequence(self.packed_data.copy(), self._length, 0, mask_positions.astype(np.int64),
+                              mask_symbols.copy())
+
+    def substitute(self, position: int, sequence) -> None:
+        """
+        Replace the bases starting at a position in place, repacking only the bytes of the replaced bases.
+
+        Parameters:
+        - position (int): Position of the first replaced base.
+        - sequence (str | bytes): The new bases.
+        """
+        codes, mask_positions, mask_symbols = self._encode(sequence)
+        # Check position
+        if not 0 <= position <= self._length - len(codes):
+            raise ValueError("Invalid position. The substituted bases must lie within the sequence.")
+
+        first = self._start + position
+        self._write(first, codes)
+        # Replace the mask entries of the substituted bases
+        lower, upper = np.searchsorted(self._mask_positions, (first, first + len(codes)))
+        self._mask_positions = np.concatenate((self._mask_positions[:lower], mask_positions + first,
+                                               self._mask_positions[upper:]))
+        self._mask_symbols = np.concatenate((self._mask_symbols[:lower], mask_symbols, self._mask_symbols[upper:]))
+
+    def insert(self, position: int, sequence) -> None:
+        """
+        Insert bases before a position in place, moving the bases from the position to the end.
+
+        The bases are moved in chunks of EDIT_CHUNK_SIZE, as whole bytes if the number of inserted bases is a
+        multiple of 4. The packed buffer grows by doubling, so appending costs amortized O(1) per base.
+
+        Parameters:
+        - position (int): Position before which the bases are inserted; the sequence length appends.
+        - sequence (str | bytes): The inserted bases.
+        """
+        codes, mask_positions, mask_symbols = self._encode(sequence)
+        # Check position
+        if not 0 <= position <= self._length:
+            raise ValueError("Invalid position. Please provide a position within the sequence.")
+
+        if len(codes) == 0:
+            return
+
+        first = self._start + position
+        end = self._start + self._length
+        shift = len(codes)
+        # Grow the buffer if the sequence no longer fits
+        size = -(-(end + shift) // 4)
+        if size > len(self._data):
+            data = np.zeros(max(size, 2 * len(self._data)), dtype=np.uint8)
+            data[:len(self._data)] = self._data
+            self._data = data
+
+        # Move the bases after the position in chunks from the end backwards, so no unread base is overwritten
+        if shift % 4 == 0:
+            # Whole bytes are moved; bases of the first moved byte before the position are overwritten below
+            byte_shift = shift // 4
+            lower = first // 4
+            for upper in range(-(-end // 4), lower, -(EDIT_CHUNK_SIZE // 4)):
+                chunk_start = max(lower, upper - EDIT_CHUNK_SIZE // 4)
+                self._data[chunk_start + byte_shift:upper + byte_shift] = self._data[chunk_start:upper]
+        else:
+            for upper in range(end, first, -EDIT_CHUNK_SIZE):
+                chunk_start = max(first, upper - EDIT_CHUNK_SIZE)
+                self._write(chunk_start + shift, self._unpack(chunk_start, upper))
+        self._write(first, codes)
+        self._length += shift
+
+        # Shift the mask entries after the position
+        lower = np.searchsorted(self._mask_positions, first)
+        self._mask_positions = np.concatenate((self._mask_positions[:lower], mask_positions + first,
+                                               self._mask_positions[lower:] + len(codes)))
+        self._mask_symbols = np.concatenate((self._mask_symbols[:lower], mask_symbols, self._mask_symbols[lower:]))
+
+    def append(self, sequence) -> None:
+        """
+        Append bases in place.
+
+        Parameters:
+        - sequence (str | bytes): The appended bases.
+        """
+        self.insert(self._length, sequence)
@@ -1,17 +1,314 @@
-def pattern_frequency(sequence: str, seq_range: tuple, neighbourhood_dict: dict) -> dict:
+import os
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing.shared_memory import SharedMemory
+
+import numpy as np
+
+from functions.encoding import MAX_K_MER_LENGTH, encode_k_mers, rolling_k_mer_codes, sequence_codes
+from functions.packed_sequence import PackedSequence
+
+# Fewest windows per shard of the parallel count, smaller ranges are not worth starting processes
+MIN_SHARD_WINDOWS = 2**16
+# Shards per worker process, so that workers finishing early take over the remaining shards
+SHARDS_PER_PROCESS = 4
+# Sections of the shared memory segment start at multiples of this alignment
+ALIGNMENT = 8
+
+class NeighbourIndex():
+    """
+    Inverted index from neighbour k-mers to the k-mers whose d-neighbourhood contains them.
+
+    Neighbours consisting of A, C, G and T are stored as integer codes, sorted and paired with the
+    position of their owning k-mer in the neighbourhood dictionary. Neighbours that cannot be encoded
+    (other symbols or k-mers longer than MAX_K_MER_LENGTH) are kept in a string dictionary.
+    """
+
+    def __init__(self, neighbourhood_dict: dict):
+        """
+        Build the index from a neighbourhood dictionary.
+
+        Parameters:
+        - neighbourhood_dict (dict): A dictionary containing k-mers as keys and their corresponding d-neighbourhoods as values.
+        """
+        # Owners in dictionary order; the pattern length is taken from the first key
+        self.owners = list(neighbourhood_dict.keys())
+        self.pattern_length = len(self.owners[0])
+
+        neighbours = []
+        owner_ids = []
+        for owner_id, neighbourhood in enumerate(neighbourhood_dict.values()):
+            # Only neighbours of the window length can ever match
+            matching = [neighbour for neighbour in neighbourhood if len(neighbour) == self.pattern_length]
+            neighbours += matching
+            owner_ids += [owner_id] * len(matching)
+
+        if self.pattern_length <= MAX_K_MER_LENGTH and len(neighbours) > 0:
+            codes, valid = encode_k_mers(neighbours, self.pattern_length)
+        else:
+            codes, valid = np.zeros(len(neighbours), dtype=np.int64), np.zeros(len(neighbours), dtype=bool)
+
+        # Neighbours that cannot be encoded are looked up as strings
+        self.string_index = {}
+        for neighbour_id in np.flatnonzero(~valid).tolist():
+            owner_list = self.string_index.setdefault(neighbours[neighbour_id], [])
+            if owner_ids[neighbour_id] not in owner_list:
+                owner_list.append(owner_ids[neighbour_id])
+
+        # Sort by neighbour code and drop neighbours listed twice for the same owner
+        codes = codes[valid]
+        owner_ids = np.array(owner_ids, dtype=np.int64)[valid]
+        order = np.lexsort((owner_ids, codes))
+        codes, owner_ids = codes[order], owner_ids[order]
+        unique = np.ones(len(codes), dtype=bool)
+        unique[1:] = (codes[1:] != codes[:-1]) | (owner_ids[1:] != owner_ids[:-1])
+        self.codes = codes[unique]
+        self.owner_ids = owner_ids[unique]
+
+    @classmethod
+    def from_arrays(cls, owners, pattern_length: int, codes: np.ndarray, owner_ids: np.ndarray,
+                    string_index: dict) -> "NeighbourIndex":
+        """
+        Create an index from the arrays of an existing index, e.g. views of shared memory.
+
+        Parameters:
+        - owners (list | range): Owners in dictionary order; counting only needs their number.
+        - pattern_length (int): Length of the patterns.
+        - codes (np.ndarray): Sorted neighbour codes.
+        - owner_ids (np.ndarray): Owner of every neighbour code.
+        - string_index (dict): Owner ids of the neighbours that cannot be encoded.
+
+        Returns:
+        - NeighbourIndex: The index.
+        """
+        neighbour_index = cls.__new__(cls)
+        neighbour_index.owners = owners
+        neighbour_index.pattern_length = pattern_length
+        neighbour_index.codes = codes
+        neighbour_index.owner_ids = owner_ids
+        neighbour_index.string_index = string_index
+        return neighbour_index
+
+    def count(self, sequence_part, offset: int = 0) -> tuple:
+        """
+        Count the windows of a sequence part that lie in the neighbourhood of every owner.
+
+        Parameters:
+        - sequence_part (str | PackedSequence): Part of the DNA sequence to scan.
+        - offset (int, optional): Position of the first window, added to the reported first hits. Defaults to 0.
+
+        Returns:
+        - np.ndarray: Number of matching windows per owner.
+        - np.ndarray: Position of the first matching window per owner, -1 if there is none.
+        """
+        counts = np.zeros(len(self.owners), dtype=np.int64)
+        first = np.full(len(self.owners), np.iinfo(np.int64).max, dtype=np.int64)
+        window_count = len(sequence_part) - self.pattern_length + 1
+
+        if self.pattern_length <= MAX_K_MER_LENGTH:
+            # Encode every window as 2k-bit integer
+            if isinstance(sequence_part, PackedSequence):
+                window_codes, valid = sequence_part.k_mer_codes(self.pattern_length)
+            else:
+                window_codes, valid = rolling_k_mer_codes(sequence_codes(sequence_part), self.pattern_length)
+
+            # Each distinct window code is looked up once, weighted by its number of occurrences
+            valid_positions = np.flatnonzero(valid)
+            window_codes, first_index, window_counts = np.unique(window_codes[valid_positions], return_index=True,
+                                                                 return_counts=True)
+            window_first = valid_positions[first_index]
+
+            # Range of index entries for every window code
+            lower = np.searchsorted(self.codes, window_codes, side="left")
+            upper = np.searchsorted(self.codes, window_codes, side="right")
+            lengths = upper - lower
+
+            # Expand the ranges into one entry per (window code, owner) pair
+            window_ids = np.repeat(np.arange(len(window_codes)), lengths)
+            entry_ids = np.arange(lengths.sum()) - np.repeat(np.cumsum(lengths) - lengths, lengths) + lower[window_ids]
+            hit_owners = self.owner_ids[entry_ids]
+            counts += np.bincount(hit_owners, weights=window_counts[window_ids],
+                                  minlength=len(self.owners)).astype(np.int64)
+            np.minimum.at(first, hit_owners, window_first[window_ids])
+
+            invalid_positions = np.flatnonzero(~valid).tolist() if len(self.string_index) > 0 else []
+        else:
+            invalid_positions = range(window_count)
+
+        # Windows that cannot be encoded are matched as strings
+        if len(invalid_positions) > 0:
+            sequence_part = str(sequence_part)
+            for pos in invalid_positions:
+                for owner_id in self.string_index.get(sequence_part[pos:pos + self.pattern_length], ()):
+                    counts[owner_id] += 1
+                    first[owner_id] = min(first[owner_id], pos)
+
+        first[counts == 0] = -1
+        first[counts > 0] += offset
+        return counts, first
+
+    def count_k_mer_index(self, k_mer_index, start: int, stop: int) -> tuple:
+        """
+        Count the matching windows of sequence[start:stop + 1] in a KMerIndex of the genome.
+
+        Every neighbour code is counted by two binary searches in its position list, so the genome is
+        not scanned at all. Requires an index of the pattern length and neighbours of A, C, G and T only.
+
+        Parameters:
+        - k_mer_index (KMerIndex): Index of the genome with k-mers of the pattern length.
+        - start (int): First position of the range.
+        - stop (int): Last position of the range.
+
+        Returns:
+        - np.ndarray: Number of matching windows per owner.
+        - np.ndarray: Position of the first matching window per owner in the genome, -1 if there is none.
+        """
+        neighbour_counts, neighbour_first = k_mer_index.count(self.codes, start, stop - self.pattern_length + 1)
+        found = neighbour_counts > 0
+
+        counts = np.bincount(self.owner_ids, weights=neighbour_counts, minlength=len(self.owners)).astype(np.int64)
+        first = np.full(len(self.owners), np.iinfo(np.int64).max, dtype=np.int64)
+        np.minimum.at(first, self.owner_ids[found], neighbour_first[found])
+        first[counts == 0] = -1
+        return counts, first
+
+    def count_parallel(self, sequence_part, processes: int) -> tuple:
+        """
+        Count the matching windows of a sequence part in parallel worker processes.
+
+        The part is split into shards of consecutive windows, overlapping by k - 1 bases so that every
+        window lies in exactly one shard. The packed sequence and the index arrays are placed in one
+        shared memory segment, which the workers map instead of receiving copies. Counts of the shards
+        are summed and first positions minimized, so the result equals count.
+
+        Parameters:
+        - sequence_part (str | PackedSequence): Part of the DNA sequence to scan.
+        - processes (int): Number of worker processes.
+
+        Returns:
+        - np.ndarray: Number of matching windows per owner.
+        - np.ndarray: Position of the first matching window per owner, -1 if there is none.
+        """
+        if isinstance(sequence_part, str):
+            sequence_part = PackedSequence.from_string(sequence_part)
+        window_count = len(sequence_part) - self.pattern_length + 1
+        shard_count = min(processes * SHARDS_PER_PROCESS, window_count // MIN_SHARD_WINDOWS)
+        if processes < 2 or shard_count < 2:
+            return self.count(sequence_part)
+
+        # Shards of windows, each extended by the k - 1 bases of its last window
+        bounds = np.linspace(0, window_count, shard_count + 1).astype(np.int64).tolist()
+        shards = [(lower, upper + self.pattern_length - 1) for lower, upper in zip(bounds[:-1], bounds[1:])]
+
+        mask_positions, mask_symbols = sequence_part.mask()
+        shared_memory, layout = _share_arrays([sequence_part.packed_data, mask_positions.astype(np.int64), mask_symbols,
+                                               self.codes, self.owner_ids])
+        counts = np.zeros(len(self.owners), dtype=np.int64)
+        first = np.full(len(self.owners), np.iinfo(np.int64).max, dtype=np.int64)
+        try:
+            initargs = (shared_memory.name, layout, len(sequence_part), len(self.owners), self.pattern_length,
+                        self.string_index)
+            with ProcessPoolExecutor(max_workers=min(processes, len(shards)), initializer=_init_shard_worker,
+                                     initargs=initargs) as executor:
+                for shard_counts, shard_first in executor.map(_count_shard, shards):
+                    counts += shard_counts
+                    np.minimum(first, np.where(shard_first >= 0, shard_first, first), out=first)
+        finally:
+            shared_memory.close()
+            shared_memory.unlink()
+
+        first[counts == 0] = -1
+        return counts, first
+
+    def frequency_dict(self, counts: np.ndarray, first: np.ndarray) -> dict:
+        """
+        Convert counts per owner into a frequency dictionary.
+
+        The dictionary contains owners with at least one matching window, ordered by their first matching
+        window and then by their order in the neighbourhood dictionary.
+
+        Parameters:
+        - counts (np.ndarray): Number of matching windows per owner.
+        - first (np.ndarray): Position of the first matching window per owner.
+
+        Returns:
+        - dict: A dictionary where keys are patterns and values are their frequencies in the sequence.
+        """
+        found = np.flatnonzero(counts > 0)
+        found = found[np.argsort(first[found], kind="stable")]
+        return {self.owners[owner_id]: int(counts[owner_id]) for owner_id in found.tolist()}
+
+def _share_arrays(arrays: list) -> tuple:
+    """
+    Copy arrays into a new shared memory segment.
+
+    Returns:
+    - SharedMemory: The segment, to be closed and unlinked by the caller.
+    - list: (dtype, offset, length) of every array for _attach_arrays.
+    """
+    layout = []
+    size = 0
+    for array in arrays:
+        size = -(-size // ALIGNMENT) * ALIGNMENT
+        layout.append((array.dtype.str, size, len(array)))
+        size += array.nbytes
+
+    shared_memory = SharedMemory(create=True, size=max(size, 1))
+    for array, (dtype, offset, length) in zip(arrays, layout):
+        np.ndarray(length, dtype=dtype, buffer=shared_memory.buf, offset=offset)[:] = array
+    return shared_memory, layout
+
+def _attach_arrays(shared_memory: SharedMemory, layout: list) -> list:
+    """
+    Views of the arrays in a shared memory segment written by _share_arrays.
+    """
+    return [np.ndarray(length, dtype=dtype, buffer=shared_memory.buf, offset=offset) for dtype, offset, length in layout]
+
+# Shared sequence and index of a worker process of NeighbourIndex.count_parallel
+_shard_state = None
+
+def _init_shard_worker(name: str, layout: list, sequence_length: int, owner_count: int, pattern_length: int,
+                       string_index: dict) -> None:
+    """
+    Initializer of the worker processes, mapping the shared sequence and index once per process.
+    """
+    global _shard_state
+    shared_memory = SharedMemory(name=name)
+    data, mask_positions, mask_symbols, codes, owner_ids = _attach_arrays(shared_memory, layout)
+    sequence = PackedSequence(data, sequence_length, 0, mask_positions, mask_symbols)
+    # Workers only count, so the owners are represented by their ids
+    neighbour_index = NeighbourIndex.from_arrays(range(owner_count), pattern_length, codes, owner_ids, string_index)
+    _shard_state = (shared_memory, sequence, neighbour_index)
+
+def _count_shard(shard: tuple) -> tuple:
+    """
+    Worker function of NeighbourIndex.count_parallel, counting the windows of one shard.
+    """
+    _, sequence, neighbour_index = _shard_state
+    start, stop = shard
+    return neighbour_index.count(sequence[start:stop], offset=start)
+
+def pattern_frequency(sequence: str, seq_range: tuple, neighbourhood_dict: dict, k_mer_index=None,
+                      processes: int = 1) -> dict:
     """
     Determines the frequency of patterns in a DNA sequence based on their presence in a neighborhood dictionary.
 
+    The neighbourhoods are inverted into a NeighbourIndex, so that every window of the range is encoded
+    once as integer and looked up in a single pass.
+
     Parameters:
-        sequence (str): The input DNA sequence.
+        sequence (str | PackedSequence): The input DNA sequence.
         neighbourhood_dict (dict): A dictionary containing k-mers as keys and their corresponding d-neighbourhoods as values.
+        k_mer_index (KMerIndex, optional): Index of the sequence. If it holds k-mers of the pattern length, the
+            frequencies are counted in the index instead of scanning the range. Defaults to None.
+        processes (int, optional): Number of worker processes scanning shards of the range. Defaults to 1;
+            None uses all CPUs. Ranges below two shards of MIN_SHARD_WINDOWS windows are scanned serially.
 
     Returns:
         dict: A dictionary where keys are patterns and values are their frequencies in the sequence.
     """
-    
+
     # Check for correct data types
-    if not isinstance(sequence, str) or not isinstance(seq_range, tuple) or not isinstance(neighbourhood_dict, dict):
+    if not isinstance(sequence, (str, PackedSequence)) or not isinstance(seq_range, tuple) or not isinstance(neighbourhood_dict, dict):
         raise ValueError("Input sequence as string, seq_range as tuple and neighbourhood_dict as dictionary.")
     # Check that no input is empty
     if len(sequence) == 0:
@@ -20,36 +317,25 @@ def pattern_frequency(sequence: str, seq_range: tuple, neighbourhood_dict: dict)
         raise ValueError("Empty sequence range.")
     if len(neighbourhood_dict) == 0:
         raise ValueError("Empty neighbourhood dictionary.")
-    
-    # Initialize frequency dictionary
-    frequency_dict = {}
-    # Extract pattern length from neighbourhood dictionary
-    pattern_length = len(next(iter(neighbourhood_dict.keys())))
+
     # Define part of sequence to generate k-mers from
     start, stop = seq_range
-    
+
     # Check sequence range values
     if not 0 <= start < len(sequence) or not 0 <= stop < len(sequence) or not start < stop:
         raise ValueError("Invalid sequence range. Please provide a valid range within the length of the sequence.")
-    
-    # Define slice of sequence from which k-mers will be generated
-    sequence_part = sequence[start:stop + 1]
-    
-    # Define scanning range
-    scanning_range = len(sequence_part) - pattern_length + 1
-
-    # Slide a window over the sequence
-    for pos in range(scanning_range):
-        # Extract the current window
-        current_window = sequence_part[pos:pos + pattern_length]
-        # Add 1 to each k_mer which has current_window in d-neighbourhood
-        for k_mer, neighbourhood in neighbourhood_dict.items():
-            if current_window in neighbourhood:
-                frequency_dict.setdefault(k_mer, 0)
-                # If neighbour occured, increase by 1
-                frequency_dict[k_mer] += 1
-
-    return frequency_dict
+
+    # Build the inverted index and scan the range once
+    neighbour_index = NeighbourIndex(neighbourhood_dict)
+    if (k_mer_index is not None and k_mer_index.k_mer_length == neighbour_index.pattern_length
+            and len(neighbour_index.string_index) == 0):
+        counts, first = neighbour_index.count_k_mer_index(k_mer_index, start, stop)
+    elif processes != 1:
+        counts, first = neighbour_index.count_parallel(sequence[start:stop + 1], processes or os.cpu_count() or 1)
+    else:
+        counts, first = neighbour_index.count(sequence[start:stop + 1])
+
+    return neighbour_index.frequency_dict(counts, first)
 
 def most_frequent_patterns(frequency_dict: dict) -> tuple:
     """
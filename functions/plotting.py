@@ -0,0 +1,50 @@
+import matplotlib.pyplot as plt
+import seaborn as sns 
+from matplotlib.figure import Figure
+
+def _draw_skew(axes, positions, scores, extrema: tuple = None, skew_array=None) -> None:
+    """
+    Draw GC skew scores and optionally their extrema on a matplotlib axes.
+    """
+    axes.set_xlabel("Position")
+    axes.set_ylabel("GC Skew Score")
+    axes.set_title("GC Skew Analysis")
+    axes.plot(positions, scores)
+    
+    # Mark minimum and maximum skew positions
+    if extrema is not None:
+        minimum_positions, maximum_positions = extrema
+        axes.scatter(minimum_positions, [skew_array[position] for position in minimum_positions], color="tab:blue",
+                     marker="v", zorder=3, label="Minimum skew")
+        axes.scatter(maximum_positions, [skew_array[position] for position in maximum_positions], color="tab:red",
+                     marker="^", zorder=3, label="Maximum skew")
+        axes.legend()
+
+def plot_skew(positions, scores, extrema: tuple = None, skew_array=None, output_path: str = None) -> None:
+    """
+    Plot GC skew scores as a function of positions in the genome.
+
+    This module imports matplotlib and seaborn and is loaded lazily by functions.gc_skew.plot_skew;
+    use that function, which also validates the skew array and reduces it to bins.
+
+    Parameters:
+    - positions (array-like): Positions of the plotted scores.
+    - scores (array-like): GC skew scores.
+    - extrema (tuple, optional): Minimum and maximum skew positions to mark. Defaults to None.
+    - skew_array (array-like, optional): Full skew array used to look up the scores of the extrema.
+    - output_path (str, optional): Save the figure to this file instead of showing it. Defaults to None.
+    """
+    
+    # Headless output renders on a standalone figure without pyplot and its backend
+    if output_path is not None:
+        with sns.axes_style("ticks"):
+            figure = Figure()
+            axes = figure.add_subplot()
+        _draw_skew(axes, positions, scores, extrema, skew_array)
+        figure.savefig(output_path)
+        return
+    
+    # Plot GC skew as function of positions in genome
+    sns.set_style("ticks")
+    _draw_skew(plt.gca(), positions, scores, extrema, skew_array)
+    plt.show()
@@ -0,0 +1,248 @@
+import hashlib
+import json
+import os
+import zipfile
+
+import numpy as np
+
+from functions.compact_skew import CompactSkew
+
+# Extension of the cache entries
+ENTRY_EXTENSION = ".npz"
+# Puts after which the directory is measured again, to account for entries written by other processes
+RESCAN_PUTS = 256
+# Fraction of max_bytes an eviction reduces the cache to, so that a full cache is not scanned on every put
+EVICTION_TARGET = 0.9
+
+def _string_array(strings: list) -> np.ndarray:
+    """
+    Store strings as fixed-width ASCII bytes, one byte per base.
+    """
+    return np.array([string.encode("ascii", errors="replace") for string in strings], dtype=np.bytes_) \
+        if len(strings) > 0 else np.zeros(0, dtype="S1")
+
+def _strings(array: np.ndarray) -> list:
+    return [value.decode("ascii") for value in array.tolist()]
+
+def encode_result(value) -> dict:
+    """
+    Converts an analysis result into named NumPy arrays.
+
+    Parameters:
+    - value: Array (np.ndarray), compact skew (CompactSkew), (minimum, maximum) position lists, k-mer list,
+    frequency dictionary (pattern -> int) or neighbourhood dictionary (k-mer -> list of neighbours).
+
+    Returns:
+    - dict: Arrays of the result, including its kind.
+    """
+    if isinstance(value, np.ndarray):
+        return {"kind": np.array("array"), "values": value}
+    if isinstance(value, CompactSkew):
+        # 2-bit steps and block checkpoints instead of 4 bytes per score
+        return {"kind": np.array("compact_skew"), "steps": value._packed, "length": np.array(len(value)),
+                "checkpoints": value.checkpoints, "minima": value.minima, "maxima": value.maxima,
+                "block_size": np.array(value.block_size)}
+    if isinstance(value, tuple) and len(value) == 2 and all(isinstance(part, list) for part in value):
+        return {"kind": np.array("positions"), "minimum": np.array(value[0], dtype=np.int64),
+                "maximum": np.array(value[1], dtype=np.int64)}
+    if isinstance(value, list) and all(isinstance(item, str) for item in value):
+        return {"kind": np.array("strings"), "values": _string_array(value)}
+    if isinstance(value, dict) and all(isinstance(item, int) for item in value.values()):
+        return {"kind": np.array("frequencies"), "keys": _string_array(list(value)),
+                "values": np.array(list(value.values()), dtype=np.int64)}
+    if isinstance(value, dict) and all(isinstance(item, list) for item in value.values()):
+        # Neighbourhoods are flattened, with the start of every k-mer's neighbours
+        lengths = [len(neighbours) for neighbours in value.values()]
+        return {"kind": np.array("neighbourhoods"), "keys": _string_array(list(value)),
+                "offsets": np.concatenate(([0], np.cumsum(lengths, dtype=np.int64))),
+                "values": _string_array([neighbour for neighbours in value.values() for neighbour in neighbours])}
+    raise ValueError(f"Results of type {type(value).__name__} cannot be cached.")
+
+def decode_result(arrays) -> object:
+    """
+    Converts the arrays written by encode_result back into the analysis result.
+
+    Parameters:
+    - arrays (Mapping): Named arrays, e.g. a loaded npz file.
+
+    Returns:
+    - The analysis result.
+    """
+    kind = str(arrays["kind"])
+    if kind == "array":
+        return arrays["values"]
+    if kind == "compact_skew":
+        return CompactSkew(arrays["steps"], int(arrays["length"]), arrays["checkpoints"], arrays["minima"],
+                           arrays["maxima"], int(arrays["block_size"]))
+    if kind == "positions":
+        return arrays["minimum"].tolist(), arrays["maximum"].tolist()
+    if kind == "strings":
+        return _strings(arrays["values"])
+    if kind == "frequencies":
+        return dict(zip(_strings(arrays["keys"]), arrays["values"].tolist()))
+    if kind == "neighbourhoods":
+        offsets = arrays["offsets"].tolist()
+        neighbours = _strings(arrays["values"])
+        return {k_mer: neighbours[offsets[index]:offsets[index + 1]]
+                for index, k_mer in enumerate(_strings(arrays["keys"]))}
+    raise ValueError(f"Unknown cache entry kind '{kind}'.")
+
+class ResultCache():
+    """
+    On-disk cache of analysis results, keyed by a content hash of the genome and the analysis parameters.
+
+    Every result is one .npz file of NumPy arrays, written to a temporary file and renamed, so concurrent
+    processes sharing the directory never read partial entries. Reading an entry updates its modification
+    time, and the least recently used entries are deleted once the directory exceeds max_bytes. The
+    directory is only scanned when the size estimated from the written entries exceeds max_bytes or
+    after RESCAN_PUTS puts. Entries that disappear or are unreadable count as misses.
+    """
+
+    def __init__(self, directory: str, max_bytes: int = 2**30):
+        """
+        Parameters:
+        - directory (str): Directory of the cache entries, created if necessary.
+        - max_bytes (int, optional): Maximum total size of the entries. Defaults to 1 GiB.
+        """
+        # Check size limit
+        if not isinstance(max_bytes, int) or max_bytes < 0:
+            raise ValueError("Invalid max_bytes. Please provide a non-negative integer.")
+
+        self.directory = str(directory)
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        # Estimated size of the entries, None until the directory is scanned
+        self._size = None
+        self._puts = 0
+        os.makedirs(self.directory, exist_ok=True)
+
+    @staticmethod
+    def key(stage: str, digest: str, parameters: dict) -> str:
+        """
+        Cache key of a result.
+
+        Parameters:
+        - stage (str): Name of the analysis stage, e.g. "gc_skew".
+        - digest (str): sequence_digest of the genome, or another content hash of the input.
+        - parameters (dict): JSON serializable parameters such as k, d, range and reverse_complement.
+
+        Returns:
+        - str: Hexadecimal key.
+        """
+        description = json.dumps([stage, digest, parameters], sort_keys=True, default=str)
+        return hashlib.blake2b(description.encode("utf-8"), digest_size=20).hexdigest()
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, key + ENTRY_EXTENSION)
+
+    def get(self, key: str):
+        """
+        Load a cached result.
+
+        Parameters:
+        - key (str): Key as returned by key.
+
+        Returns:
+        - The result, or None if it is not cached.
+        """
+        path = self._path(key)
+        try:
+            with np.load(path, allow_pickle=False) as arrays:
+                value = decode_result(arrays)
+            # Mark the entry as recently used
+            os.utime(path)
+        except (OSError, ValueError, KeyError, EOFError, zipfile.BadZipFile):
+            self.misses += 1
+            return None
+        self.hits += 1
+        return value
+
+    def put(self, key: str, value) -> None:
+        """
+        Store a result and evict the least recently used entries if the cache exceeds max_bytes.
+
+        Parameters:
+        - key (str): Key as returned by key.
+        - value: Result supported by encode_result.
+        """
+        arrays = encode_result(value)
+        temporary_path = os.path.join(self.directory, f".{key}.{os.getpid()}.{os.urandom(4).hex()}.tmp")
+        try:
+            with open(temporary_path, "wb") as file:
+                np.savez(file, **arrays)
+                written = file.tell()
+            os.replace(temporary_path, self._path(key))
+        finally:
+            if os.path.exists(temporary_path):
+                os.remove(temporary_path)
+
+        self._puts += 1
+        if self._size is not None:
+            self._size += written
+        if self._size is None or self._size > self.max_bytes or self._puts >= RESCAN_PUTS:
+            self.evict()
+
+    def _entries(self) -> list:
+        """
+        (modification time, size, path) of all entries; entries removed concurrently are skipped.
+        """
+        entries = []
+        with os.scandir(self.directory) as iterator:
+            for entry in iterator:
+                if entry.name.endswith(ENTRY_EXTENSION):
+                    try:
+                        status = entry.stat()
+                    except FileNotFoundError:
+                        continue
+                    entries.append((status.st_mtime, status.st_size, entry.path))
+        return entries
+
+    def evict(self) -> None:
+        """
+        Measure the cache and, if it exceeds max_bytes, delete the least recently used entries until it fits
+        into EVICTION_TARGET of max_bytes.
+        """
+        entries = sorted(self._entries())
+        size = sum(entry_size for _, entry_size, _ in entries)
+        if size > self.max_bytes:
+            for _, entry_size, path in entries:
+                if size <= EVICTION_TARGET * self.max_bytes:
+                    break
+                try:
+                    os.remove(path)
+                    self.evictions += 1
+                except FileNotFoundError:
+                    pass
+                size -= entry_size
+        self._size = size
+        self._puts = 0
+
+    def clear(self) -> None:
+        """
+        Delete all entries.
+        """
+        for _, _, path in self._entries():
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+        self._size = 0
+
+    def stats(self) -> dict:
+        """
+        Statistics of this cache instance and the shared directory.
+
+        Returns:
+        - dict: Hits, misses, hit rate and evictions of this instance, number and total size of the entries and max_bytes.
+        """
+        entries = self._entries()
+        lookups = self.hits + self.misses
+        return {"hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups > 0 else 0.0,
+                "evictions": self.evictions,
+                "entries": len(entries),
+                "bytes": sum(entry_size for _, entry_size, _ in entries),
+                "max_bytes": self.max_bytes}
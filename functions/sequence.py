@@ -1,6 +1,128 @@
+import hashlib
+import mmap
 import os
+from typing import NamedTuple
 
-def read_sequence(input_path: str) -> str:
+from functions.packed_sequence import PackedSequence
+
+# Raw bytes mapped per parsing step and default number of bases per chunk
+BLOCK_SIZE = 4 * 2**20
+CHUNK_SIZE = 4 * 2**20
+# Translation table converting lowercase to uppercase letters, whitespace is deleted in the same step
+_UPPERCASE = bytes.maketrans(b"abcdefghijklmnopqrstuvwxyz", b"ABCDEFGHIJKLMNOPQRSTUVWXYZ")
+_WHITESPACE = b" \t\r\n\v\f"
+# IUPAC nucleotide symbols and their complements, in upper and lower case
+IUPAC_SYMBOLS = "ACGTRYSWKMBDHVN"
+IUPAC_COMPLEMENTS = "TGCAYRSWMKVHDBN"
+_IUPAC_COMPLEMENT = str.maketrans(IUPAC_SYMBOLS + IUPAC_SYMBOLS.lower(), IUPAC_COMPLEMENTS + IUPAC_COMPLEMENTS.lower())
+_DELETE_IUPAC = str.maketrans("", "", IUPAC_SYMBOLS + IUPAC_SYMBOLS.lower())
+
+def _check_input_file(input_path: str) -> None:
+    """
+    Check that the input file exists and is not empty.
+    """
+    # Check if file exists
+    if not os.path.exists(input_path):
+        raise FileNotFoundError(f"Input file not found: {input_path}")
+    # Check if file is not empty
+    if os.stat(input_path).st_size == 0:
+        raise FileNotFoundError(f"Empty file")
+
+def _iter_sequence_parts(mapped, start: int = 0, stop: int = None, block_size: int = BLOCK_SIZE):
+    """
+    Yield the uppercase sequence of a memory-mapped FASTA or plain text file with headers and whitespace removed.
+
+    The file is processed in raw blocks; header lines are skipped with bulk searches for line breaks and
+    every sequence part is cleaned with a single bytes.translate call.
+    """
+    stop = len(mapped) if stop is None else stop
+    in_header = False
+    at_line_start = True
+    for block_start in range(start, stop, block_size):
+        block = mapped[block_start:min(block_start + block_size, stop)]
+        pos = 0
+        while pos < len(block):
+            if in_header:
+                # Skip the rest of the header line
+                line_end = block.find(b"\n", pos)
+                if line_end == -1:
+                    break
+                in_header = False
+                at_line_start = True
+                pos = line_end + 1
+            elif at_line_start and block[pos] == ord(">"):
+                in_header = True
+            else:
+                # Sequence continues until the next header line
+                header_start = block.find(b"\n>", pos)
+                end = len(block) if header_start == -1 else header_start + 1
+                part = block[pos:end].translate(_UPPERCASE, _WHITESPACE)
+                if len(part) > 0:
+                    yield part
+                at_line_start = block[end - 1] == ord("\n")
+                pos = end
+
+def iter_sequence_chunks(input_path: str, chunk_size: int = CHUNK_SIZE, overlap: int = 0):
+    """
+    Streams the sequence of a FASTA or plain text file in chunks of a fixed number of bases.
+
+    The file is memory-mapped, so only the current chunk is held in memory. With an overlap of k - 1,
+    every k-mer of the sequence lies completely within one chunk.
+
+    Raises:
+        FileNotFoundError: If the specified input file does not exist or is empty.
+
+    Args:
+        input_path (str): Path to the input file containing the DNA sequence.
+        chunk_size (int, optional): Number of new bases per chunk. Defaults to 4 MiB.
+        overlap (int, optional): Number of bases repeated from the end of the previous chunk. Defaults to 0.
+
+    Yields:
+        bytes: Uppercase sequence chunks; the last chunk may be shorter.
+    """
+    _check_input_file(input_path)
+    # Check chunk size and overlap
+    if not 0 < chunk_size or not 0 <= overlap < chunk_size:
+        raise ValueError("Invalid chunk size. Please provide a positive chunk_size larger than the overlap.")
+
+    with open(input_path, "rb") as file, mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+        buffer = bytearray()
+        carried = 0
+        for part in _iter_sequence_parts(mapped):
+            buffer += part
+            # Emit chunks as soon as enough new bases are buffered
+            while len(buffer) - carried >= chunk_size:
+                chunk = bytes(buffer[:carried + chunk_size])
+                yield chunk
+                del buffer[:len(chunk) - overlap]
+                carried = overlap
+
+        # Emit remaining bases, or the whole sequence if it is shorter than one chunk
+        if len(buffer) > carried or (carried == 0 and len(buffer) > 0):
+            yield bytes(buffer)
+
+def read_sequence_buffer(input_path: str, packed: bool = False):
+    """
+    Reads the sequence of a FASTA or plain text file into a bytes buffer or a packed sequence.
+
+    Raises:
+        FileNotFoundError: If the specified input file does not exist or is empty.
+
+    Args:
+        input_path (str): Path to the input file containing the DNA sequence.
+        packed (bool, optional): Pack the sequence chunk by chunk with 2 bits per base. Defaults to False.
+
+    Returns:
+        bytes | PackedSequence: Uppercase sequence without headers and whitespace.
+    """
+    if packed:
+        return PackedSequence.from_chunks(iter_sequence_chunks(input_path))
+
+    _check_input_file(input_path)
+    with open(input_path, "rb") as file, mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+        return b"".join(_iter_sequence_parts(mapped))
+
+def read_sequence(input_path: str, packed: bool = False):
         """
         Reads a sequence from the specified input file in FASTA formate or plain text formate.
 
@@ -8,58 +130,174 @@ def read_sequence(input_path: str) -> str:
             FileNotFoundError: If the specified input file does not exist.
             FileNotFoundError: If the specified input file is empty.
 
-        Reads the sequence from the file using the 'read_fasta' function and stores
-        the concatenated sequence in the 'raw_sequence' attribute of the class.
+        The file is memory-mapped and header lines and whitespace are removed in bulk
+        by read_sequence_buffer.
+
+        Args:
+            input_path (str): Path to the input file containing the DNA sequence.
+            packed (bool, optional): Return the sequence as PackedSequence with 2 bits per base. Defaults to False.
 
         Returns:
-            str: DNA sequence string.
+            str | PackedSequence: DNA sequence string or packed sequence.
         """
         
-        # Check if file exists
-        if not os.path.exists(input_path):
-            raise FileNotFoundError(f"Input file not found: {input_path}")
-        # Check if file is not empty
-        if os.stat(input_path).st_size == 0:
-            raise FileNotFoundError(f"Empty file")
-        
-        # Check if file is FASTA or plain text
-        sequence = ""
-        with open(input_path) as file:
-            for line in file:
-                line = line.strip()
-                if not line.startswith(">"):
-                    line = line.upper()
-                    sequence += line
+        sequence = read_sequence_buffer(input_path=input_path, packed=packed)
+        if packed:
+            return sequence
         
-        return sequence
+        return sequence.decode("ascii", errors="replace")
     
+class FastaRecord(NamedTuple):
+    """
+    Location of one record in a FASTA file.
+
+    Attributes:
+        name (str): First word of the header line, empty for plain text files.
+        offset (int): Byte offset of the first sequence line in the file.
+        length (int): Number of bases of the record.
+    """
+    name: str
+    offset: int
+    length: int
+
+def index_fasta(input_path: str) -> list:
+    """
+    Builds an index of the records of a (multi-record) FASTA or plain text file.
+
+    Only the header lines are decoded; the bases of every record are counted while streaming over
+    the memory-mapped file, so no record is loaded as a whole.
+
+    Raises:
+        FileNotFoundError: If the specified input file does not exist or is empty.
+
+    Args:
+        input_path (str): Path to the input file.
+
+    Returns:
+        list: FastaRecord entries in file order. A plain text file yields a single record without name.
+    """
+    _check_input_file(input_path)
+
+    records = []
+    with open(input_path, "rb") as file, mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+        header_start = 0 if mapped[:1] == b">" else -1
+        # Sequence before the first header belongs to an unnamed record
+        if header_start == -1:
+            next_header = mapped.find(b"\n>")
+            sequence_end = len(mapped) if next_header == -1 else next_header + 1
+            length = sum(len(part) for part in _iter_sequence_parts(mapped, 0, sequence_end))
+            records.append(FastaRecord("", 0, length))
+            header_start = next_header + 1 if next_header != -1 else len(mapped)
+
+        while header_start < len(mapped):
+            header_end = mapped.find(b"\n", header_start)
+            header_end = len(mapped) if header_end == -1 else header_end
+            header = mapped[header_start + 1:header_end].decode("utf-8", errors="replace").split()
+            sequence_start = min(header_end + 1, len(mapped))
+            next_header = mapped.find(b"\n>", header_end)
+            sequence_end = len(mapped) if next_header == -1 else next_header + 1
+            # Count the bases of the record without keeping them
+            length = sum(len(part) for part in _iter_sequence_parts(mapped, sequence_start, sequence_end))
+            records.append(FastaRecord(header[0] if header else "", sequence_start, length))
+            header_start = sequence_end
+
+    return records
+
+def read_record(input_path: str, record: FastaRecord, packed: bool = False):
+    """
+    Reads the sequence of a single record from a FASTA file indexed with index_fasta.
+
+    Args:
+        input_path (str): Path to the input file.
+        record (FastaRecord): The record to read.
+        packed (bool, optional): Return the sequence as PackedSequence with 2 bits per base. Defaults to False.
+
+    Returns:
+        str | PackedSequence: DNA sequence of the record.
+    """
+    _check_input_file(input_path)
+    with open(input_path, "rb") as file, mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+        # The record ends at the next header line
+        next_header = mapped.find(b"\n>", max(record.offset - 1, 0))
+        sequence_end = len(mapped) if next_header == -1 else next_header + 1
+        parts = _iter_sequence_parts(mapped, record.offset, sequence_end)
+        if packed:
+            return PackedSequence.from_chunks(parts)
+        return b"".join(parts).decode("ascii", errors="replace")
+
+def sequence_digest(sequence) -> str:
+    """
+    Computes a digest identifying a DNA sequence, e.g. to check that a saved index belongs to a genome.
+
+    Parameters:
+    - sequence (str | bytes | PackedSequence): The DNA sequence.
+
+    Returns:
+    - str: Hexadecimal BLAKE2b digest of the ASCII sequence; packed and unpacked sequences have the same digest.
+    """
+    if isinstance(sequence, PackedSequence):
+        sequence = sequence.to_bytes()
+    elif isinstance(sequence, str):
+        sequence = sequence.encode("ascii", errors="replace")
+    return hashlib.blake2b(sequence, digest_size=32).hexdigest()
+
 def reverse_complement(sequence: str) -> str:
     """
     Generates the reverse complement of a DNA sequence.
 
+    Bases are complemented with a single str.translate call; IUPAC ambiguity codes are complemented
+    (e.g. R <-> Y, N stays N) and lowercase bases stay lowercase.
+
     Parameters:
-    - sequence (str): The input DNA sequence.
+    - sequence (str | bytes | PackedSequence): The input DNA sequence.
 
     Returns:
-    - str: The reverse complement of the input sequence.
+    - str | bytes | PackedSequence: The reverse complement of the input sequence, of the same type as the input.
     """
     
     # Check if sequence is not empty
     if len(sequence) == 0:
         raise ValueError("Empty sequence.")
+    # Packed sequences are complemented on their 2-bit codes
+    if isinstance(sequence, PackedSequence):
+        return sequence.reverse_complement()
+    if isinstance(sequence, bytes):
+        return reverse_complement(sequence.decode("ascii", errors="replace")).encode("ascii")
     # Check that sequence is a string
     if not isinstance(sequence, str):
         raise ValueError("Provide sequence as string.")
+    # Check for symbols without complement
+    if sequence.translate(_DELETE_IUPAC) != "":
+        raise ValueError(f"Invalid symbols {''.join(sorted(set(sequence.translate(_DELETE_IUPAC))))!r} in sequence.")
     
-    # Return sequence
-    sequence = sequence[::-1]
-    
-    # Define mapping dictionary
-    mapping_dict = {"A": "T",
-                    "T": "A",
-                    "G": "C",
-                    "C": "G"}
-    # Map characters in sequence
-    complement_seq = [mapping_dict[char] for char in sequence]
+    return sequence.translate(_IUPAC_COMPLEMENT)[::-1]
+
+def reverse_complements(sequences: list) -> list:
+    """
+    Generates the reverse complements of many DNA sequences at once.
+
+    The sequences are joined, translated and reversed in one step and split again, which avoids a
+    Python-level call per sequence.
+
+    Parameters:
+    - sequences (list): DNA sequences as strings.
+
+    Returns:
+    - list: Reverse complements in the order of the input sequences.
+    """
+    # Check for correct data type
+    if not isinstance(sequences, list) or not all(isinstance(sequence, str) for sequence in sequences):
+        raise ValueError("Provide sequences as list of strings.")
+    if len(sequences) == 0:
+        return []
+    # Check for empty sequences, like reverse_complement
+    if not all(sequences):
+        raise ValueError("Empty sequence.")
     
-    return "".join(complement_seq)          
\ No newline at end of file
+    # The separator is not an IUPAC symbol, so it is kept by the translation; only the separators between
+    # the sequences may remain after deleting all IUPAC symbols, which also rejects sequences containing one,
+    # so the split returns one reverse complement per sequence
+    joined = "\n".join(sequences)
+    if joined.translate(_DELETE_IUPAC) != "\n" * (len(sequences) - 1):
+        raise ValueError("Invalid symbols in sequences.")
+    return joined.translate(_IUPAC_COMPLEMENT)[::-1].split("\n")[::-1]
@@ -1,61 +1,380 @@
-from functions.sequence import read_sequence as read_seq_func, reverse_complement as rev_comp_func
-from functions.gc_skew import calculate_gc_skew as gc_skew_func, plot_skew as plot_skew_func, min_max_skew as min_max_skew_func
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+from functions.sequence import read_sequence as read_seq_func, index_fasta as index_fasta_func, read_record as read_record_func, sequence_digest
+from functions.gc_skew import calculate_gc_skew as gc_skew_func, gc_counts as gc_counts_func, windowed_gc_skew as windowed_skew_func, plot_skew as plot_skew_func, min_max_skew as min_max_skew_func, skew_extrema as skew_extrema_func
+from functions.incremental_skew import IncrementalSkew
+from functions.compact_skew import CompactSkew
 from functions.generate_k_mers import generate_k_mers as generate_k_mers_func
 from functions.pattern_frequency import pattern_frequency as pattern_freq_func, most_frequent_patterns as most_frequent_func
-from functions.neighbourhood import neighbourhood_dictionary as neighbourhood_func
+from functions.neighbourhood import neighbourhood_dictionary as neighbourhood_func, hamming_ball_size
+from functions.clumps import find_clumps as find_clumps_func
+from functions.approximate_match import approximate_match as approximate_match_func
+from functions.k_mer_index import KMerIndex
+from functions.fm_index import fm_pattern_frequency as fm_pattern_freq_func
+from functions.frequency_array import frequency_array as frequency_array_func, neighbourhood_frequency_array as neighbourhood_array_func, most_frequent_array as most_frequent_array_func, frequency_array_to_dict
+from functions.neighbourhood_cache import get_default_cache
+from functions.instrumentation import instrumented
+from functions.packed_sequence import PackedSequence
+
+# Backends of frequent_patterns
+FREQUENCY_BACKENDS = ("auto", "neighbourhood", "fm_index", "frequency_array")
+# Number of enumerated neighbours above which the FM-index backend is chosen
+NEIGHBOURHOOD_LIMIT = 2**18
+# Largest ratio of 4^k frequency array entries to neighbours (at least NEIGHBOURHOOD_LIMIT) of the frequency_array backend
+FREQUENCY_ARRAY_SPARSITY = 4
 
 class OriAnalyzer():
     
-    def __init__(self):
+    def __init__(self, neighbourhood_cache=None, instrumentation=None, result_cache=None):
+        """
+        Parameters:
+        - neighbourhood_cache (NeighbourhoodCache, optional): Cache for d-neighbourhoods. Defaults to None, which uses
+        the process-wide cache shared by all OriAnalyzer instances.
+        - instrumentation (Instrumentation, optional): Records time, memory and item counts of every analyzer
+        method. Defaults to None, no instrumentation.
+        - result_cache (ResultCache, optional): On-disk cache of skew arrays, skew extrema, k-mer lists, neighbourhoods
+        and frequency tables, keyed by the genome content. Defaults to None, no caching.
+        """
+        self._genome_version = 0
         self.genome = None
         self.skew_array = None
+        self.neighbourhood_cache = neighbourhood_cache
+        self.instrumentation = instrumentation
+        self.result_cache = result_cache
+        self._digest_genome = None
+        self._gc_counts = None
+        self.k_mer_index = None
+    
+    @property
+    def genome(self):
+        """
+        The genome as str or PackedSequence. After edits the genome is decoded from the edit buffer on access,
+        so sequences returned before an edit never change.
+        """
+        if self._genome is None and self._edit_buffer is not None:
+            self._genome = self._edit_buffer.copy() if self._edit_packed else str(self._edit_buffer)
+        return self._genome
+    
+    @genome.setter
+    def genome(self, genome) -> None:
+        self._genome = genome
+        # Private packed copy of the genome, created by the first edit and edited in place by later edits
+        self._edit_buffer = None
+        self._genome_version += 1
+    
+    @property
+    def skew_array(self):
+        """
+        GC skew scores of the genome. After edits the array is materialized from the incremental skew on access.
+        """
+        if self._skew_array is None and self._skew_index is not None:
+            self._skew_array = self._skew_index.to_array()
+        return self._skew_array
+    
+    @skew_array.setter
+    def skew_array(self, skew_array) -> None:
+        self._skew_array = skew_array
+        self._skew_index = None
+        # Version of the genome the skew was calculated from, None for assigned skew arrays
+        self._skew_version = None
+    
+    def _cached(self, stage: str, parameters: dict, compute):
+        """
+        Return a result of the genome from the result cache, computing and storing it on a miss.
+
+        Parameters:
+        - stage (str): Name of the analysis stage.
+        - parameters (dict): Parameters of the stage.
+        - compute (callable): Computes the result.
+        """
+        if self.result_cache is None:
+            return compute()
+        key = self.result_cache.key(stage, self._genome_digest(), parameters)
+        value = self.result_cache.get(key)
+        if value is None:
+            self._count(result_cache_misses=1)
+            value = compute()
+            self.result_cache.put(key, value)
+        else:
+            self._count(result_cache_hits=1)
+        return value
+    
+    def _genome_digest(self) -> str:
+        """
+        Content hash of the genome, computed once per genome.
+        """
+        if self._digest_genome is not self.genome:
+            self._digest = sequence_digest(self.genome)
+            self._digest_genome = self.genome
+        return self._digest
+    
+    def _count(self, **items) -> None:
+        """
+        Add item counts to the running instrumentation stage, if instrumentation is enabled.
+        """
+        if self.instrumentation is not None:
+            self.instrumentation.count(**items)
     
-    def read_sequence(self, input_path: str) -> None:
+    @instrumented
+    def read_sequence(self, input_path: str, packed: bool = False) -> None:
         """
         Reads a DNA sequence from the specified input file using the read_sequence function.
 
         Args:
             input_path (str): Path to the input file containing the DNA sequence.
+            packed (bool, optional): Store the genome as PackedSequence with 2 bits per base. Defaults to False.
 
         Returns:
             str: DNA sequence string.
         """
-        self.genome = read_seq_func(input_path=input_path)
+        self.genome = read_seq_func(input_path=input_path, packed=packed)
+        self._count(bases=len(self.genome))
     
-    def calculate_gc_skew(self) -> None:
+    @instrumented
+    def calculate_gc_skew(self, incremental: bool = False, compact: bool = False) -> None:
         """
         Calculate GC skew scores for each position in the sequence.
 
+        Stores the scores as int32 NumPy array in the 'skew_array' attribute.
+
         Parameters:
-        - sequence (str): DNA sequence.
+        - incremental (bool, optional): Keep the block structure of IncrementalSkew, so that later edits with
+        substitute_sequence, insert_sequence and append_sequence update the skew without recomputing it.
+        Defaults to False; the structure is also built on the first edit.
+        - compact (bool, optional): Store the scores as CompactSkew with 2 bits per score instead. min_max_skew,
+        skew_extrema and plot_skew decode it block-wise. Defaults to False.
+        """
+        if compact:
+            self.skew_array = self._compact_skew()
+        elif incremental:
+            self.skew_array = None
+            self._skew_index = IncrementalSkew(self.genome)
+            self._indexed_version = self._genome_version
+        elif self.result_cache is not None:
+            self.skew_array = self._compact_skew().to_array()
+        else:
+            self.skew_array = gc_skew_func(sequence=self.genome)
+        self._skew_version = self._genome_version
+        self._count(bases=len(self.genome))
+    
+    def _compact_skew(self) -> CompactSkew:
+        """
+        Compact skew of the genome, stored in the result cache with 2 bits per score instead of the int32 array.
+        """
+        return self._cached("compact_gc_skew", {}, lambda: CompactSkew.from_sequence(self.genome))
+    
+    def _edit_skew_index(self) -> IncrementalSkew:
+        """
+        Return the incremental skew of the current genome, building it if necessary.
+        """
+        if self._skew_index is None or self._indexed_version != self._genome_version:
+            self.calculate_gc_skew(incremental=True)
+        # The skew array is materialized again after the edit
+        self._skew_array = None
+        return self._skew_index
+    
+    def _edit_genome(self, start: int, stop: int, sequence: str) -> None:
+        """
+        Replace genome[start:stop] by sequence, either a substitution of the same length or an insertion.
 
-        Returns:
-        - list: List of GC skew scores.
+        Edits change a private packed copy of the genome in place, so they cost O(edit) for substitutions and
+        O(bases after the position) for insertions, for str and packed genomes alike. The genome is decoded
+        from the copy on the next access, keeping its type.
         """
-        self.skew_array = gc_skew_func(sequence=self.genome)
+        if isinstance(sequence, bytes):
+            sequence = sequence.decode("ascii", errors="replace")
+        sequence = sequence.upper()
+        if self._edit_buffer is None:
+            genome = self.genome
+            self._edit_packed = isinstance(genome, PackedSequence)
+            self._edit_buffer = genome.copy() if self._edit_packed else PackedSequence.from_string(genome)
+        
+        if start == stop:
+            self._edit_buffer.insert(start, sequence)
+        else:
+            self._edit_buffer.substitute(start, sequence)
+        self._genome = None
+        self._genome_version += 1
+        # The skew index was edited alongside the genome
+        self._indexed_version = self._skew_version = self._genome_version
     
-    def plot_skew(self) -> None:
+    @instrumented
+    def substitute_sequence(self, position: int, sequence: str) -> None:
         """
-        Plot GC skew scores as a function of positions in the genome.
+        Replace bases of the genome starting at a position and update the GC skew incrementally.
 
         Parameters:
-        - skew_array (list): List of GC skew scores.
+        - position (int): Position of the first replaced base.
+        - sequence (str): The new bases.
         """
-        plot_skew_func(skew_array=self.skew_array)
+        skew_index = self._edit_skew_index()
+        skew_index.substitute(position, sequence.upper())
+        self._edit_genome(position, position + len(sequence), sequence)
+    
+    @instrumented
+    def insert_sequence(self, position: int, sequence: str) -> None:
+        """
+        Insert bases into the genome before a position and update the GC skew incrementally.
+
+        Parameters:
+        - position (int): Position before which the bases are inserted.
+        - sequence (str): The inserted bases.
+        """
+        skew_index = self._edit_skew_index()
+        skew_index.insert(position, sequence.upper())
+        self._edit_genome(position, position, sequence)
+    
+    @instrumented
+    def append_sequence(self, sequence: str) -> None:
+        """
+        Append bases, e.g. a further contig, to the genome and update the GC skew incrementally.
+
+        Parameters:
+        - sequence (str): The appended bases.
+        """
+        skew_index = self._edit_skew_index()
+        length = len(skew_index) - 1
+        skew_index.append(sequence.upper())
+        self._edit_genome(length, length, sequence)
+    
+    @instrumented
+    def plot_skew(self, bins: int = None, show_extrema: bool = False, output_path: str = None) -> None:
+        """
+        Plot GC skew scores of the 'skew_array' attribute as a function of positions in the genome.
 
-    def min_max_skew(self) -> list:
+        Parameters:
+        - bins (int, optional): Reduce the skew array to the minimum and maximum of this many bins. Defaults to None.
+        - show_extrema (bool, optional): Mark the minimum and maximum skew positions. Defaults to False.
+        - output_path (str, optional): Save the plot as PNG/SVG/... file without interactive backend. Defaults to None.
         """
-        Calculate minimum and maximum values of GC skew.
+        plot_skew_func(skew_array=self.skew_array, bins=bins, show_extrema=show_extrema, output_path=output_path)
+
+    @instrumented
+    def min_max_skew(self, tolerance: float = 0) -> list:
+        """
+        Calculate minimum and maximum values of GC skew in the 'skew_array' attribute.
 
         Parameters:
-        - skew_array (list): List of GC skew scores.
+        - tolerance (float, optional): Also report positions within this distance of the extremum. Defaults to 0.
 
         Returns:
         - list: Positions where the skew is minimum.
         - list: Positions where the skew is maximum.
         """
-        return min_max_skew_func(skew_array=self.skew_array)
+        # Combine the block extrema of the incremental skew instead of scanning the whole array
+        if self._skew_index is not None and tolerance == 0:
+            return self._skew_index.min_max()
+        # Only the skew of the genome can be looked up by the genome content
+        if self._skew_version != self._genome_version:
+            return min_max_skew_func(skew_array=self.skew_array, tolerance=tolerance)
+        return self._cached("min_max_skew", {"tolerance": tolerance},
+                            lambda: min_max_skew_func(skew_array=self.skew_array, tolerance=tolerance))
     
+    @instrumented
+    def windowed_gc_skew(self, window: int, step: int = None) -> tuple:
+        """
+        Calculate the GC skew and GC content of sliding windows over the genome.
+
+        The cumulative G and C counts are computed once per genome and the results are cached per
+        (window, step), so trying several resolutions only costs O(n / step) each.
+
+        Parameters:
+        - window (int): Length of the windows.
+        - step (int, optional): Distance between the starts of consecutive windows. Defaults to the window length.
+
+        Returns:
+        - np.ndarray: Start positions of the windows.
+        - np.ndarray: GC skew (G - C) / (G + C) of each window.
+        - np.ndarray: GC content of each window.
+        """
+        # Counts and results are only valid for the genome they were computed from
+        if self._gc_counts is None or self._gc_counts_genome is not self.genome:
+            self._gc_counts = gc_counts_func(sequence=self.genome)
+            self._gc_counts_genome = self.genome
+            self._windowed_skew = {}
+        
+        # The default step is the window length, so both spellings share one entry
+        key = (window, window if step is None else step)
+        if key not in self._windowed_skew:
+            result = windowed_skew_func(self._gc_counts, window=window, step=step)
+            # Cached arrays are shared between callers
+            for values in result:
+                values.flags.writeable = False
+            self._windowed_skew[key] = result
+        self._count(windows=len(self._windowed_skew[key][0]))
+        return self._windowed_skew[key]
+    
+    @instrumented
+    def skew_extrema(self, tolerance: float = 0, circular: bool = True) -> tuple:
+        """
+        Find the intervals of the 'skew_array' attribute within a tolerance band around its minimum and maximum.
+
+        Parameters:
+        - tolerance (float, optional): Width of the band around each extremum. Defaults to 0.
+        - circular (bool, optional): Merge intervals across the origin of a circular chromosome. Defaults to True.
+
+        Returns:
+        - list: (start, stop) intervals around the minimum skew; start > stop for intervals across the origin.
+        - list: (start, stop) intervals around the maximum skew.
+        """
+        return skew_extrema_func(skew_array=self.skew_array, tolerance=tolerance, circular=circular)
+    
+    @instrumented
+    def build_k_mer_index(self, k_mer_length: int = 9, output_path: str = None) -> KMerIndex:
+        """
+        Index the positions of all k-mers of the genome and optionally save the index.
+
+        Range queries, pattern frequencies and approximate matches of this k-mer length are then answered
+        from the index.
+
+        Parameters:
+        - k_mer_length (int, optional): Length of the indexed k-mers. Defaults to 9.
+        - output_path (str, optional): Save the index to this file for load_k_mer_index. Defaults to None.
+
+        Returns:
+        - KMerIndex: The index, also stored in the 'k_mer_index' attribute.
+        """
+        self.k_mer_index = KMerIndex.build(self.genome, k_mer_length)
+        self._k_mer_index_genome = self.genome
+        if output_path is not None:
+            self.k_mer_index.save(output_path)
+        return self.k_mer_index
+    
+    @instrumented
+    def load_k_mer_index(self, input_path: str) -> KMerIndex:
+        """
+        Memory-map a saved k-mer index.
+
+        Without a genome, the packed genome stored in the index becomes the 'genome' attribute, so a saved
+        reference genome is ready for analysis without reading its FASTA file.
+
+        Parameters:
+        - input_path (str): Path of the index file.
+
+        Returns:
+        - KMerIndex: The index, also stored in the 'k_mer_index' attribute.
+        """
+        k_mer_index = KMerIndex.load(input_path)
+        if self.genome is None:
+            self.genome = k_mer_index.sequence
+        # Check that the index belongs to the genome
+        elif sequence_digest(self.genome) != k_mer_index.digest:
+            raise ValueError("The k-mer index was built from a different genome.")
+        
+        self.k_mer_index = k_mer_index
+        self._k_mer_index_genome = self.genome
+        return k_mer_index
+    
+    def _current_k_mer_index(self):
+        """
+        Return the k-mer index if it still belongs to the genome, otherwise None.
+        """
+        if self.k_mer_index is not None and self._k_mer_index_genome is self.genome:
+            return self.k_mer_index
+        return None
+    
+    @instrumented
     def generate_k_mers(self, k_mer_length: int, seq_range: tuple = (0, 10)) -> list:
         """
         Generate unique k-mers from a specified range of the genomic DNA sequence.
@@ -69,8 +388,15 @@ class OriAnalyzer():
         Returns:
         - list: List of unique k-mers.
         """
-        return generate_k_mers_func(sequence=self.genome, k_mer_length=k_mer_length, seq_range=seq_range)
+        # Ranges are cut from the packed genome of the index if there is one
+        k_mer_index = self._current_k_mer_index()
+        sequence = k_mer_index.sequence if k_mer_index is not None else self.genome
+        k_mers = self._cached("k_mers", {"k": k_mer_length, "range": seq_range},
+                              lambda: generate_k_mers_func(sequence=sequence, k_mer_length=k_mer_length, seq_range=seq_range))
+        self._count(windows=max(seq_range[1] - seq_range[0] + 2 - k_mer_length, 0), k_mers=len(k_mers))
+        return k_mers
     
+    @instrumented
     def neighbourhood_dictionary(self, k_mers: list, distance: int, reverse_complement: bool = False) -> dict:
         """
         Generates a dictionary of k-mers and their corresponding d-neighbourhoods.
@@ -87,38 +413,162 @@ class OriAnalyzer():
         Returns:
         - dict: A dictionary where keys are k-mers and values are lists of k-mers representing their d-neighbourhoods.
         If reverse_complement is True, each k-mer's value also includes its d-neighbourhoods' reverse complements.
+        Neighbourhoods are enumerated directly as Hamming balls over integer k-mer codes and kept in the
+        neighbourhood cache for later calls.
 
         Example:
         Given k_mers = ['ACGT', 'ATGC'] and distance = 1:
-        neighbourhood_dictionary(k_mers, distance) returns {'ACGT': ['ACGT', 'ACTT', 'AGGT', 'ACCT', 'ACGG'],
-                                                            'ATGC': ['ATGC', 'AGGC', 'AAGC', 'ATCC', 'TTGC']}
+        neighbourhood_dictionary(k_mers, distance) returns {'ACGT': ['AAGT', 'ACAT', 'ACCT', ..., 'TCGT'],
+                                                            'ATGC': ['AAGC', 'ACGC', 'AGGC', ..., 'TTGC']}
         """
-        neighbourhood = neighbourhood_func(k_mers=k_mers, distance=distance)
-        
-        if reverse_complement:
-            # Initialize empty neighbourhood dictionary
-            neighbourhood_rev_comp = {}
-            # Iterate over all neighbourhood lists and add the reverse_complement sequences to each
-            for k_mer, neighbours in neighbourhood.items():
-                rev_comp = [rev_comp_func(neighbour) for neighbour in neighbours]
-                neighbourhood_rev_comp[k_mer] = list(set(neighbours + rev_comp))
-            return neighbourhood_rev_comp
-        
+        cache = self.neighbourhood_cache if self.neighbourhood_cache is not None else get_default_cache()
+        instrumentation = self.instrumentation
+        stats = cache.stats() if instrumentation is not None else None
+        compute = lambda: neighbourhood_func(k_mers=k_mers, distance=distance, reverse_complement=reverse_complement,
+                                             cache=cache)
+        if self.result_cache is not None and isinstance(k_mers, list):
+            # Neighbourhoods do not depend on the genome, the k-mers are part of the key
+            key = self.result_cache.key("neighbourhood", None, {"k_mers": k_mers, "d": distance, "rc": reverse_complement})
+            neighbourhood = self.result_cache.get(key)
+            if neighbourhood is None:
+                neighbourhood = compute()
+                self.result_cache.put(key, neighbourhood)
         else:
-            return neighbourhood
+            neighbourhood = compute()
+        if instrumentation is not None:
+            # Cache statistics are shared, only the difference belongs to this call
+            new_stats = cache.stats()
+            instrumentation.count(k_mers=len(neighbourhood),
+                                  neighbours=sum(len(neighbours) for neighbours in neighbourhood.values()),
+                                  cache_hits=new_stats["hits"] - stats["hits"],
+                                  cache_misses=new_stats["misses"] - stats["misses"])
+        return neighbourhood
                     
-    def pattern_frequency(self, seq_range: tuple, neighbourhood_dict: dict) -> dict:
+    @instrumented
+    def pattern_frequency(self, seq_range: tuple, neighbourhood_dict: dict, processes: int = 1) -> dict:
         """
         Determines the frequency of patterns in a DNA sequence based on their presence in a neighborhood dictionary.
 
         Parameters:
             sequence (str): The input DNA sequence.
             neighbourhood_dict (dict): A dictionary containing k-mers as keys and their corresponding d-neighbourhoods as values.
+            processes (int, optional): Number of worker processes scanning shards of large ranges, with the genome in
+                shared memory. Defaults to 1; None uses all CPUs.
 
         Returns:
             dict: A dictionary where keys are patterns and values are their frequencies in the sequence.
         """
-        return pattern_freq_func(sequence=self.genome, seq_range=seq_range, neighbourhood_dict=neighbourhood_dict)
+        frequency = pattern_freq_func(sequence=self.genome, seq_range=seq_range, neighbourhood_dict=neighbourhood_dict,
+                                      k_mer_index=self._current_k_mer_index(), processes=processes)
+        if self.instrumentation is not None and len(neighbourhood_dict) > 0:
+            k_mer_length = len(next(iter(neighbourhood_dict)))
+            self.instrumentation.count(windows=max(seq_range[1] - seq_range[0] + 2 - k_mer_length, 0),
+                                       patterns=len(frequency))
+        return frequency
+    
+    @instrumented
+    def frequent_patterns(self, seq_range: tuple, k_mer_length: int, distance: int, reverse_complement: bool = False,
+                          backend: str = "auto", processes: int = 1) -> dict:
+        """
+        Determines the frequencies of all k-mers of a range with their d-neighbourhoods in this range.
+
+        Three backends give identical frequencies for ranges of A, C, G and T: "neighbourhood" enumerates the
+        d-neighbourhoods and counts them with pattern_frequency, "fm_index" searches the k-mers with mismatches
+        in an FM-index of the range and "frequency_array" scatter-adds dense count arrays (k up to 12, patterns
+        in lexicographic order). Only "neighbourhood" supports ranges with other symbols such as N; the other
+        backends raise a ValueError for them. "frequency_array" also raises a ValueError if its 4^k entries
+        exceed FREQUENCY_ARRAY_SPARSITY times the number of neighbours, at least NEIGHBOURHOOD_LIMIT, as for
+        long k-mers in short ranges. "auto" enumerates neighbourhoods while the number of neighbours
+        (k-mers times Hamming ball size times strands) stays below NEIGHBOURHOOD_LIMIT and switches to the
+        FM-index for long k-mers and large distances of ranges without other symbols.
+
+        Parameters:
+        - seq_range (tuple): First and last position of the range.
+        - k_mer_length (int): Length of k-mers.
+        - distance (int): The maximum Hamming distance.
+        - reverse_complement (bool, optional): Include reverse complements. Defaults to False.
+        - backend (str, optional): "auto", "neighbourhood", "fm_index" or "frequency_array". Defaults to "auto".
+        - processes (int, optional): Worker processes of the "neighbourhood" backend's pattern_frequency. Defaults to 1.
+
+        Returns:
+        - dict: A dictionary where keys are patterns and values are their frequencies in the range.
+        """
+        # Check backend
+        if backend not in FREQUENCY_BACKENDS:
+            raise ValueError(f"Invalid backend. Please provide one of {', '.join(FREQUENCY_BACKENDS)}.")
+        
+        parameters = {"range": seq_range, "k": k_mer_length, "d": distance, "rc": reverse_complement, "backend": backend}
+        return self._cached("frequent_patterns", parameters,
+                            lambda: self._frequent_patterns(seq_range, k_mer_length, distance, reverse_complement,
+                                                            backend, processes))
+    
+    def _frequent_patterns(self, seq_range: tuple, k_mer_length: int, distance: int, reverse_complement: bool,
+                           backend: str, processes: int) -> dict:
+        """
+        Computation of frequent_patterns with the selected backend.
+        """
+        k_mers = self.generate_k_mers(k_mer_length=k_mer_length, seq_range=seq_range)
+        # The FM-index and the frequency arrays only count k-mers of A, C, G and T; every symbol of the range
+        # is part of at least one k-mer
+        encodable = set("".join(k_mers)) <= set("ACGT")
+        if backend in ("fm_index", "frequency_array") and not encodable:
+            raise ValueError(f"The {backend} backend only supports ranges of A, C, G and T. "
+                             "Please use the neighbourhood backend.")
+        
+        neighbours = len(k_mers) * hamming_ball_size(k_mer_length, distance) * (2 if reverse_complement else 1)
+        
+        if backend == "frequency_array":
+            # Dense arrays far larger than the neighbourhoods of the range waste memory and time
+            if 4**k_mer_length > FREQUENCY_ARRAY_SPARSITY * max(neighbours, NEIGHBOURHOOD_LIMIT):
+                raise ValueError(f"Frequency arrays of 4^{k_mer_length} entries are too large for this range. "
+                                 "Please use the neighbourhood or fm_index backend.")
+            counts = frequency_array_func(sequence=self.genome, k_mer_length=k_mer_length, seq_range=seq_range)
+            candidates = counts > 0
+            frequencies = neighbourhood_array_func(counts, k_mer_length, distance, reverse_complement,
+                                                   candidates=candidates)
+            return frequency_array_to_dict(frequencies, k_mer_length, candidates=candidates)
+        if backend == "auto":
+            backend = "fm_index" if neighbours > NEIGHBOURHOOD_LIMIT and encodable else "neighbourhood"
+        
+        if backend == "fm_index":
+            return fm_pattern_freq_func(sequence=self.genome, seq_range=seq_range, k_mers=k_mers, distance=distance,
+                                        reverse_complement=reverse_complement)
+        neighbourhood = self.neighbourhood_dictionary(k_mers=k_mers, distance=distance,
+                                                      reverse_complement=reverse_complement)
+        return self.pattern_frequency(seq_range=seq_range, neighbourhood_dict=neighbourhood, processes=processes)
+    
+    @instrumented
+    def frequency_array(self, k_mer_length: int, distance: int = 0, reverse_complement: bool = False,
+                        seq_range: tuple = None) -> tuple:
+        """
+        Counts k-mers and their d-neighbourhoods in dense arrays indexed by k-mer code.
+
+        Parameters:
+        - k_mer_length (int): Length of the k-mers, at most 12.
+        - distance (int, optional): The maximum Hamming distance. Defaults to 0.
+        - reverse_complement (bool, optional): Include reverse complements. Defaults to False.
+        - seq_range (tuple, optional): First and last position of the range. Defaults to None, the whole genome.
+
+        Returns:
+        - np.ndarray: Counts of the k-mers; the k-mers of the range have non-zero counts.
+        - np.ndarray: Number of windows within the distance of every k-mer.
+        """
+        counts = frequency_array_func(sequence=self.genome, k_mer_length=k_mer_length, seq_range=seq_range)
+        return counts, neighbourhood_array_func(counts, k_mer_length, distance, reverse_complement)
+    
+    def most_frequent_array(self, frequencies, k_mer_length: int, candidates=None) -> tuple:
+        """
+        Finds the most frequent patterns in a frequency array.
+
+        Parameters:
+        - frequencies (np.ndarray): Frequency array indexed by k-mer code.
+        - k_mer_length (int): Length of the k-mers.
+        - candidates (np.ndarray, optional): Boolean array of the patterns to consider. Defaults to None.
+
+        Returns:
+        - tuple: Number of occurences, a list containing the most frequent patterns.
+        """
+        return most_frequent_array_func(frequencies, k_mer_length, candidates=candidates)
     
     def most_frequent_patterns(self, frequency_dict: dict) -> list:
         """
@@ -130,4 +580,136 @@ class OriAnalyzer():
         Returns:
         - list: A list containing the most frequent patterns.
         """
-        return most_frequent_func(frequency_dict=frequency_dict)
\ No newline at end of file
+        return most_frequent_func(frequency_dict=frequency_dict)
+    
+    @instrumented
+    def find_clumps(self, k_mer_length: int = 9, window: int = 500, threshold: int = 3, distance: int = 0,
+                    reverse_complement: bool = False) -> list:
+        """
+        Finds all k-mers forming (L, t)-clumps anywhere in the genome using the find_clumps function.
+
+        Parameters:
+        - k_mer_length (int, optional): Length of the k-mers. Defaults to 9.
+        - window (int, optional): Length L of the window. Defaults to 500.
+        - threshold (int, optional): Minimum number t of occurrences within a window. Defaults to 3.
+        - distance (int, optional): The maximum hamming distance of occurrences. Defaults to 0.
+        - reverse_complement (bool, optional): Count occurrences of the reverse complement. Defaults to False.
+
+        Returns:
+        - list: Sorted list of the k-mers forming clumps.
+        """
+        clumps = find_clumps_func(sequence=self.genome, k_mer_length=k_mer_length, window=window, threshold=threshold,
+                                  distance=distance, reverse_complement=reverse_complement)
+        self._count(windows=max(len(self.genome) - k_mer_length + 1, 0), clumps=len(clumps))
+        return clumps
+    
+    @instrumented
+    def approximate_match(self, patterns: list, distance: int = 1, strand: str = "both") -> dict:
+        """
+        Finds all positions in the genome where patterns, e.g. candidate DnaA boxes, occur with mismatches.
+
+        Parameters:
+        - patterns (list): Patterns consisting of A, C, G and T, e.g. from most_frequent_patterns.
+        - distance (int, optional): The maximum hamming distance. Defaults to 1.
+        - strand (str, optional): "forward", "reverse" or "both" strands. Defaults to "both".
+
+        Returns:
+        - dict: Sorted NumPy array of the start positions of matches for every pattern.
+        """
+        matches = approximate_match_func(sequence=self.genome, patterns=patterns, distance=distance, strand=strand,
+                                         k_mer_index=self._current_k_mer_index())
+        if self.instrumentation is not None:
+            self.instrumentation.count(patterns=len(matches),
+                                       matches=sum(len(positions) for positions in matches.values()))
+        return matches
+    
+    @instrumented
+    def analyze(self, k_mer_length: int = 9, distance: int = 1, window: int = 500, reverse_complement: bool = True) -> dict:
+        """
+        Runs the skew -> k-mer -> frequency pipeline on the genome.
+
+        The analyzed range extends from the first minimum skew position 'window' base pairs downstream,
+        clipped to the end of the genome.
+
+        Parameters:
+        - k_mer_length (int, optional): Length of k-mers. Defaults to 9.
+        - distance (int, optional): The maximum Hamming distance of the neighbourhoods. Defaults to 1.
+        - window (int, optional): Number of base pairs analyzed downstream of the skew minimum. Defaults to 500.
+        - reverse_complement (bool, optional): Include reverse complements in the neighbourhoods. Defaults to True.
+
+        Returns:
+        - dict: Genome length, minimum and maximum skew positions, analyzed range, maximum frequency and most
+        frequent patterns. Without a range long enough for one k-mer, the frequency is 0 and no patterns are reported.
+        """
+        self.calculate_gc_skew()
+        min_positions, max_positions = self.min_max_skew()
+        start = min_positions[0]
+        stop = min(start + window, len(self.genome) - 1)
+        result = {"length": len(self.genome),
+                  "min_skew_positions": min_positions,
+                  "max_skew_positions": max_positions,
+                  "seq_range": (start, stop),
+                  "max_count": 0,
+                  "patterns": []}
+        
+        # Skip the frequency analysis if the range cannot hold a single k-mer
+        if stop - start + 1 < k_mer_length or start >= stop:
+            return result
+        
+        frequency = self.frequent_patterns(seq_range=(start, stop), k_mer_length=k_mer_length, distance=distance,
+                                           reverse_complement=reverse_complement)
+        result["max_count"], result["patterns"] = self.most_frequent_patterns(frequency_dict=frequency)
+        return result
+    
+    @classmethod
+    def analyze_records(cls, input_path: str, k_mer_length: int = 9, distance: int = 1, window: int = 500,
+                        reverse_complement: bool = True, processes: int = None) -> list:
+        """
+        Runs the analysis pipeline separately for every record of a (multi-record) FASTA file.
+
+        The file is indexed with index_fasta and the records are distributed over a process pool; every
+        worker reads only its own record.
+
+        Parameters:
+        - input_path (str): Path to the FASTA or plain text file.
+        - k_mer_length (int, optional): Length of k-mers. Defaults to 9.
+        - distance (int, optional): The maximum Hamming distance of the neighbourhoods. Defaults to 1.
+        - window (int, optional): Number of base pairs analyzed downstream of the skew minimum. Defaults to 500.
+        - reverse_complement (bool, optional): Include reverse complements in the neighbourhoods. Defaults to True.
+        - processes (int, optional): Number of worker processes. Defaults to None, which uses all CPUs;
+        1 runs all records in the current process.
+
+        Returns:
+        - list: One result dictionary per record in file order, as returned by analyze, with the record name
+        and file offset added.
+        """
+        records = index_fasta_func(input_path=input_path)
+        parameters = (k_mer_length, distance, window, reverse_complement)
+        tasks = [(input_path, record, parameters) for record in records]
+        
+        if processes == 1 or len(records) == 1:
+            return [_analyze_record(task) for task in tasks]
+        
+        processes = processes or os.cpu_count() or 1
+        with ProcessPoolExecutor(max_workers=processes) as executor:
+            # Hand out several small records per task to keep all workers busy
+            chunksize = max(1, len(tasks) // (4 * processes))
+            return list(executor.map(_analyze_record, tasks, chunksize=chunksize))
+
+def _analyze_record(task: tuple) -> dict:
+    """
+    Worker function of OriAnalyzer.analyze_records, analyzing one FASTA record.
+    """
+    input_path, record, (k_mer_length, distance, window, reverse_complement) = task
+    result = {"name": record.name, "offset": record.offset}
+    # Records without bases have no skew
+    if record.length == 0:
+        result.update({"length": 0, "min_skew_positions": [], "max_skew_positions": [], "seq_range": None,
+                       "max_count": 0, "patterns": []})
+        return result
+    
+    analyzer = OriAnalyzer()
+    analyzer.genome = read_record_func(input_path=input_path, record=record)
+    result.update(analyzer.analyze(k_mer_length=k_mer_length, distance=distance, window=window,
+                                   reverse_complement=reverse_complement))
+    return result
@@ -1,38 +1,191 @@
+import argparse
+import glob
+import json
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
 from ori_analyzer import OriAnalyzer
+from functions.result_cache import ResultCache
+
+# File extensions collected when a directory is given as input
+GENOME_EXTENSIONS = (".txt", ".fa", ".fasta", ".fna", ".fas", ".seq")
+# Columns of the TSV output
+TSV_COLUMNS = ("path", "length", "min_skew_positions", "max_skew_positions", "start", "stop", "max_count", "patterns",
+               "error")
+
+def parse_arguments(argv: list = None) -> argparse.Namespace:
+    """
+    Parses the command line arguments of the pipeline.
+
+    Parameters:
+    - argv (list, optional): Command line arguments. Defaults to None, which uses sys.argv.
+
+    Returns:
+    - argparse.Namespace: Parsed arguments.
+    """
+    parser = argparse.ArgumentParser(description="Find putative DnaA boxes downstream of the GC skew minimum.")
+    parser.add_argument("inputs", nargs="*", default=["genome.txt"],
+                        help="Genome files, directories or glob patterns. Defaults to genome.txt.")
+    parser.add_argument("-k", "--k-mer-length", type=int, default=9, help="Length of k-mers. Defaults to 9.")
+    parser.add_argument("-d", "--distance", type=int, default=1,
+                        help="Maximum Hamming distance of the neighbourhoods. Defaults to 1.")
+    parser.add_argument("-w", "--window", type=int, default=500,
+                        help="Base pairs analyzed downstream of the skew minimum. Defaults to 500.")
+    parser.add_argument("--reverse-complement", action=argparse.BooleanOptionalAction, default=True,
+                        help="Include reverse complements in the neighbourhoods. Enabled by default.")
+    parser.add_argument("-j", "--workers", type=int, default=None,
+                        help="Number of worker processes. Defaults to the number of CPUs.")
+    parser.add_argument("-f", "--format", choices=("text", "jsonl", "tsv"), default="text",
+                        help="Output format. Defaults to text.")
+    parser.add_argument("-o", "--output", default=None, help="Output file. Defaults to standard output.")
+    parser.add_argument("--cache-dir", default=None,
+                        help="Directory of the result cache shared by all workers and runs. Defaults to no caching.")
+    parser.add_argument("--cache-size", type=int, default=2**30,
+                        help="Maximum size of the result cache in bytes. Defaults to 1 GiB.")
+    return parser.parse_args(argv)
+
+def collect_genomes(inputs: list) -> list:
+    """
+    Expands files, directories and glob patterns into a sorted list of genome files.
+
+    Parameters:
+    - inputs (list): Files, directories or glob patterns.
+
+    Returns:
+    - list: Paths of the genome files without duplicates.
+    """
+    paths = []
+    for pattern in inputs:
+        # Keep plain paths that do not exist, so that missing genomes are reported
+        matches = sorted(glob.glob(pattern)) if glob.has_magic(pattern) else [pattern]
+        for match in matches:
+            if os.path.isdir(match):
+                paths += sorted(os.path.join(match, name) for name in os.listdir(match)
+                                if name.lower().endswith(GENOME_EXTENSIONS))
+            else:
+                paths.append(match)
+
+    return list(dict.fromkeys(paths))
+
+# Result caches of the worker process, keyed by directory and maximum size, so their size estimates persist
+_worker_caches = {}
+
+def _result_cache(directory: str, max_bytes: int) -> ResultCache:
+    """
+    Return the result cache of a directory for this worker process, creating it on first use.
+    """
+    if (directory, max_bytes) not in _worker_caches:
+        _worker_caches[directory, max_bytes] = ResultCache(directory, max_bytes)
+    return _worker_caches[directory, max_bytes]
+
+def analyze_genome(task: tuple) -> dict:
+    """
+    Worker function analyzing one genome file. Errors are returned as part of the result.
+
+    Parameters:
+    - task (tuple): Path of the genome, (k_mer_length, distance, window, reverse_complement) and (directory,
+    maximum size) of the result cache or None.
+
+    Returns:
+    - dict: Result of OriAnalyzer.analyze with the path added, or the path and an error message.
+    """
+    path, (k_mer_length, distance, window, reverse_complement), cache = task
+    result = {"path": path}
+    try:
+        analyzer = OriAnalyzer(result_cache=_result_cache(*cache) if cache is not None else None)
+        analyzer.read_sequence(path)
+        result.update(analyzer.analyze(k_mer_length=k_mer_length, distance=distance, window=window,
+                                       reverse_complement=reverse_complement))
+    except (OSError, ValueError) as error:
+        result["error"] = str(error)
+    return result
+
+def format_result(result: dict, output_format: str, k_mer_length: int) -> str:
+    """
+    Formats the result of one genome.
+
+    Parameters:
+    - result (dict): Result as returned by analyze_genome.
+    - output_format (str): One of "text", "jsonl" or "tsv".
+    - k_mer_length (int): Length of the analyzed k-mers, used in the text output.
+
+    Returns:
+    - str: Formatted result without trailing line break.
+    """
+    if output_format == "jsonl":
+        return json.dumps(result)
 
-def main():
+    if output_format == "tsv":
+        start, stop = result.get("seq_range") or ("", "")
+        values = {"path": result["path"],
+                  "length": result.get("length", ""),
+                  "min_skew_positions": ",".join(map(str, result.get("min_skew_positions", []))),
+                  "max_skew_positions": ",".join(map(str, result.get("max_skew_positions", []))),
+                  "start": start,
+                  "stop": stop,
+                  "max_count": result.get("max_count", ""),
+                  "patterns": ",".join(result.get("patterns", [])),
+                  "error": result.get("error", "")}
+        return "\t".join(str(values[column]) for column in TSV_COLUMNS)
+
+    if "error" in result:
+        return f"Analysis of {result['path']} failed: {result['error']}"
+    lines = [f"Positions with minimum skew values: {result['min_skew_positions']}",
+             f"Positions with maximum skew values: {result['max_skew_positions']}",
+             f"The following {k_mer_length}-mers have been found {result['max_count']} times in the given sequence range"]
+    return "\n".join(lines + result["patterns"])
+
+def main(argv: list = None) -> int:
     """
     The main function of the OriC pipeline.
 
-    Reads the genome sequence ("genome.txt"), calculates GC skew, generates 9-mers, and finds the most frequent patterns
-    within a specified sequence range. Prints the results.
-    """
-    analyzer = OriAnalyzer()
-    # Read genome sequence and calculate skew values
-    analyzer.read_sequence("genome.txt")
-    analyzer.calculate_gc_skew()
-    min_position, max_position = analyzer.min_max_skew()
-    print(f"Positions with minimum skew values: {min_position}")
-    print(f"Positions with maximum skew values: {max_position}")
-    # Get user input
-    k_mer_length = 9
-    start_pos = min_position[0]
-    stop_pos = start_pos + 500
-    
-    # Generate k-mers and neighbourhood
-    k_mers = analyzer.generate_k_mers(k_mer_length=k_mer_length,
-                                      seq_range=(start_pos, stop_pos))
-    neighbourhood = analyzer.neighbourhood_dictionary(k_mers=k_mers,
-                                                      distance=1,
-                                                      reverse_complement=True)
-    # Generate pattern frequency
-    frequency = analyzer.pattern_frequency(seq_range=(start_pos, stop_pos),
-                                           neighbourhood_dict=neighbourhood)
-    max_value, patterns = analyzer.most_frequent_patterns(frequency_dict=frequency)
-    # Output patterns
-    print(f"The following {k_mer_length}-mers have been found {max_value} times in the given sequence range")
-    for pattern in patterns:
-        print(pattern)
+    Reads every genome, calculates GC skew, generates k-mers, and finds the most frequent patterns within
+    the range from the minimum skew position 'window' base pairs downstream. Genomes are distributed over
+    a process pool and every result is written as soon as its genome is finished.
+
+    Parameters:
+    - argv (list, optional): Command line arguments. Defaults to None, which uses sys.argv.
+
+    Returns:
+    - int: Exit code, 1 if any genome could not be analyzed.
+    """
+    arguments = parse_arguments(argv)
+    paths = collect_genomes(arguments.inputs)
+    parameters = (arguments.k_mer_length, arguments.distance, arguments.window, arguments.reverse_complement)
+    cache = (arguments.cache_dir, arguments.cache_size) if arguments.cache_dir else None
+    tasks = [(path, parameters, cache) for path in paths]
+
+    output = open(arguments.output, "w") if arguments.output else sys.stdout
+    failed = False
+    try:
+        if arguments.format == "tsv":
+            output.write("\t".join(TSV_COLUMNS) + "\n")
+
+        # Analyze in the current process if there is nothing to parallelize
+        if len(tasks) <= 1 or arguments.workers == 1:
+            results = map(analyze_genome, tasks)
+            executor = None
+        else:
+            executor = ProcessPoolExecutor(max_workers=arguments.workers)
+            results = (future.result() for future in as_completed([executor.submit(analyze_genome, task)
+                                                                   for task in tasks]))
+
+        try:
+            for result in results:
+                failed = failed or "error" in result
+                if arguments.format == "text" and len(tasks) > 1:
+                    output.write(f"==> {result['path']} <==\n")
+                output.write(format_result(result, arguments.format, arguments.k_mer_length) + "\n")
+                output.flush()
+        finally:
+            if executor is not None:
+                executor.shutdown(cancel_futures=True)
+    finally:
+        if output is not sys.stdout:
+            output.close()
+
+    return 1 if failed else 0
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    sys.exit(main())
@@ -0,0 +1,282 @@
+import asyncio
+import os
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+
+from ori_analyzer import OriAnalyzer
+
+# Genomes kept loaded per worker process, least recently used genomes are dropped first
+WORKER_GENOMES = 4
+
+# Analyzers of the genomes loaded in a worker process, keyed by path and modification time
+_worker_analyzers = {}
+
+def _worker_analyzer(input_path: str) -> OriAnalyzer:
+    """
+    Return an analyzer of a genome file, reading the file only if it is not loaded in this worker yet.
+    """
+    key = (input_path, os.path.getmtime(input_path))
+    analyzer = _worker_analyzers.pop(key, None)
+    if analyzer is None:
+        analyzer = OriAnalyzer()
+        analyzer.read_sequence(input_path)
+        # Drop the least recently used genome
+        if len(_worker_analyzers) >= WORKER_GENOMES:
+            del _worker_analyzers[next(iter(_worker_analyzers))]
+    _worker_analyzers[key] = analyzer
+    return analyzer
+
+def _analyze_task(input_path: str, k_mer_length: int, distance: int, window: int, reverse_complement: bool) -> dict:
+    """
+    Worker function of OriService.analyze.
+    """
+    return _worker_analyzer(input_path).analyze(k_mer_length=k_mer_length, distance=distance, window=window,
+                                                reverse_complement=reverse_complement)
+
+def _min_max_skew_task(input_path: str) -> tuple:
+    """
+    Worker function of OriService.min_max_skew.
+    """
+    analyzer = _worker_analyzer(input_path)
+    if analyzer.skew_array is None:
+        analyzer.calculate_gc_skew()
+    return analyzer.min_max_skew()
+
+def _frequency_batch_task(input_path: str, k_mer_length: int, distance: int, reverse_complement: bool,
+                          ranges: list) -> list:
+    """
+    Worker function of OriService.frequent_patterns, answering a batch of region queries on one genome.
+
+    Invalid queries return their ValueError instead of failing the whole batch.
+    """
+    analyzer = _worker_analyzer(input_path)
+    results = []
+    for seq_range in ranges:
+        try:
+            results.append(analyzer.frequent_patterns(seq_range=seq_range, k_mer_length=k_mer_length,
+                                                      distance=distance, reverse_complement=reverse_complement))
+        except ValueError as error:
+            results.append(error)
+    return results
+
+class OriService():
+    """
+    Asyncio facade of OriAnalyzer for use in event loops, e.g. of a web service.
+
+    CPU-bound stages run in a process pool, where every worker keeps its most recently used genomes
+    loaded. Concurrent requests with identical parameters share one computation, and small region
+    queries against the same genome and parameters are collected for a short delay and answered by a
+    single task. At most max_pending tasks run or wait in the pool; further requests wait in the event
+    loop. Cancelling a request cancels its computation once no other request waits for it, as long as
+    the task has not started in a worker.
+    """
+
+    def __init__(self, processes: int = None, max_pending: int = 64, batch_size: int = 64, batch_delay: float = 0.005,
+                 executor=None):
+        """
+        Parameters:
+        - processes (int, optional): Number of worker processes. Defaults to None, which uses all CPUs.
+        - max_pending (int, optional): Maximum number of tasks submitted to the pool at once. Defaults to 64.
+        - batch_size (int, optional): Maximum number of region queries per task. Defaults to 64.
+        - batch_delay (float, optional): Seconds a region query waits for further queries of its batch. Defaults to 0.005.
+        - executor (concurrent.futures.Executor, optional): Pool running the tasks, not shut down by close.
+        Defaults to None, which starts a ProcessPoolExecutor.
+        """
+        # Check limits
+        if max_pending < 1 or batch_size < 1 or batch_delay < 0:
+            raise ValueError("Invalid limits. Please provide positive max_pending and batch_size and a non-negative batch_delay.")
+
+        self.processes = processes
+        self.max_pending = max_pending
+        self.batch_size = batch_size
+        self.batch_delay = batch_delay
+        self._executor = executor
+        self._owns_executor = executor is None
+        self._semaphore = None
+        self._inflight = {}
+        self._batches = {}
+        self._batch_tasks = set()
+        self._stats = {"requests": 0, "deduplicated": 0, "tasks": 0, "batched_queries": 0}
+
+    async def __aenter__(self) -> "OriService":
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        await self.close()
+
+    def stats(self) -> dict:
+        """
+        Counters of the service.
+
+        Returns:
+        - dict: Number of requests, requests served by a running identical request, tasks submitted to the pool
+        and region queries answered in batches.
+        """
+        return dict(self._stats)
+
+    async def _run(self, function, *args):
+        """
+        Run a function in the pool, waiting while max_pending tasks are submitted.
+        """
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.max_pending)
+        async with self._semaphore:
+            if self._executor is None:
+                self._executor = ProcessPoolExecutor(max_workers=self.processes)
+            self._stats["tasks"] += 1
+            return await asyncio.get_running_loop().run_in_executor(self._executor, partial(function, *args))
+
+    async def _deduplicated(self, key: tuple, factory):
+        """
+        Await the computation of a request, sharing it with concurrent requests of the same key.
+
+        Parameters:
+        - key (tuple): Method and parameters of the request.
+        - factory (callable): Returns the coroutine computing the result.
+        """
+        self._stats["requests"] += 1
+        entry = self._inflight.get(key)
+        if entry is None:
+            entry = self._inflight[key] = [asyncio.ensure_future(factory()), 0]
+            entry[0].add_done_callback(lambda _: self._inflight.pop(key) if self._inflight.get(key) is entry else None)
+        else:
+            self._stats["deduplicated"] += 1
+
+        entry[1] += 1
+        try:
+            # Shielded, so that a cancelled request does not cancel the other requests
+            return await asyncio.shield(entry[0])
+        except asyncio.CancelledError:
+            if entry[1] == 1:
+                entry[0].cancel()
+            raise
+        finally:
+            entry[1] -= 1
+
+    async def analyze(self, input_path: str, k_mer_length: int = 9, distance: int = 1, window: int = 500,
+                      reverse_complement: bool = True) -> dict:
+        """
+        Runs OriAnalyzer.analyze on a genome file in the pool.
+
+        Parameters:
+        - input_path (str): Path to the FASTA or plain text file.
+        - k_mer_length (int, optional): Length of k-mers. Defaults to 9.
+        - distance (int, optional): The maximum Hamming distance of the neighbourhoods. Defaults to 1.
+        - window (int, optional): Number of base pairs analyzed downstream of the skew minimum. Defaults to 500.
+        - reverse_complement (bool, optional): Include reverse complements in the neighbourhoods. Defaults to True.
+
+        Returns:
+        - dict: Result of OriAnalyzer.analyze.
+        """
+        arguments = (os.path.abspath(input_path), k_mer_length, distance, window, reverse_complement)
+        return await self._deduplicated(("analyze",) + arguments, lambda: self._run(_analyze_task, *arguments))
+
+    async def min_max_skew(self, input_path: str) -> tuple:
+        """
+        Calculates the GC skew of a genome file in the pool and returns its extrema.
+
+        Parameters:
+        - input_path (str): Path to the FASTA or plain text file.
+
+        Returns:
+        - list: Positions where the skew is minimum.
+        - list: Positions where the skew is maximum.
+        """
+        input_path = os.path.abspath(input_path)
+        return await self._deduplicated(("min_max_skew", input_path), lambda: self._run(_min_max_skew_task, input_path))
+
+    async def frequent_patterns(self, input_path: str, seq_range: tuple, k_mer_length: int = 9, distance: int = 1,
+                                reverse_complement: bool = False) -> dict:
+        """
+        Runs OriAnalyzer.frequent_patterns for a region of a genome file, batched with concurrent queries.
+
+        Parameters:
+        - input_path (str): Path to the FASTA or plain text file.
+        - seq_range (tuple): First and last position of the region.
+        - k_mer_length (int, optional): Length of k-mers. Defaults to 9.
+        - distance (int, optional): The maximum Hamming distance. Defaults to 1.
+        - reverse_complement (bool, optional): Include reverse complements. Defaults to False.
+
+        Returns:
+        - dict: A dictionary where keys are patterns and values are their frequencies in the region.
+        """
+        batch_key = (os.path.abspath(input_path), k_mer_length, distance, reverse_complement)
+        seq_range = tuple(seq_range)
+        return await self._deduplicated(("frequent_patterns", seq_range) + batch_key,
+                                        lambda: self._batched(batch_key, seq_range))
+
+    async def _batched(self, batch_key: tuple, seq_range: tuple):
+        """
+        Add a region query to the open batch of its genome and parameters and await its result.
+        """
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        if batch_key not in self._batches:
+            self._batches[batch_key] = ([], loop.call_later(self.batch_delay, self._flush, batch_key))
+        queries = self._batches[batch_key][0]
+        queries.append((seq_range, future))
+        if len(queries) >= self.batch_size:
+            self._flush(batch_key)
+        return await future
+
+    def _flush(self, batch_key: tuple) -> None:
+        """
+        Submit the open batch of a genome and parameters as one task.
+        """
+        queries, timer = self._batches.pop(batch_key)
+        timer.cancel()
+        # Queries cancelled while the batch was open are dropped
+        queries = [(seq_range, future) for seq_range, future in queries if not future.done()]
+        if len(queries) == 0:
+            return
+
+        task = asyncio.ensure_future(self._run_batch(batch_key, queries))
+        self._batch_tasks.add(task)
+        task.add_done_callback(self._batch_tasks.discard)
+
+        # The task is cancelled when all of its queries are
+        def cancel_batch(_) -> None:
+            if all(future.cancelled() for _, future in queries):
+                task.cancel()
+        for _, future in queries:
+            future.add_done_callback(cancel_batch)
+
+    async def _run_batch(self, batch_key: tuple, queries: list) -> None:
+        """
+        Answer a batch of region queries and resolve their futures.
+        """
+        self._stats["batched_queries"] += len(queries)
+        try:
+            results = await self._run(_frequency_batch_task, *batch_key, [seq_range for seq_range, _ in queries])
+        except asyncio.CancelledError:
+            for _, future in queries:
+                future.cancel()
+            raise
+        except Exception as error:
+            results = [error] * len(queries)
+
+        for (_, future), result in zip(queries, results):
+            if future.done():
+                continue
+            if isinstance(result, Exception):
+                future.set_exception(result)
+            else:
+                future.set_result(result)
+
+    async def close(self) -> None:
+        """
+        Cancel open batches and running batch tasks and shut down the pool started by the service.
+        """
+        for batch_key in list(self._batches):
+            queries, timer = self._batches.pop(batch_key)
+            timer.cancel()
+            for _, future in queries:
+                future.cancel()
+        for task in list(self._batch_tasks):
+            task.cancel()
+
+        if self._executor is not None and self._owns_executor:
+            executor, self._executor = self._executor, None
+            # Shutting down waits for running tasks, so it must not block the event loop
+            await asyncio.get_running_loop().run_in_executor(None, partial(executor.shutdown, wait=True,
+                                                                           cancel_futures=True))
@@ -0,0 +1,45 @@
+import random
+import pytest
+from functions.approximate_match import approximate_match
+from functions.packed_sequence import PackedSequence
+from functions.sequence import reverse_complement
+from ori_analyzer import OriAnalyzer
+
+# Create fixture for instantiating
+@pytest.fixture
+def ori_analyzer():
+    return OriAnalyzer()
+
+# Test for correct positions
+def test_approximate_match(ori_analyzer):
+    ori_analyzer.genome = "CGCCCGAATCCAGAACGCATTCCCATATTTCGGGACCACTGGCCTCCACGGTACGGACGTCAATCAAAT"
+    matches = ori_analyzer.approximate_match(["ATTCTGGA"], distance=3, strand="forward")
+    assert matches["ATTCTGGA"].tolist() == [6, 7, 26, 27]
+
+# Test for both strands against a naive scan
+@pytest.mark.parametrize("strand", ["forward", "reverse", "both"])
+def test_approximate_match_naive(strand):
+    generator = random.Random(7)
+    sequence = "".join(generator.choice("ACGTN") for _ in range(300))
+    patterns = ["".join(generator.choice("ACGT") for _ in range(length)) for length in (3, 4, 4, 6)]
+    matches = approximate_match(PackedSequence.from_string(sequence), patterns, 1, strand)
+    assert list(matches) == patterns
+    for pattern in patterns:
+        targets = {"forward": [pattern], "reverse": [reverse_complement(pattern)],
+                   "both": [pattern, reverse_complement(pattern)]}[strand]
+        expected = [pos for pos in range(len(sequence) - len(pattern) + 1)
+                    if "N" not in sequence[pos:pos + len(pattern)]
+                    and any(sum(a != b for a, b in zip(sequence[pos:pos + len(pattern)], target)) <= 1
+                            for target in targets)]
+        assert matches[pattern].tolist() == expected
+
+# Test for handling invalid input
+def test_approximate_match_invalid(ori_analyzer):
+    ori_analyzer.genome = "ACGTACGT"
+    with pytest.raises(ValueError):
+        ori_analyzer.approximate_match(["ACNT"])
+    with pytest.raises(ValueError):
+        ori_analyzer.approximate_match(["ACGT"], strand="sense")
+    with pytest.raises(ValueError):
+        ori_analyzer.approximate_match(["ACGT"], distance=-1)
+    assert ori_analyzer.approximate_match(["ACGTACGTA"])["ACGTACGTA"].tolist() == []
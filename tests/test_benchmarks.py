@@ -0,0 +1,30 @@
+import json
+from benchmarks import ori_benchmarks
+
+# Test for a reproducible synthetic genome with a skew turning point
+def test_synthetic_genome():
+    genome = ori_benchmarks.synthetic_genome(10000, seed=1)
+    assert genome == ori_benchmarks.synthetic_genome(10000, seed=1)
+    assert len(genome) == 10000 and set(genome) == set("ACGT")
+    assert genome[:5000].count("G") > genome[:5000].count("C")
+
+# Test for the regression threshold
+def test_compare():
+    baseline = {"gc_skew[1Mb]": 1.0, "min_max_skew[1Mb]": 1.0}
+    results = {"gc_skew[1Mb]": 1.2, "min_max_skew[1Mb]": 1.3, "read_sequence[1Mb]": 5.0}
+    assert ori_benchmarks.compare(results, baseline, threshold=1.25) == [("min_max_skew[1Mb]", 1.0, 1.3, 1.3)]
+
+# Test for a small run of every stage, saving and checking a baseline
+def test_benchmark_smoke(tmp_path, capsys):
+    baseline_path = tmp_path / "baselines.json"
+    arguments = ["--sizes", "5000", "-k", "4", "-d", "0", "1", "-r", "1", "--baseline", str(baseline_path)]
+    assert ori_benchmarks.main(arguments + ["--save-baseline"]) == 0
+    stored = json.loads(baseline_path.read_text())["results"]
+    assert {name.split("[")[0] for name in stored} == {"read_sequence", "gc_skew", "min_max_skew", "generate_k_mers",
+                                                       "neighbourhood", "frequency"}
+    assert "frequency[5000,k=4,d=1]" in stored
+
+    # Baselines of a nanosecond turn every measurement into a regression
+    baseline_path.write_text(json.dumps({"results": {name: 1e-9 for name in stored}}))
+    assert ori_benchmarks.main(arguments) == 1
+    assert "Regression in gc_skew[5000]" in capsys.readouterr().out
@@ -0,0 +1,53 @@
+import random
+from itertools import product
+import pytest
+from functions import clumps
+from functions.packed_sequence import PackedSequence
+from functions.sequence import reverse_complement
+from ori_analyzer import OriAnalyzer
+
+# Create fixture for instantiating
+@pytest.fixture
+def ori_analyzer():
+    return OriAnalyzer()
+
+def naive_clumps(sequence, k_mer_length, window, threshold, distance, rc):
+    result = []
+    for pattern in map("".join, product("ACGT", repeat=k_mer_length)):
+        targets = [pattern, reverse_complement(pattern)] if rc else [pattern]
+        hits = [pos for pos in range(len(sequence) - k_mer_length + 1)
+                if "N" not in sequence[pos:pos + k_mer_length] and any(sum(a != b for a, b in zip(sequence[pos:pos + k_mer_length], target)) <= distance
+                       for target in targets)]
+        if any(hits[i + threshold - 1] - hits[i] <= window - k_mer_length for i in range(len(hits) - threshold + 1)):
+            result.append(pattern)
+    return result
+
+# Test for correct clumps
+def test_find_clumps(ori_analyzer):
+    ori_analyzer.genome = "CGGACTCGACAGATGTGAAGAACGACAATGTGAAGACTCGACACGACAGAGTGAAGAGAAGAGGAAACATTGTAA"
+    assert ori_analyzer.find_clumps(k_mer_length=5, window=50, threshold=4) == ["CGACA", "GAAGA"]
+
+# Test for identical results to a naive scan, also across block boundaries
+@pytest.mark.parametrize("block_entries", [1, 64, 2**18])
+def test_find_clumps_naive(monkeypatch, block_entries):
+    monkeypatch.setattr(clumps, "CLUMP_BLOCK_ENTRIES", block_entries)
+    generator = random.Random(block_entries)
+    for _ in range(10):
+        sequence = "".join(generator.choice("ACGTN") for _ in range(generator.randint(10, 60)))
+        k_mer_length = generator.randint(2, 3)
+        window = generator.randint(k_mer_length, len(sequence))
+        threshold, distance, rc = generator.randint(1, 3), generator.randint(0, 1), generator.random() < 0.5
+        expected = naive_clumps(sequence, k_mer_length, window, threshold, distance, rc)
+        assert clumps.find_clumps(sequence, k_mer_length, window, threshold, distance, rc) == expected
+        assert clumps.find_clumps(PackedSequence.from_string(sequence), k_mer_length, window, threshold, distance,
+                                  rc) == expected
+
+# Test for handling invalid parameters
+def test_find_clumps_invalid(ori_analyzer):
+    ori_analyzer.genome = "ACGTACGT"
+    with pytest.raises(ValueError):
+        ori_analyzer.find_clumps(k_mer_length=4, window=9)
+    with pytest.raises(ValueError):
+        ori_analyzer.find_clumps(k_mer_length=4, window=3)
+    with pytest.raises(ValueError):
+        ori_analyzer.find_clumps(k_mer_length=4, window=8, threshold=0)
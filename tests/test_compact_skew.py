@@ -0,0 +1,72 @@
+import random
+import numpy as np
+import pytest
+from functions.compact_skew import CompactSkew
+from functions.gc_skew import calculate_gc_skew, decimate_skew, min_max_skew, skew_extrema
+from functions.packed_sequence import PackedSequence
+from ori_analyzer import OriAnalyzer
+
+# Create fixture for a random genome with masked symbols
+@pytest.fixture
+def genome():
+    generator = random.Random(25)
+    return "".join(generator.choice("ACGT" * 10 + "N") for _ in range(20001))
+
+# Test for identical scores from sequences, packed sequences and skew arrays
+def test_compact_skew_decode(genome):
+    skew_array = calculate_gc_skew(genome)
+    for block_size in (4, 12, 4096):
+        for compact in (CompactSkew.from_sequence(genome, block_size),
+                        CompactSkew.from_sequence(PackedSequence.from_string(genome), block_size),
+                        CompactSkew.from_array(skew_array, block_size)):
+            assert len(compact) == len(skew_array)
+            assert np.array_equal(compact.to_array(), skew_array)
+            assert np.array_equal(np.concatenate([scores for _, scores in compact.iter_blocks(3)]), skew_array)
+    assert CompactSkew.from_sequence(genome).nbytes < skew_array.nbytes / 12
+
+# Test for random access and slices
+def test_compact_skew_access(genome):
+    skew_array = calculate_gc_skew(genome)
+    compact = CompactSkew.from_sequence(genome, 16)
+    generator = random.Random(0)
+    for _ in range(200):
+        start, stop = generator.randrange(len(skew_array)), generator.randrange(len(skew_array) + 1)
+        assert compact[start] == skew_array[start]
+        assert np.array_equal(compact[start:stop], skew_array[start:stop])
+        assert np.array_equal(compact[stop:start:-7], skew_array[stop:start:-7])
+    assert compact[-1] == skew_array[-1]
+    with pytest.raises(IndexError):
+        compact[len(skew_array)]
+
+# Test for identical extrema and decimation
+def test_compact_skew_extrema(genome):
+    skew_array = calculate_gc_skew(genome)
+    compact = CompactSkew.from_sequence(genome, 64)
+    for tolerance in (0, 2, 10):
+        assert min_max_skew(compact, tolerance) == min_max_skew(skew_array, tolerance)
+        assert skew_extrema(compact, tolerance, circular=True) == skew_extrema(skew_array, tolerance, circular=True)
+    for bins in (1, 9, 1000, 20000):
+        positions, scores = decimate_skew(compact, bins)
+        expected_positions, expected_scores = decimate_skew(skew_array, bins)
+        assert np.array_equal(positions, expected_positions) and np.array_equal(scores, expected_scores)
+
+# Test for handling invalid input
+def test_compact_skew_invalid():
+    with pytest.raises(ValueError):
+        CompactSkew.from_sequence("")
+    with pytest.raises(ValueError):
+        CompactSkew.from_sequence("ACGT", block_size=6)
+    with pytest.raises(ValueError):
+        CompactSkew.from_array(np.array([0, 2, 1]))
+
+# Test for compact skews in the analyzer
+def test_analyzer_compact_skew(genome, tmp_path):
+    analyzer = OriAnalyzer()
+    analyzer.genome = genome
+    analyzer.calculate_gc_skew()
+    expected = analyzer.min_max_skew(tolerance=3)
+    analyzer.calculate_gc_skew(compact=True)
+    assert isinstance(analyzer.skew_array, CompactSkew)
+    assert analyzer.min_max_skew(tolerance=3) == expected
+    analyzer.plot_skew(show_extrema=True, output_path=str(tmp_path / "skew.png"))
+    assert (tmp_path / "skew.png").stat().st_size > 0
@@ -0,0 +1,69 @@
+import random
+import numpy as np
+import pytest
+from functions.fm_index import FMIndex, fm_pattern_frequency, suffix_array, _symbols
+from functions.neighbourhood import neighbourhood_dictionary
+from functions.pattern_frequency import pattern_frequency
+from ori_analyzer import OriAnalyzer
+
+# Create fixture for instantiating
+@pytest.fixture
+def ori_analyzer():
+    return OriAnalyzer()
+
+# Test for correct suffix array
+def test_suffix_array():
+    generator = random.Random(17)
+    for sequence in ("ACGT", "AAAAAAAA", "".join(generator.choice("ACGTN") for _ in range(200))):
+        text = np.append(_symbols(sequence), 0)
+        expected = sorted(range(len(text)), key=lambda pos: text[pos:].tolist())
+        assert suffix_array(text).tolist() == expected
+
+# Test for mismatch search on both strands
+def test_fm_index_positions():
+    fm_index = FMIndex("CGCCCGAATCCAGAACGCATTCCCATATTTCGGGACCACTGGCCTCCACGGTACGGACGTCAATCAAAT")
+    assert fm_index.positions(["ATTCTGGA"], 3)[0].tolist() == [6, 7, 26, 27]
+    assert fm_index.positions(["GGAT", "TCCA"], 0, reverse_complement=True)[0].tolist() == [7]
+    with pytest.raises(ValueError):
+        fm_index.positions(["ACG", "AC"])
+
+# Test for identical frequencies to the neighbourhood backend
+@pytest.mark.parametrize("k_mer_length,distance,reverse_complement", [(3, 0, False), (4, 1, True), (5, 2, True)])
+def test_fm_pattern_frequency(k_mer_length, distance, reverse_complement):
+    generator = random.Random(k_mer_length)
+    sequence = "".join(generator.choice("ACGT") for _ in range(400))
+    seq_range = (37, 260)
+    k_mers = sorted({sequence[pos:pos + k_mer_length] for pos in range(37, 262 - k_mer_length)})
+    expected = pattern_frequency(sequence, seq_range, neighbourhood_dictionary(k_mers, distance, reverse_complement))
+    result = fm_pattern_frequency(sequence, seq_range, k_mers, distance, reverse_complement)
+    assert list(result.items()) == list(expected.items())
+
+# Test for identical results of both backends and the automatic choice
+def test_frequent_patterns_backends(ori_analyzer, monkeypatch):
+    generator = random.Random(3)
+    ori_analyzer.genome = "".join(generator.choice("ACGT") for _ in range(600))
+    results = [ori_analyzer.frequent_patterns((50, 550), 8, 2, True, backend=backend)
+               for backend in ("neighbourhood", "fm_index", "auto")]
+    assert results[0] == results[1] == results[2]
+
+    calls = []
+    monkeypatch.setattr("ori_analyzer.fm_pattern_freq_func", lambda **kwargs: calls.append(kwargs) or {})
+    ori_analyzer.frequent_patterns((50, 550), 8, 1, False)
+    assert calls == []
+    ori_analyzer.frequent_patterns((50, 550), 8, 3, True)
+    assert len(calls) == 1
+    with pytest.raises(ValueError):
+        ori_analyzer.frequent_patterns((50, 550), 8, 1, backend="suffix_tree")
+
+# Test for rejecting ranges with other symbols than A, C, G and T in the FM-index and frequency array backends
+def test_frequent_patterns_backends_ambiguous(ori_analyzer):
+    generator = random.Random(5)
+    ori_analyzer.genome = "".join(generator.choice("ACGT") for _ in range(300)) + "N" + \
+        "".join(generator.choice("ACGT") for _ in range(299))
+    for backend in ("fm_index", "frequency_array"):
+        with pytest.raises(ValueError):
+            ori_analyzer.frequent_patterns((250, 350), 6, 1, True, backend=backend)
+        assert ori_analyzer.frequent_patterns((0, 250), 6, 1, True, backend=backend) == \
+            ori_analyzer.frequent_patterns((0, 250), 6, 1, True, backend="neighbourhood")
+    assert ori_analyzer.frequent_patterns((250, 350), 6, 1, True) == \
+        ori_analyzer.frequent_patterns((250, 350), 6, 1, True, backend="neighbourhood")
@@ -0,0 +1,71 @@
+import random
+import numpy as np
+import pytest
+from functions.frequency_array import dict_to_frequency_array, frequency_array, frequency_array_to_dict, neighbourhood_frequency_array
+from functions.generate_k_mers import generate_k_mers
+from functions.neighbourhood import neighbourhood_dictionary
+from functions.pattern_frequency import most_frequent_patterns, pattern_frequency
+from ori_analyzer import OriAnalyzer
+
+# Create fixture for instantiating
+@pytest.fixture
+def ori_analyzer():
+    return OriAnalyzer()
+
+# Test for correct k-mer counts
+def test_frequency_array():
+    counts = frequency_array("ACGTNACGTA", 2)
+    assert counts.dtype == np.int64 and len(counts) == 16
+    assert frequency_array_to_dict(counts, 2) == {"AC": 2, "CG": 2, "GT": 2, "TA": 1}
+    assert frequency_array("ACGTNACGTA", 2, (5, 9))[[1, 6, 11, 12]].tolist() == [1, 1, 1, 1]
+
+# Test for identical frequencies to pattern_frequency with dense and sparse expansion
+@pytest.mark.parametrize("k_mer_length,distance,reverse_complement", [(2, 1, True), (4, 1, True), (5, 2, False),
+                                                                        (6, 2, True)])
+def test_neighbourhood_frequency_array(k_mer_length, distance, reverse_complement):
+    generator = random.Random(k_mer_length)
+    sequence = "".join(generator.choice("ACGT") for _ in range(500))
+    k_mers = generate_k_mers(sequence, k_mer_length, (20, 480))
+    expected = pattern_frequency(sequence, (20, 480), neighbourhood_dictionary(k_mers, distance, reverse_complement))
+
+    counts = frequency_array(sequence, k_mer_length, (20, 480))
+    frequencies = neighbourhood_frequency_array(counts, k_mer_length, distance, reverse_complement)
+    assert frequency_array_to_dict(frequencies, k_mer_length, counts > 0) == expected
+    assert np.array_equal(dict_to_frequency_array(expected, k_mer_length), np.where(counts > 0, frequencies, 0))
+    candidate_frequencies = neighbourhood_frequency_array(counts, k_mer_length, distance, reverse_complement,
+                                                          candidates=counts > 0)
+    assert np.array_equal(candidate_frequencies, np.where(counts > 0, frequencies, 0))
+
+# Test for identical frequencies when processing the neighbours in small chunks
+def test_neighbourhood_frequency_array_chunks(monkeypatch):
+    generator = random.Random(12)
+    counts = frequency_array("".join(generator.choice("ACGT") for _ in range(3000)), 5)
+    expected = [neighbourhood_frequency_array(counts, 5, 2, True, candidates=candidates)
+                for candidates in (None, counts > 0)]
+    monkeypatch.setattr("functions.frequency_array.NEIGHBOUR_CHUNK_SIZE", 7)
+    for candidates, frequencies in zip((None, counts > 0), expected):
+        assert np.array_equal(neighbourhood_frequency_array(counts, 5, 2, True, candidates=candidates), frequencies)
+
+# Test for identical most frequent patterns in the analyzer
+def test_most_frequent_array(ori_analyzer):
+    generator = random.Random(18)
+    ori_analyzer.genome = "".join(generator.choice("ACGT") for _ in range(800))
+    counts, frequencies = ori_analyzer.frequency_array(6, 1, True, (100, 700))
+    max_count, patterns = most_frequent_patterns(ori_analyzer.frequent_patterns((100, 700), 6, 1, True))
+    assert ori_analyzer.most_frequent_array(frequencies, 6, counts > 0) == (max_count, sorted(patterns))
+    assert ori_analyzer.frequent_patterns((100, 700), 6, 1, True, backend="frequency_array") == \
+        ori_analyzer.frequent_patterns((100, 700), 6, 1, True, backend="neighbourhood")
+
+# Test for rejecting frequency arrays far larger than the neighbourhoods of the range
+def test_frequent_patterns_frequency_array_sparse(ori_analyzer):
+    generator = random.Random(19)
+    ori_analyzer.genome = "".join(generator.choice("ACGT") for _ in range(800))
+    with pytest.raises(ValueError):
+        ori_analyzer.frequent_patterns((100, 600), 12, 1, True, backend="frequency_array")
+
+# Test for handling invalid k-mer lengths
+def test_frequency_array_invalid():
+    with pytest.raises(ValueError):
+        frequency_array("ACGT" * 10, 13)
+    with pytest.raises(ValueError):
+        neighbourhood_frequency_array(np.zeros(15, dtype=np.int64), 2, 1)
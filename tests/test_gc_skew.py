@@ -1,4 +1,6 @@
+import numpy as np
 import pytest
+from functions import gc_skew
 from ori_analyzer import OriAnalyzer
 
 # Create fixture for instantiating
@@ -10,7 +12,8 @@ def ori_analyzer():
 def test_gc_skew_correct(ori_analyzer):
     ori_analyzer.genome = "AAAAATTTTTGGGGGCCCCC"
     ori_analyzer.calculate_gc_skew()
-    assert ori_analyzer.skew_array == 11 * [0] + [1, 2, 3, 4, 5] + [4, 3, 2, 1, 0]
+    assert ori_analyzer.skew_array.dtype == np.int32
+    assert ori_analyzer.skew_array.tolist() == 11 * [0] + [1, 2, 3, 4, 5] + [4, 3, 2, 1, 0]
 
 # Test for handling empty sequence
 def test_gc_skew_empty_sequence(ori_analyzer):
@@ -28,7 +31,7 @@ def test_gc_skew_no_sequence(ori_analyzer):
 def test_gc_skew_no_purines(ori_analyzer):
     ori_analyzer.genome = "ATATATATATATATAT"
     ori_analyzer.calculate_gc_skew()
-    assert ori_analyzer.skew_array == len(ori_analyzer.genome) * [0] + [0]
+    assert ori_analyzer.skew_array.tolist() == len(ori_analyzer.genome) * [0] + [0]
 
 # Test for no skew array
 def test_plot_skew_no_array(ori_analyzer):
@@ -57,6 +60,13 @@ def test_min_max_skew_known_array(ori_analyzer):
     expected_max_positions = [1, 3, 5]
     assert ori_analyzer.min_max_skew() == (expected_min_positions, expected_max_positions)
 
+# Test for min max skew on NumPy array
+def test_min_max_skew_numpy_array(ori_analyzer):
+    ori_analyzer.skew_array = np.array([0, 1, 0, 1, 0, 1, 0], dtype=np.int32)
+    expected_min_positions = [0, 2, 4, 6]
+    expected_max_positions = [1, 3, 5]
+    assert ori_analyzer.min_max_skew() == (expected_min_positions, expected_max_positions)
+
 # Test for single element
 def test_min_max_skew_single_element(ori_analyzer):
     ori_analyzer.skew_array = [0]
@@ -81,4 +91,83 @@ def test_min_max_skew_no_array(ori_analyzer):
 def test_min_max_skew_empty_array(ori_analyzer):
     ori_analyzer.skew_array = []
     with pytest.raises(ValueError):
-        ori_analyzer.plot_skew()
\ No newline at end of file
+        ori_analyzer.plot_skew()
+
+# Test for decimation keeping turning points
+def test_decimate_skew():
+    skew_array = np.concatenate((np.arange(0, -500, -1), np.arange(-500, 300), np.arange(300, 0, -1))).astype(np.int32)
+    positions, scores = gc_skew.decimate_skew(skew_array, bins=50)
+    assert len(scores) <= 100
+    assert scores.min() == skew_array.min() and scores.max() == skew_array.max()
+    assert positions[scores.argmin()] == 500 and positions[scores.argmax()] == 1300
+    assert np.all(np.diff(positions) >= 0)
+
+# Test for headless output with extrema overlay
+@pytest.mark.parametrize("suffix", ["png", "svg"])
+def test_plot_skew_output_file(ori_analyzer, tmp_path, suffix):
+    ori_analyzer.genome = "GGGGCCCCCCCCGGGGATAT" * 50
+    ori_analyzer.calculate_gc_skew()
+    output_path = tmp_path / f"skew.{suffix}"
+    ori_analyzer.plot_skew(bins=20, show_extrema=True, output_path=output_path)
+    assert output_path.stat().st_size > 0
+
+# Test for tolerance bands in single-pass min max skew
+def test_min_max_skew_tolerance(ori_analyzer):
+    ori_analyzer.skew_array = np.array([0, -1, -2, -1, 0, 1, 2, 1, -2], dtype=np.int32)
+    assert ori_analyzer.min_max_skew(tolerance=1) == ([1, 2, 3, 8], [5, 6, 7])
+
+# Test for identical results across block boundaries
+def test_min_max_skew_blocks(monkeypatch):
+    skew_array = np.cumsum(np.random.default_rng(1).integers(-1, 2, size=5000)).astype(np.int32)
+    expected = gc_skew.min_max_skew(skew_array, tolerance=2)
+    monkeypatch.setattr(gc_skew, "EXTREMA_BLOCK_SIZE", 7)
+    assert gc_skew.min_max_skew(skew_array, tolerance=2) == expected
+    assert gc_skew.min_max_skew(skew_array.tolist(), tolerance=2) == expected
+
+# Test for extrema intervals wrapping around the origin
+def test_skew_extrema_circular(ori_analyzer):
+    ori_analyzer.skew_array = [-2, -2, -1, 0, 1, 0, -1, -2]
+    assert ori_analyzer.skew_extrema(tolerance=0, circular=False) == ([(0, 1), (7, 7)], [(4, 4)])
+    assert ori_analyzer.skew_extrema(tolerance=1) == ([(6, 2)], [(3, 5)])
+
+# Test for the last score of a circular skew, which describes the origin like the first one
+def test_skew_extrema_circular_origin(ori_analyzer):
+    ori_analyzer.genome = "GGCC"
+    ori_analyzer.calculate_gc_skew()
+    assert ori_analyzer.skew_extrema(circular=False) == ([(0, 0), (4, 4)], [(2, 2)])
+    assert ori_analyzer.skew_extrema() == ([(0, 0)], [(2, 2)])
+    assert ori_analyzer.skew_extrema(tolerance=1) == ([(3, 1)], [(1, 3)])
+    ori_analyzer.genome = "AGCC"
+    ori_analyzer.calculate_gc_skew()
+    assert ori_analyzer.skew_extrema() == ([(0, 0)], [(2, 2)])
+
+# Test for windowed GC skew and GC content against a direct calculation
+def test_windowed_gc_skew(ori_analyzer):
+    ori_analyzer.genome = "GGGCAAAACCCCNNGCGT"
+    starts, skew, content = ori_analyzer.windowed_gc_skew(window=4, step=3)
+    assert starts.tolist() == [0, 3, 6, 9, 12]
+    for start, window_skew, window_content in zip(starts, skew, content):
+        window = ori_analyzer.genome[start:start + 4]
+        g, c = window.count("G"), window.count("C")
+        assert window_skew == pytest.approx((g - c) / (g + c) if g + c > 0 else 0)
+        assert window_content == pytest.approx((g + c) / 4)
+    assert gc_skew.windowed_gc_skew(ori_analyzer.genome, 6)[0].tolist() == [0, 6, 12]
+
+# Test for reusing the cumulative counts across window settings
+def test_windowed_gc_skew_cache(ori_analyzer, monkeypatch):
+    ori_analyzer.genome = "GGGCAAAACCCCGGGG"
+    first = ori_analyzer.windowed_gc_skew(window=4)
+    calls = []
+    monkeypatch.setattr("ori_analyzer.gc_counts_func", lambda sequence: calls.append(sequence))
+    assert ori_analyzer.windowed_gc_skew(window=4) is first
+    assert ori_analyzer.windowed_gc_skew(window=4, step=4) is first
+    assert ori_analyzer.windowed_gc_skew(window=8, step=2)[1].tolist() == pytest.approx([0.5, -0.5, -1, -1 / 3, 0])
+    assert calls == []
+
+# Test for handling invalid windows
+def test_windowed_gc_skew_invalid(ori_analyzer):
+    ori_analyzer.genome = "GGGC"
+    with pytest.raises(ValueError):
+        ori_analyzer.windowed_gc_skew(window=5)
+    with pytest.raises(ValueError):
+        ori_analyzer.windowed_gc_skew(window=2, step=0)
@@ -0,0 +1,31 @@
+import json
+import os
+import subprocess
+import sys
+import pytest
+
+# Import time budget in seconds, can be raised on slow machines
+IMPORT_BUDGET_SECONDS = float(os.environ.get("ORI_IMPORT_BUDGET_SECONDS", "1.0"))
+# Modules that must not be loaded by headless imports
+PLOTTING_MODULES = ("matplotlib", "seaborn", "functions.plotting")
+
+# Measure the import of a module in a fresh interpreter, best of three runs
+def measure_import(module):
+    script = ("import json, sys, time\n"
+              "start = time.perf_counter()\n"
+              f"import {module}\n"
+              "print(json.dumps({'seconds': time.perf_counter() - start, 'modules': sorted(sys.modules)}))")
+    measurements = []
+    for _ in range(3):
+        completed = subprocess.run([sys.executable, "-c", script], capture_output=True, text=True, check=True,
+                                   cwd=os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+        measurements.append(json.loads(completed.stdout))
+    return min(measurements, key=lambda measurement: measurement["seconds"])
+
+# Test for import time budget and lazy plotting imports
+@pytest.mark.parametrize("module", ["ori_analyzer", "ori_pipeline"])
+def test_import_time_budget(module):
+    measurement = measure_import(module)
+    assert not [name for name in measurement["modules"] if name.split(".")[0] in PLOTTING_MODULES
+                or name in PLOTTING_MODULES]
+    assert measurement["seconds"] < IMPORT_BUDGET_SECONDS
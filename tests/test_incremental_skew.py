@@ -0,0 +1,106 @@
+import random
+import numpy as np
+import pytest
+from functions.gc_skew import calculate_gc_skew, min_max_skew, windowed_gc_skew
+from functions.incremental_skew import IncrementalSkew
+from functions.packed_sequence import PackedSequence
+from ori_analyzer import OriAnalyzer
+
+# Create fixture for instantiating
+@pytest.fixture
+def ori_analyzer():
+    return OriAnalyzer()
+
+# Test for identical skew after random edits with small blocks
+def test_incremental_skew_random_edits():
+    generator = random.Random(12)
+    sequence = "".join(generator.choice("ACGTN") for _ in range(500))
+    skew = IncrementalSkew(sequence, block_size=16)
+    for _ in range(50):
+        edit = "".join(generator.choice("ACGT") for _ in range(generator.randint(1, 40)))
+        operation = generator.choice(("substitute", "insert", "append"))
+        if operation == "substitute":
+            position = generator.randint(0, len(sequence) - len(edit))
+            skew.substitute(position, edit)
+            sequence = sequence[:position] + edit + sequence[position + len(edit):]
+        elif operation == "insert":
+            position = generator.randint(0, len(sequence))
+            skew.insert(position, edit)
+            sequence = sequence[:position] + edit + sequence[position:]
+        else:
+            skew.append(edit)
+            sequence += edit
+        expected = calculate_gc_skew(sequence)
+        assert len(skew) == len(expected)
+        assert skew.to_array().tolist() == expected.tolist()
+        assert skew.min_max() == min_max_skew(expected)
+    assert skew[-1] == expected[-1]
+    assert skew[0] == 0
+
+# Test for handling invalid edits
+def test_incremental_skew_invalid_edits():
+    skew = IncrementalSkew("GGCC", block_size=2)
+    with pytest.raises(ValueError):
+        skew.substitute(3, "GG")
+    with pytest.raises(ValueError):
+        skew.insert(5, "G")
+    with pytest.raises(ValueError):
+        IncrementalSkew("")
+    with pytest.raises(ValueError):
+        IncrementalSkew("GGCC", block_size=0)
+
+# Test for edits of the analyzed genome
+def test_edit_sequence(ori_analyzer):
+    ori_analyzer.genome = "AAAAATTTTTGGGGGCCCCC"
+    ori_analyzer.calculate_gc_skew()
+    ori_analyzer.substitute_sequence(0, "cc")
+    ori_analyzer.insert_sequence(10, "GGG")
+    ori_analyzer.append_sequence("CG")
+    assert ori_analyzer.genome == "CCAAATTTTTGGGGGGGGCCCCCCG"
+    assert ori_analyzer.skew_array.tolist() == calculate_gc_skew(ori_analyzer.genome).tolist()
+    assert ori_analyzer.min_max_skew() == ([2, 3, 4, 5, 6, 7, 8, 9, 10], [18])
+
+# Test for edits of a packed genome
+def test_edit_packed_sequence(ori_analyzer):
+    ori_analyzer.genome = PackedSequence.from_string("GGGNCCC")
+    ori_analyzer.calculate_gc_skew(incremental=True)
+    ori_analyzer.substitute_sequence(3, "G")
+    assert isinstance(ori_analyzer.genome, PackedSequence)
+    assert str(ori_analyzer.genome) == "GGGGCCC"
+    assert ori_analyzer.skew_array.tolist() == [0, 1, 2, 3, 4, 3, 2, 1]
+
+# Test for repeated edits of a packed genome without changing the read sequence
+def test_edit_packed_sequence_repeated(ori_analyzer):
+    generator = random.Random(8)
+    sequence = "".join(generator.choice("ACGTN") for _ in range(300))
+    packed = PackedSequence.from_string(sequence)
+    ori_analyzer.genome = packed
+    original = sequence
+    for _ in range(30):
+        edit = "".join(generator.choice("ACGT") for _ in range(generator.randint(1, 5)))
+        if generator.random() < 0.5:
+            position = generator.randint(0, len(sequence) - len(edit))
+            ori_analyzer.substitute_sequence(position, edit)
+            sequence = sequence[:position] + edit + sequence[position + len(edit):]
+        else:
+            position = generator.randint(0, len(sequence))
+            ori_analyzer.insert_sequence(position, edit)
+            sequence = sequence[:position] + edit + sequence[position:]
+        assert str(ori_analyzer.genome) == sequence
+        assert ori_analyzer.windowed_gc_skew(window=50)[1].tolist() == windowed_gc_skew(sequence, 50)[1].tolist()
+    assert ori_analyzer.skew_array.tolist() == calculate_gc_skew(sequence).tolist()
+    assert str(packed) == original
+
+# Test for genomes held across edits, which must not change
+def test_edit_held_genome(ori_analyzer):
+    for genome in ("AAGTNACGTR", PackedSequence.from_string("AAGTNACGTR")):
+        ori_analyzer.genome = genome
+        ori_analyzer.substitute_sequence(1, "G")
+        held = ori_analyzer.genome
+        ori_analyzer.insert_sequence(0, "C")
+        ori_analyzer.substitute_sequence(2, "N")
+        assert held == "AGGTNACGTR" and len(held) == 10
+        assert ori_analyzer.genome == "CANGTNACGTR"
+        assert isinstance(ori_analyzer.genome, type(genome))
+        assert genome == "AAGTNACGTR"
+        assert ori_analyzer.skew_array.tolist() == calculate_gc_skew(str(ori_analyzer.genome)).tolist()
@@ -0,0 +1,98 @@
+import json
+import random
+import tracemalloc
+import numpy as np
+import pytest
+from functions.instrumentation import Instrumentation, InstrumentationReport, StageMetrics
+from functions.neighbourhood_cache import NeighbourhoodCache
+from ori_analyzer import OriAnalyzer
+
+# Create fixture for a random genome
+@pytest.fixture
+def genome():
+    generator = random.Random(21)
+    return "".join(generator.choice("ACGT") for _ in range(5000))
+
+# Test for stages and item counts of an instrumented analysis
+def test_instrumented_analyze(genome):
+    stages = []
+    analyzer = OriAnalyzer(neighbourhood_cache=NeighbourhoodCache(), instrumentation=Instrumentation(callback=stages.append))
+    analyzer.genome = genome
+    result = analyzer.analyze(k_mer_length=9, distance=1, window=500, reverse_complement=True)
+
+    # Nested stages finish before the enclosing analysis
+    names = [stage.name for stage in stages]
+    assert names[-1] == "analyze"
+    assert {"calculate_gc_skew", "min_max_skew", "generate_k_mers", "neighbourhood_dictionary",
+            "pattern_frequency", "frequent_patterns"} <= set(names)
+    assert all(stage.wall_seconds >= 0 and stage.cpu_seconds >= 0 for stage in stages)
+
+    summary = analyzer.instrumentation.report().summary()
+    start, stop = result["seq_range"]
+    assert summary["calculate_gc_skew"]["counts"] == {"bases": 5000}
+    assert summary["generate_k_mers"]["counts"]["windows"] == stop - start - 7
+    neighbourhood = summary["neighbourhood_dictionary"]["counts"]
+    assert neighbourhood["cache_misses"] == neighbourhood["k_mers"] and neighbourhood["cache_hits"] == 0
+    assert neighbourhood["neighbours"] >= 28 * neighbourhood["k_mers"]
+    assert summary["pattern_frequency"]["counts"]["windows"] == stop - start - 7
+    assert summary["analyze"]["peak_memory_bytes"] >= summary["neighbourhood_dictionary"]["peak_memory_bytes"] > 0
+
+    # Repeated neighbourhoods are served from the cache
+    analyzer.analyze(k_mer_length=9, distance=1, window=500, reverse_complement=True)
+    neighbourhood = analyzer.instrumentation.report().summary()["neighbourhood_dictionary"]
+    assert neighbourhood["calls"] == 2 and neighbourhood["counts"]["cache_hits"] == neighbourhood["counts"]["k_mers"] // 2
+
+# Test for identical results with and without instrumentation
+def test_instrumentation_results(genome):
+    analyzer = OriAnalyzer()
+    analyzer.genome = genome
+    instrumented = OriAnalyzer(instrumentation=Instrumentation(trace_memory=False))
+    instrumented.genome = genome
+    assert instrumented.analyze() == analyzer.analyze()
+    assert instrumented.find_clumps(5, 100, 3) == analyzer.find_clumps(5, 100, 3)
+    matches = instrumented.approximate_match(["ACGTACGTA"])
+    assert np.array_equal(matches["ACGTACGTA"], analyzer.approximate_match(["ACGTACGTA"])["ACGTACGTA"])
+    assert all(stage.peak_memory_bytes == 0 for stage in instrumented.instrumentation.stages)
+    assert instrumented.instrumentation.report().summary()["approximate_match"]["counts"]["matches"] == len(matches["ACGTACGTA"])
+
+# Test for recording stages that raise errors
+def test_instrumentation_error():
+    analyzer = OriAnalyzer(instrumentation=Instrumentation())
+    analyzer.genome = "ACGT" * 10
+    with pytest.raises(ValueError):
+        analyzer.generate_k_mers(3, (5, 1))
+    assert [stage.name for stage in analyzer.instrumentation.stages] == ["generate_k_mers"]
+    assert analyzer.instrumentation._frames == []
+
+# Test for nested peak memory
+def test_instrumentation_nested_peak():
+    instrumentation = Instrumentation()
+    instrumentation.start_stage("outer")
+    data = np.ones(10**6, dtype=np.uint8)
+    del data
+    instrumentation.start_stage("inner")
+    instrumentation.count(items=3)
+    instrumentation.count(items=2)
+    inner = instrumentation.finish_stage()
+    outer = instrumentation.finish_stage()
+    assert not tracemalloc.is_tracing()
+    assert inner.counts == {"items": 5} and outer.counts == {}
+    assert inner.peak_memory_bytes < 10**6 <= outer.peak_memory_bytes
+
+# Test for JSON and Prometheus exports
+def test_instrumentation_export(tmp_path):
+    report = InstrumentationReport([StageMetrics("pattern_frequency", 1.5, 1.25, 2048, {"windows": 10}),
+                                    StageMetrics("pattern_frequency", 0.5, 0.25, 1024, {"windows": 5})])
+    report.write_json(tmp_path / "report.json")
+    document = json.loads((tmp_path / "report.json").read_text())
+    assert len(document["stages"]) == 2
+    assert document["summary"]["pattern_frequency"] == {"calls": 2, "wall_seconds": 2.0, "cpu_seconds": 1.5,
+                                                        "peak_memory_bytes": 2048, "counts": {"windows": 15}}
+
+    report.write_prometheus(tmp_path / "report.prom")
+    lines = (tmp_path / "report.prom").read_text().splitlines()
+    assert 'ori_stage_calls_total{stage="pattern_frequency"} 2' in lines
+    assert 'ori_stage_wall_seconds_total{stage="pattern_frequency"} 2.0' in lines
+    assert 'ori_stage_peak_memory_bytes{stage="pattern_frequency"} 2048' in lines
+    assert 'ori_stage_items_total{stage="pattern_frequency",item="windows"} 15' in lines
+    assert "# TYPE ori_stage_peak_memory_bytes gauge" in lines
@@ -0,0 +1,79 @@
+import random
+import numpy as np
+import pytest
+from functions.k_mer_index import FILE_MAGIC, KMerIndex
+from functions.neighbourhood import neighbourhood_dictionary
+from functions.pattern_frequency import pattern_frequency
+from ori_analyzer import OriAnalyzer
+
+# Create fixture for a random genome with masked symbols
+@pytest.fixture
+def genome():
+    generator = random.Random(16)
+    return "".join(generator.choice("ACGT" * 20 + "N") for _ in range(3000))
+
+# Test for correct positions and counts
+def test_k_mer_index(genome):
+    k_mer_index = KMerIndex.build(genome, 4)
+    expected = [pos for pos in range(len(genome) - 3) if genome[pos:pos + 4] == "ACGT"]
+    assert k_mer_index.k_mer_positions("ACGT").tolist() == expected
+    counts, first = k_mer_index.count(np.array([27, 255]), 100, 2000)
+    for code, count, first_position in zip(("ACGT", "TTTT"), counts, first):
+        hits = [pos for pos in range(100, 2001) if genome[pos:pos + 4] == code]
+        assert count == len(hits)
+        assert first_position == (hits[0] if hits else -1)
+
+# Test for identical index after saving and memory-mapping
+def test_k_mer_index_save_load(genome, tmp_path):
+    k_mer_index = KMerIndex.build(genome[1:], 5)
+    k_mer_index.save(tmp_path / "genome.kmi")
+    loaded = KMerIndex.load(tmp_path / "genome.kmi")
+    assert isinstance(loaded.positions, np.memmap)
+    assert str(loaded.sequence) == genome[1:]
+    assert loaded.digest == k_mer_index.digest
+    for name in ("codes", "offsets", "positions"):
+        assert np.array_equal(getattr(loaded, name), getattr(k_mer_index, name))
+
+# Test for rejecting other files
+def test_k_mer_index_invalid_file(tmp_path):
+    with pytest.raises(FileNotFoundError):
+        KMerIndex.load(tmp_path / "missing.kmi")
+    (tmp_path / "genome.txt").write_bytes(b"ACGT" * 100)
+    with pytest.raises(ValueError):
+        KMerIndex.load(tmp_path / "genome.txt")
+    KMerIndex.build("ACGTACGT", 3).save(tmp_path / "genome.kmi")
+    data = bytearray((tmp_path / "genome.kmi").read_bytes())
+    data[len(FILE_MAGIC)] = 99
+    (tmp_path / "genome.kmi").write_bytes(bytes(data[:-4]))
+    with pytest.raises(ValueError):
+        KMerIndex.load(tmp_path / "genome.kmi")
+
+# Test for identical frequencies from the index and from scanning the range
+def test_pattern_frequency_from_index(genome):
+    k_mer_index = KMerIndex.build(genome, 6)
+    for start, stop in ((0, 2999), (150, 800), (1000, 1010)):
+        neighbourhood_dict = neighbourhood_dictionary(sorted({genome[pos:pos + 6] for pos in range(start, stop - 4)
+                                                              if "N" not in genome[pos:pos + 6]}), 1, True)
+        expected = pattern_frequency(genome, (start, stop), neighbourhood_dict)
+        result = pattern_frequency(genome, (start, stop), neighbourhood_dict, k_mer_index=k_mer_index)
+        assert list(result.items()) == list(expected.items())
+
+# Test for analyses from a saved index without the genome file
+def test_analyzer_k_mer_index(genome, tmp_path):
+    analyzer = OriAnalyzer()
+    analyzer.genome = genome
+    expected = analyzer.analyze(k_mer_length=9, window=500, reverse_complement=False)
+    analyzer.build_k_mer_index(9, tmp_path / "genome.kmi")
+
+    reloaded = OriAnalyzer()
+    reloaded.load_k_mer_index(tmp_path / "genome.kmi")
+    assert str(reloaded.genome) == genome
+    assert reloaded.analyze(k_mer_length=9, window=500, reverse_complement=False) == expected
+    assert reloaded.approximate_match(["ACGTACGTA"])["ACGTACGTA"].tolist() == \
+        analyzer.approximate_match(["ACGTACGTA"])["ACGTACGTA"].tolist()
+
+    # Indices of other genomes are rejected
+    other = OriAnalyzer()
+    other.genome = genome[::-1]
+    with pytest.raises(ValueError):
+        other.load_k_mer_index(tmp_path / "genome.kmi")
@@ -1,4 +1,6 @@
 import pytest
+from functions.encoding import encode_k_mer
+from functions.neighbourhood import d_neighbourhood_codes, generate_d_neighbourhood, iter_d_neighbourhood_codes
 from ori_analyzer import OriAnalyzer
 
 # Create fixture for instantiating
@@ -14,4 +16,28 @@ def test_neighbourhood_dictionary(ori_analyzer):
         "ATG": sorted(["ATG", "TTG", "CTG", "GTG", "AAG", "ACG", "AGG", "ATA", "ATC", "ATT"]),
         "ATG": sorted(["ATG", "TTG", "CTG", "GTG", "AAG", "ACG", "AGG", "ATA", "ATC", "ATT"])
         }
-    assert ori_analyzer.neighbourhood_dictionary(k_mers, distance) == expected_neighbourhood_dict
\ No newline at end of file
+    assert ori_analyzer.neighbourhood_dictionary(k_mers, distance) == expected_neighbourhood_dict
+
+# Test for size and uniqueness of larger neighbourhoods
+def test_d_neighbourhood_size():
+    neighbourhood = generate_d_neighbourhood(sequence="ACGTACGTA", distance=2)
+    # 1 + 9 * 3 + 36 * 9 neighbours
+    assert len(neighbourhood) == 352
+    assert len(set(neighbourhood)) == 352
+    assert neighbourhood == sorted(neighbourhood)
+
+# Test for identical streaming and bulk enumeration
+def test_d_neighbourhood_codes_streaming_and_bulk():
+    code = encode_k_mer("GATTACA")
+    streamed = list(iter_d_neighbourhood_codes(code, 7, 3))
+    assert len(streamed) == len(set(streamed))
+    assert sorted(streamed) == d_neighbourhood_codes(code, 7, 3).tolist()
+
+# Test for sequences with symbols other than A, C, G and T
+def test_d_neighbourhood_non_nucleotide_symbols():
+    assert generate_d_neighbourhood(sequence="AN", distance=1) == sorted(["AN", "CN", "GN", "TN", "AA", "AC", "AG", "AT"])
+
+# Test for neighbourhoods including reverse complements
+def test_neighbourhood_dictionary_reverse_complement(ori_analyzer):
+    neighbourhood = ori_analyzer.neighbourhood_dictionary(["AAC"], distance=0, reverse_complement=True)
+    assert neighbourhood == {"AAC": ["AAC", "GTT"]}
@@ -0,0 +1,49 @@
+import pytest
+from functions.encoding import encode_k_mer
+from functions.neighbourhood_cache import NeighbourhoodCache, get_default_cache
+from ori_analyzer import OriAnalyzer
+
+# Create fixture for instantiating with a private cache
+@pytest.fixture
+def ori_analyzer():
+    return OriAnalyzer(neighbourhood_cache=NeighbourhoodCache())
+
+# Test for hits on repeated neighbourhoods
+def test_neighbourhood_cache_hits(ori_analyzer):
+    first = ori_analyzer.neighbourhood_dictionary(["ACGTA", "TTGCA"], distance=2, reverse_complement=True)
+    second = ori_analyzer.neighbourhood_dictionary(["TTGCA"], distance=2, reverse_complement=True)
+    assert second["TTGCA"] == first["TTGCA"]
+    stats = ori_analyzer.neighbourhood_cache.stats()
+    assert (stats["hits"], stats["misses"], stats["entries"]) == (1, 2, 2)
+
+# Test for identical neighbourhoods with and without cache
+def test_neighbourhood_cache_identical_results(ori_analyzer):
+    k_mers = ["ACGTA", "TTGCA", "ACGTA"]
+    cached = ori_analyzer.neighbourhood_dictionary(k_mers, distance=1, reverse_complement=True)
+    uncached = OriAnalyzer(neighbourhood_cache=NeighbourhoodCache(max_bytes=0)).neighbourhood_dictionary(
+        k_mers, distance=1, reverse_complement=True)
+    assert cached == uncached
+
+# Test for LRU eviction beyond the memory limit
+def test_neighbourhood_cache_eviction():
+    cache = NeighbourhoodCache(max_bytes=700)
+    analyzer = OriAnalyzer(neighbourhood_cache=cache)
+    analyzer.neighbourhood_dictionary(["AAAAA", "CCCCC", "GGGGG", "TTTTT"], distance=1)
+    assert cache.nbytes <= 700
+    assert cache.evictions > 0
+    assert cache.get((encode_k_mer("AAAAA"), 5, 1, False)) is None
+    assert cache.get((encode_k_mer("TTTTT"), 5, 1, False)) is not None
+
+# Test for cache shared by all instances
+def test_neighbourhood_cache_shared_default():
+    default_cache = get_default_cache()
+    misses = default_cache.misses
+    OriAnalyzer().neighbourhood_dictionary(["GATTACA"], distance=1)
+    OriAnalyzer().neighbourhood_dictionary(["GATTACA"], distance=1)
+    assert default_cache.misses <= misses + 1
+    assert default_cache.get((encode_k_mer("GATTACA"), 7, 1, False)) is not None
+
+# Test for invalid memory limit
+def test_neighbourhood_cache_invalid_limit():
+    with pytest.raises(ValueError):
+        NeighbourhoodCache(max_bytes=-1)
@@ -0,0 +1,86 @@
+import random
+import numpy as np
+import pytest
+from functions.packed_sequence import PackedSequence
+from functions.sequence import reverse_complement
+from ori_analyzer import OriAnalyzer
+
+# Create fixture for instantiating
+@pytest.fixture
+def ori_analyzer():
+    return OriAnalyzer()
+
+# Test for lossless packing including masked symbols
+def test_packed_sequence_round_trip():
+    packed = PackedSequence.from_string("ACGTNACGTRYacgt")
+    assert len(packed) == 15
+    assert str(packed) == "ACGTNACGTRYACGT"
+    assert packed == "ACGTNACGTRYACGT"
+    assert packed[4] == "N"
+    assert PackedSequence.from_string("ACGT" * 100).nbytes == 100
+
+# Test for zero-copy slicing
+def test_packed_sequence_slicing():
+    packed = PackedSequence.from_string("AACCGGTTNNAACCGGTT")
+    part = packed[5:11]
+    assert str(part) == "GTTNNA"
+    assert part._data is packed._data
+    assert str(part[2:4]) == "TN"
+
+# Test for in-place edits against edits of the string, keeping copies unchanged
+def test_packed_sequence_edits():
+    generator = random.Random(4)
+    sequence = "".join(generator.choice("ACGTN") for _ in range(37))
+    original = PackedSequence.from_string(sequence)
+    packed = original.copy()
+    for _ in range(200):
+        edit = "".join(generator.choice("ACGTNR") for _ in range(generator.randint(0, 9)))
+        operation = generator.choice(("substitute", "insert", "append"))
+        if operation == "substitute" and len(edit) <= len(sequence):
+            position = generator.randint(0, len(sequence) - len(edit))
+            packed.substitute(position, edit)
+            sequence = sequence[:position] + edit + sequence[position + len(edit):]
+        elif operation == "insert":
+            position = generator.randint(0, len(sequence))
+            packed.insert(position, edit.lower())
+            sequence = sequence[:position] + edit + sequence[position:]
+        else:
+            packed.append(edit)
+            sequence += edit
+        assert len(packed) == len(sequence) and str(packed) == sequence
+    assert str(packed[3:20]) == sequence[3:20]
+    assert packed.codes().tolist() == PackedSequence.from_string(sequence).codes().tolist()
+    assert original == PackedSequence.from_string(str(original))
+    with pytest.raises(ValueError):
+        packed.substitute(len(sequence) - 1, "AC")
+    with pytest.raises(ValueError):
+        packed.insert(len(sequence) + 1, "A")
+
+# Test for k-mer code extraction
+def test_packed_sequence_k_mer_codes():
+    packed = PackedSequence.from_string("ACGTTGCANACG")
+    window_codes, valid = packed.k_mer_codes(3)
+    assert [packed.k_mer_code(pos, 3) for pos in range(6)] == window_codes[:6].tolist()
+    assert packed.k_mer_code(0, 3) == 0b000110
+    assert valid.tolist() == [True] * 6 + [False] * 3 + [True]
+
+# Test for reverse complement of packed sequences
+def test_packed_sequence_reverse_complement():
+    sequence = "AACGTNRTTG"
+    packed = reverse_complement(PackedSequence.from_string(sequence))
+    assert isinstance(packed, PackedSequence)
+    assert str(packed) == "CAAYNACGTT"
+
+# Test for identical analysis results on packed genomes
+def test_packed_genome_analysis(ori_analyzer):
+    sequence = "ATCGATCGGGCATNATCGCCAT"
+    ori_analyzer.genome = sequence
+    ori_analyzer.calculate_gc_skew()
+    expected_skew = ori_analyzer.skew_array.tolist()
+    expected_k_mers = ori_analyzer.generate_k_mers(k_mer_length=3, seq_range=(2, 20))
+
+    ori_analyzer.genome = PackedSequence.from_string(sequence)
+    ori_analyzer.calculate_gc_skew()
+    assert ori_analyzer.skew_array.tolist() == expected_skew
+    assert ori_analyzer.generate_k_mers(k_mer_length=3, seq_range=(2, 20)) == expected_k_mers
+    assert "ATN" in expected_k_mers
@@ -0,0 +1,61 @@
+import random
+import pytest
+from ori_analyzer import OriAnalyzer
+
+# Create fixture for instantiating
+@pytest.fixture
+def ori_analyzer():
+    return OriAnalyzer()
+
+# Naive reference counting every window against every neighbourhood
+def naive_pattern_frequency(sequence, seq_range, neighbourhood_dict):
+    start, stop = seq_range
+    sequence_part = sequence[start:stop + 1]
+    pattern_length = len(next(iter(neighbourhood_dict)))
+    frequency_dict = {}
+    for pos in range(len(sequence_part) - pattern_length + 1):
+        for k_mer, neighbourhood in neighbourhood_dict.items():
+            if sequence_part[pos:pos + pattern_length] in neighbourhood:
+                frequency_dict[k_mer] = frequency_dict.get(k_mer, 0) + 1
+    return frequency_dict
+
+# Test for known frequencies
+def test_pattern_frequency_known_values(ori_analyzer):
+    ori_analyzer.genome = "ACGTTACGTAACGT"
+    neighbourhood = ori_analyzer.neighbourhood_dictionary(k_mers=["ACGT", "TTAC"], distance=0)
+    frequency = ori_analyzer.pattern_frequency(seq_range=(0, 13), neighbourhood_dict=neighbourhood)
+    assert frequency == {"ACGT": 3, "TTAC": 1}
+
+# Test for identical results and order compared to the naive scan
+def test_pattern_frequency_matches_naive_scan(ori_analyzer):
+    ori_analyzer.genome = "ATTGCANNTTGCAGCATTGCATTAGCANGCCATTTGAC"
+    seq_range = (2, 35)
+    k_mers = ori_analyzer.generate_k_mers(k_mer_length=4, seq_range=seq_range)
+    neighbourhood = ori_analyzer.neighbourhood_dictionary(k_mers=k_mers, distance=1)
+    frequency = ori_analyzer.pattern_frequency(seq_range=seq_range, neighbourhood_dict=neighbourhood)
+    expected = naive_pattern_frequency(ori_analyzer.genome, seq_range, neighbourhood)
+    assert list(frequency.items()) == list(expected.items())
+
+# Test for invalid sequence range
+def test_pattern_frequency_invalid_range(ori_analyzer):
+    ori_analyzer.genome = "ACGTACGT"
+    with pytest.raises(ValueError):
+        ori_analyzer.pattern_frequency(seq_range=(5, 2), neighbourhood_dict={"ACG": ["ACG"]})
+
+# Test for most frequent patterns
+def test_most_frequent_patterns(ori_analyzer):
+    assert ori_analyzer.most_frequent_patterns(frequency_dict={"AC": 2, "CG": 3, "GT": 3}) == (3, ["CG", "GT"])
+
+# Test for identical results of the sharded parallel count
+def test_pattern_frequency_parallel(ori_analyzer, monkeypatch):
+    monkeypatch.setattr("functions.pattern_frequency.MIN_SHARD_WINDOWS", 200)
+    generator = random.Random(22)
+    for genome in ("".join(generator.choice("ACGT") for _ in range(6000)),
+                   "".join(generator.choice("ACGT" * 10 + "N") for _ in range(6000))):
+        ori_analyzer.genome = genome
+        for seq_range, distance in (((0, 5999), 1), ((123, 4567), 2)):
+            k_mers = ori_analyzer.generate_k_mers(k_mer_length=6, seq_range=(seq_range[0], seq_range[0] + 300))
+            neighbourhood = ori_analyzer.neighbourhood_dictionary(k_mers=k_mers, distance=distance, reverse_complement=True)
+            expected = ori_analyzer.pattern_frequency(seq_range=seq_range, neighbourhood_dict=neighbourhood)
+            frequency = ori_analyzer.pattern_frequency(seq_range=seq_range, neighbourhood_dict=neighbourhood, processes=3)
+            assert list(frequency.items()) == list(expected.items())
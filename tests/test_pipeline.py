@@ -0,0 +1,63 @@
+import json
+import pytest
+from ori_pipeline import collect_genomes, main
+
+# Create fixture for a directory of genomes
+@pytest.fixture
+def genome_directory(tmp_path):
+    genomes = {"a.fasta": ">a\nAAAAATTTTTGGGGGCCCCCATATGCATGC",
+               "b.txt": "CCCCCGGGGGATATATATATCCGGAATTCC",
+               "c.fna": ">c\nGGCCAATTGGCCAATTACGTACGTTTAA"}
+    for name, content in genomes.items():
+        with open(tmp_path / name, "w") as file:
+            file.write(content)
+    with open(tmp_path / "notes.md", "w") as file:
+        file.write("not a genome")
+    return tmp_path
+
+# Test for collecting directories and glob patterns
+def test_collect_genomes(genome_directory):
+    paths = collect_genomes([str(genome_directory), str(genome_directory / "*.fasta")])
+    assert [path.rsplit("/", 1)[-1] for path in paths] == ["a.fasta", "b.txt", "c.fna"]
+
+# Test for JSON Lines output over a worker pool
+def test_pipeline_jsonl(genome_directory, tmp_path):
+    output_path = tmp_path / "results.jsonl"
+    exit_code = main([str(genome_directory), "-k", "3", "-d", "0", "-w", "12", "-j", "2", "-f", "jsonl",
+                      "-o", str(output_path)])
+    assert exit_code == 0
+    with open(output_path) as file:
+        results = [json.loads(line) for line in file]
+    assert sorted(result["path"].rsplit("/", 1)[-1] for result in results) == ["a.fasta", "b.txt", "c.fna"]
+    assert all(result["seq_range"][1] - result["seq_range"][0] <= 12 for result in results)
+
+# Test for TSV output and reporting of missing genomes
+def test_pipeline_tsv_missing_genome(genome_directory, tmp_path):
+    output_path = tmp_path / "results.tsv"
+    exit_code = main([str(genome_directory / "b.txt"), str(tmp_path / "missing.txt"), "-k", "4", "-j", "1",
+                      "-f", "tsv", "-o", str(output_path)])
+    assert exit_code == 1
+    with open(output_path) as file:
+        rows = [line.rstrip("\n").split("\t") for line in file]
+    assert rows[0][0] == "path" and len(rows) == 3
+    assert rows[1][-1] == "" and rows[2][-1] != ""
+
+# Test for the default text output of a single genome
+def test_pipeline_text(genome_directory, capsys):
+    assert main([str(genome_directory / "a.fasta"), "-k", "3", "--no-reverse-complement"]) == 0
+    lines = capsys.readouterr().out.splitlines()
+    assert lines[0] == "Positions with minimum skew values: [0, 1, 2, 3, 4, 5, 6, 7, 8, 9, 10, 20, 21, 22, 23, 24, 26, 27, 28, 30]"
+    assert lines[2].startswith("The following 3-mers have been found")
+
+# Test for identical output with a result cache shared by runs
+def test_pipeline_result_cache(genome_directory, tmp_path):
+    arguments = [str(genome_directory), "-k", "3", "-d", "1", "-w", "12", "-j", "2", "-f", "jsonl",
+                 "--cache-dir", str(tmp_path / "cache")]
+    assert main(arguments + ["-o", str(tmp_path / "first.jsonl")]) == 0
+    entries = sorted((tmp_path / "cache").iterdir())
+    assert len(entries) > 0
+    assert main(arguments + ["-o", str(tmp_path / "second.jsonl")]) == 0
+    # Results are written in order of completion
+    assert sorted((tmp_path / "first.jsonl").read_text().splitlines()) == \
+        sorted((tmp_path / "second.jsonl").read_text().splitlines())
+    assert sorted((tmp_path / "cache").iterdir()) == entries
@@ -1,5 +1,8 @@
 import pytest
 from pathlib import Path
+from functions.gc_skew import calculate_gc_skew, calculate_gc_skew_chunks
+from functions.packed_sequence import PackedSequence
+from functions.sequence import _iter_sequence_parts, iter_sequence_chunks, read_sequence_buffer
 from ori_analyzer import OriAnalyzer
 
 # Create fixture for instantiating
@@ -8,9 +11,9 @@ def ori_analyzer():
     return OriAnalyzer()
 
 # Test for correct reading of file
-def test_read_sequence_plain(ori_analyzer):
+def test_read_sequence_plain(ori_analyzer, tmp_path):
     # Prepare test file
-    test_path = Path("tests/test_sequence.txt")
+    test_path = tmp_path / "test_sequence.txt"
     with open(test_path, "w") as file:
         file.write("AAAAATTTTTGGGGGCCCCC")
     
@@ -24,9 +27,9 @@ def test_read_sequence_file_not_found(ori_analyzer):
         ori_analyzer.read_sequence(input_path=Path("no_file.txt"))
 
 # Test for empty file
-def test_read_sequence_empty_file(ori_analyzer):
+def test_read_sequence_empty_file(ori_analyzer, tmp_path):
     # Prepare test file
-    test_path = Path("tests/test_sequence.txt")
+    test_path = tmp_path / "test_sequence.txt"
     with open(test_path, "w") as file:
         file.write("")
     
@@ -34,9 +37,9 @@ def test_read_sequence_empty_file(ori_analyzer):
         ori_analyzer.read_sequence(input_path=test_path)
         
 # Test for correct reading of FASTA
-def test_read_sequence_fasta(ori_analyzer):
+def test_read_sequence_fasta(ori_analyzer, tmp_path):
     # Prepare test file
-    test_path = Path("tests/test_sequence.txt")
+    test_path = tmp_path / "test_sequence.txt"
     with open(test_path, "w") as file:
         file.write(">Header\nAAAAA\nTTTTT\nGGGGG\nCCCCC")
     
@@ -45,9 +48,9 @@ def test_read_sequence_fasta(ori_analyzer):
     assert ori_analyzer.genome == "AAAAATTTTTGGGGGCCCCC"
 
 # Test for correct reading of file with lowercase characters
-def test_read_sequence_lowercase(ori_analyzer):
+def test_read_sequence_lowercase(ori_analyzer, tmp_path):
     # Prepare test file
-    test_path = Path("tests/test_sequence.txt")
+    test_path = tmp_path / "test_sequence.txt"
     with open(test_path, "w") as file:
         file.write(">Header\naaaaa\nTTTTT\nggggg\nCCCCC")
     
@@ -55,3 +58,45 @@ def test_read_sequence_lowercase(ori_analyzer):
     ori_analyzer.read_sequence(input_path=test_path)
     assert ori_analyzer.genome == "AAAAATTTTTGGGGGCCCCC"
 
+
+# Test for reading into a packed sequence
+def test_read_sequence_packed(ori_analyzer, tmp_path):
+    # Prepare test file
+    test_path = tmp_path / "test_sequence.txt"
+    with open(test_path, "w") as file:
+        file.write(">Header\naaaaa\nTTTNT\nggggg\nCCCCC")
+    
+    # Test for correct reading
+    ori_analyzer.read_sequence(input_path=test_path, packed=True)
+    assert isinstance(ori_analyzer.genome, PackedSequence)
+    assert str(ori_analyzer.genome) == "AAAAATTTNTGGGGGCCCCC"
+
+# Test for streaming fixed-size chunks with overlap
+def test_iter_sequence_chunks_overlap(tmp_path):
+    # Prepare test file
+    test_path = tmp_path / "test_sequence.txt"
+    with open(test_path, "w") as file:
+        file.write(">Header one\nacgtA\nCGTAC\n>Header two\nGTACG\nT\n")
+    
+    chunks = list(iter_sequence_chunks(test_path, chunk_size=6, overlap=2))
+    assert chunks == [b"ACGTAC", b"ACGTACGT", b"GTACGT"]
+    assert read_sequence_buffer(test_path) == b"ACGTACGTACGTACGT"
+    assert calculate_gc_skew_chunks(iter_sequence_chunks(test_path, chunk_size=5)).tolist() == \
+        calculate_gc_skew("ACGTACGTACGTACGT").tolist()
+
+# Test for headers and line breaks split across raw blocks
+def test_sequence_parts_small_blocks():
+    data = b">Header\nAAC\r\nGTT\n>Second header\nggg\nCC"
+    for block_size in range(1, 10):
+        assert b"".join(_iter_sequence_parts(data, block_size=block_size)) == b"AACGTTGGGCC"
+
+# Test for packing chunk by chunk
+def test_read_sequence_buffer_packed(tmp_path):
+    # Prepare test file
+    test_path = tmp_path / "test_sequence.txt"
+    with open(test_path, "w") as file:
+        file.write(">Header\nACGTN\nACGTR\nAC\n")
+    
+    packed = PackedSequence.from_chunks(iter_sequence_chunks(test_path, chunk_size=3))
+    assert str(packed) == "ACGTNACGTRAC"
+    assert str(read_sequence_buffer(test_path, packed=True)) == "ACGTNACGTRAC"
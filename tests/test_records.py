@@ -0,0 +1,39 @@
+import pytest
+from functions.sequence import FastaRecord, index_fasta, read_record
+from ori_analyzer import OriAnalyzer
+
+# Create fixture for a multi-record FASTA file
+@pytest.fixture
+def fasta_path(tmp_path):
+    test_path = tmp_path / "contigs.fasta"
+    with open(test_path, "w") as file:
+        file.write(">chromosome description\nAAAAATTTTT\nGGGGGCCCCC\n>plasmid\ncccgggATAT\n>empty\n>last\nGGCC")
+    return test_path
+
+# Test for correct record index
+def test_index_fasta(fasta_path):
+    records = index_fasta(fasta_path)
+    assert [(record.name, record.length) for record in records] == [("chromosome", 20), ("plasmid", 10),
+                                                                    ("empty", 0), ("last", 4)]
+    assert read_record(fasta_path, records[1]) == "CCCGGGATAT"
+    assert read_record(fasta_path, records[2]) == ""
+    assert str(read_record(fasta_path, records[3], packed=True)) == "GGCC"
+
+# Test for plain text files without header
+def test_index_plain_text(tmp_path):
+    test_path = tmp_path / "genome.txt"
+    with open(test_path, "w") as file:
+        file.write("ACGT\nACGT\n")
+    assert index_fasta(test_path) == [FastaRecord("", 0, 8)]
+
+# Test for identical per-contig results in the process pool and in the current process
+def test_analyze_records(fasta_path):
+    serial = OriAnalyzer.analyze_records(fasta_path, k_mer_length=3, window=10, processes=1)
+    parallel = OriAnalyzer.analyze_records(fasta_path, k_mer_length=3, window=10, processes=2)
+    assert serial == parallel
+    assert [result["name"] for result in serial] == ["chromosome", "plasmid", "empty", "last"]
+    analyzer = OriAnalyzer()
+    analyzer.genome = "AAAAATTTTTGGGGGCCCCC"
+    assert {key: serial[0][key] for key in analyzer.analyze(k_mer_length=3, window=10)} == \
+        analyzer.analyze(k_mer_length=3, window=10)
+    assert serial[2]["length"] == 0
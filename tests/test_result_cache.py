@@ -0,0 +1,99 @@
+import os
+import random
+import numpy as np
+import pytest
+from functions.compact_skew import CompactSkew
+from functions.result_cache import ResultCache, decode_result, encode_result
+from ori_analyzer import OriAnalyzer
+
+# Create fixture for a random genome
+@pytest.fixture
+def genome():
+    generator = random.Random(24)
+    return "".join(generator.choice("ACGT" * 10 + "N") for _ in range(3000))
+
+# Test for lossless conversion of every result type
+def test_result_encoding():
+    values = [np.array([0, -1, 2], dtype=np.int32), ([1, 5], [7]), ["ACG", "TNA"], [], {"ACG": 3, "TTA": 1},
+              {"ACG": ["AAG", "ACG"], "TTA": []}, {}]
+    for value in values:
+        decoded = decode_result(encode_result(value))
+        if isinstance(value, np.ndarray):
+            assert decoded.dtype == value.dtype and np.array_equal(decoded, value)
+        else:
+            assert decoded == value and list(decoded) == list(value)
+    with pytest.raises(ValueError):
+        encode_result({"ACG": 1.5})
+
+# Test for storing skews with 2 bits per score
+def test_result_encoding_compact_skew(genome):
+    skew = CompactSkew.from_sequence(genome, block_size=256)
+    decoded = decode_result(encode_result(skew))
+    assert isinstance(decoded, CompactSkew) and decoded.block_size == 256
+    assert np.array_equal(decoded.to_array(), skew.to_array())
+    assert sum(array.nbytes for array in encode_result(skew).values()) < len(genome)
+
+# Test for hits and misses by genome content and parameters
+def test_result_cache_keys(tmp_path):
+    cache = ResultCache(tmp_path)
+    key = cache.key("frequent_patterns", "ab" * 32, {"k": 9, "d": 1, "range": (0, 500), "rc": True})
+    assert cache.key("frequent_patterns", "ab" * 32, {"rc": True, "range": (0, 500), "d": 1, "k": 9}) == key
+    assert cache.key("frequent_patterns", "ab" * 32, {"k": 9, "d": 2, "range": (0, 500), "rc": True}) != key
+    assert cache.key("frequent_patterns", "cd" * 32, {"k": 9, "d": 1, "range": (0, 500), "rc": True}) != key
+
+    assert cache.get(key) is None
+    cache.put(key, {"ACGTACGTA": 4})
+    assert cache.get(key) == {"ACGTACGTA": 4}
+    # Unreadable entries are misses
+    with open(tmp_path / f"{key}.npz", "wb") as file:
+        file.write(b"broken")
+    assert cache.get(key) is None
+    assert cache.stats()["hits"] == 1 and cache.stats()["misses"] == 2
+
+# Test for evicting the least recently used entries
+def test_result_cache_eviction(tmp_path):
+    cache = ResultCache(tmp_path, max_bytes=10**6)
+    for index in range(3):
+        cache.put(f"entry{index}", np.zeros(10**5, dtype=np.int8))
+        os.utime(tmp_path / f"entry{index}.npz", (index, index))
+    assert cache.get("entry0") is not None
+    cache.max_bytes = 250000
+    cache.evict()
+    assert sorted(os.listdir(tmp_path)) == ["entry0.npz", "entry2.npz"]
+    assert cache.stats()["evictions"] == 1 and cache.stats()["entries"] == 2
+
+# Test for scanning the directory only when the estimated size exceeds the limit
+def test_result_cache_scans(tmp_path, monkeypatch):
+    cache = ResultCache(tmp_path, max_bytes=10**6)
+    scans = []
+    entries = cache._entries
+    monkeypatch.setattr(cache, "_entries", lambda: scans.append(1) or entries())
+    for index in range(20):
+        cache.put(f"entry{index}", np.zeros(10**4, dtype=np.int8))
+    assert len(scans) == 1
+    for index in range(20, 120):
+        cache.put(f"entry{index}", np.zeros(10**4, dtype=np.int8))
+    assert cache.stats()["bytes"] <= 10**6 and len(scans) <= 15
+
+# Test for transparent caching in the analyzer
+def test_analyzer_result_cache(genome, tmp_path):
+    expected = OriAnalyzer()
+    expected.genome = genome
+    expected_result = expected.analyze(k_mer_length=6, distance=1, window=600)
+
+    for _ in range(2):
+        analyzer = OriAnalyzer(result_cache=ResultCache(tmp_path))
+        analyzer.genome = genome
+        assert analyzer.analyze(k_mer_length=6, distance=1, window=600) == expected_result
+        assert np.array_equal(analyzer.skew_array, expected.skew_array)
+        k_mers = analyzer.generate_k_mers(6, (100, 400))
+        assert k_mers == expected.generate_k_mers(6, (100, 400))
+        assert analyzer.neighbourhood_dictionary(k_mers, 1, True) == expected.neighbourhood_dictionary(k_mers, 1, True)
+    assert analyzer.result_cache.stats()["misses"] == 0
+
+    # Edited genomes and assigned skew arrays are not served from the cache
+    analyzer.substitute_sequence(10, "GGGGGGGGGG")
+    expected.genome = analyzer.genome
+    assert analyzer.analyze(k_mer_length=6, distance=1, window=600) == expected.analyze(k_mer_length=6, distance=1, window=600)
+    analyzer.skew_array = np.arange(len(genome), dtype=np.int32)
+    assert analyzer.min_max_skew() == ([0], [len(genome) - 1])
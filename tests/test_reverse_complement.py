@@ -0,0 +1,39 @@
+import random
+import numpy as np
+import pytest
+from functions.encoding import encode_k_mer, encode_k_mers, reverse_complement_code, reverse_complement_codes
+from functions.sequence import reverse_complement, reverse_complements
+
+# Test for IUPAC symbols and lowercase bases
+def test_reverse_complement():
+    assert reverse_complement("AACGTT") == "AACGTT"
+    assert reverse_complement("ATGRYn") == "nRYCAT"
+    assert reverse_complement(b"GGAC") == b"GTCC"
+
+# Test for handling symbols without complement
+def test_reverse_complement_invalid():
+    with pytest.raises(ValueError):
+        reverse_complement("ACGU")
+    with pytest.raises(ValueError):
+        reverse_complements(["ACG", "AC-"])
+    # Line breaks inside a sequence must not split it
+    with pytest.raises(ValueError):
+        reverse_complements(["A\nC", "G"])
+    with pytest.raises(ValueError):
+        reverse_complements(["ACG", ""])
+
+# Test for identical results of the bulk operation
+def test_reverse_complements():
+    sequences = ["ACGT", "GGGAAN", "ttac"]
+    assert reverse_complements(sequences) == [reverse_complement(sequence) for sequence in sequences]
+    assert reverse_complements([]) == []
+
+# Test for bit-reversed reverse complements of k-mer codes up to the maximum length
+@pytest.mark.parametrize("k_mer_length", [1, 2, 9, 16, 31])
+def test_reverse_complement_codes(k_mer_length):
+    generator = random.Random(k_mer_length)
+    k_mers = ["".join(generator.choice("ACGT") for _ in range(k_mer_length)) for _ in range(50)]
+    codes, _ = encode_k_mers(k_mers, k_mer_length)
+    expected, _ = encode_k_mers(reverse_complements(k_mers), k_mer_length)
+    assert np.array_equal(reverse_complement_codes(codes, k_mer_length), expected)
+    assert reverse_complement_code(encode_k_mer(k_mers[0]), k_mer_length) == expected[0]
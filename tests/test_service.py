@@ -0,0 +1,78 @@
+import asyncio
+import random
+import pytest
+from ori_analyzer import OriAnalyzer
+from ori_service import OriService
+
+# Create fixture for a random genome file
+@pytest.fixture
+def genome_path(tmp_path):
+    generator = random.Random(23)
+    genome = "".join(generator.choice("ACGT") for _ in range(4000))
+    path = tmp_path / "genome.fasta"
+    path.write_text(">genome\n" + "\n".join(genome[pos:pos + 80] for pos in range(0, len(genome), 80)) + "\n")
+    return str(path)
+
+# Create fixture for a serial analyzer of the genome
+@pytest.fixture
+def ori_analyzer(genome_path):
+    analyzer = OriAnalyzer()
+    analyzer.read_sequence(genome_path)
+    return analyzer
+
+# Test for identical results and shared computations of concurrent requests
+def test_service_deduplication(genome_path, ori_analyzer):
+    async def run():
+        async with OriService(processes=1) as service:
+            results = await asyncio.gather(*(service.analyze(genome_path) for _ in range(5)),
+                                           service.min_max_skew(genome_path))
+            return results, service.stats()
+
+    results, stats = asyncio.run(run())
+    expected = ori_analyzer.analyze()
+    assert all(result == expected for result in results[:5])
+    assert results[5] == tuple(ori_analyzer.min_max_skew())
+    assert stats["requests"] == 6 and stats["deduplicated"] == 4 and stats["tasks"] == 2
+
+# Test for batching region queries into one task
+def test_service_batching(genome_path, ori_analyzer):
+    ranges = [(start, start + 300) for start in range(0, 3000, 250)]
+
+    async def run():
+        async with OriService(processes=1, batch_size=8, batch_delay=0.05) as service:
+            results = await asyncio.gather(*(service.frequent_patterns(genome_path, seq_range, 6, 1) for seq_range in ranges),
+                                           service.frequent_patterns(genome_path, (10, 5), 6, 1), return_exceptions=True)
+            return results, service.stats()
+
+    results, stats = asyncio.run(run())
+    for seq_range, result in zip(ranges, results):
+        assert result == ori_analyzer.frequent_patterns(seq_range, 6, 1)
+    # Invalid queries fail alone
+    assert isinstance(results[-1], ValueError)
+    assert stats["tasks"] == 2 and stats["batched_queries"] == 13
+
+# Test for cancelling queued and shared requests
+def test_service_cancellation(genome_path, ori_analyzer):
+    async def run():
+        async with OriService(processes=1, batch_delay=0.05) as service:
+            cancelled = asyncio.ensure_future(service.frequent_patterns(genome_path, (0, 500), 6, 1))
+            await asyncio.sleep(0)
+            cancelled.cancel()
+            await asyncio.sleep(0.1)
+            tasks_after_cancel = service.stats()["tasks"]
+
+            # The remaining request of a shared computation still gets its result
+            first = asyncio.ensure_future(service.analyze(genome_path))
+            second = asyncio.ensure_future(service.analyze(genome_path))
+            await asyncio.sleep(0)
+            first.cancel()
+            return tasks_after_cancel, await second, first.cancelled()
+
+    tasks_after_cancel, result, first_cancelled = asyncio.run(run())
+    assert tasks_after_cancel == 0
+    assert result == ori_analyzer.analyze() and first_cancelled
+
+# Test for invalid limits
+def test_service_invalid_limits():
+    with pytest.raises(ValueError):
+        OriService(max_pending=0)